@@ -0,0 +1,126 @@
+# bee/academy/content.py
+# Conteúdo da Academy em arquivos de dados (bee/academy/data, ou BEE_ACADEMY_DATA).
+#
+#   manifest.json          versão + para cada tipo: ordem global dos ids e um arquivo por tópico
+#   <tipo>/<topico>.json   lista de itens daquele tópico
+#
+# Só o manifest é lido de cara; cada arquivo de tópico é lido na primeira vez que alguém
+# precisa de um item dele. Trocar os arquivos (e subir "version") recarrega sem deploy.
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from bee.config import ACADEMY_DATA_DIR
+
+KINDS = ("tips", "questions", "dictionary")
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, object] = {"stamp": None, "manifest": None, "id_file": {}}
+_TOPIC_CACHE: Dict[Tuple[int, str], Tuple[Tuple[dict, ...], Dict[str, dict]]] = {}
+
+
+def _manifest_path() -> str:
+    return os.path.join(ACADEMY_DATA_DIR, "manifest.json")
+
+
+def _read_json(rel_path: str):
+    with open(os.path.join(ACADEMY_DATA_DIR, rel_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def manifest() -> dict:
+    """Manifest atual; relido só quando o arquivo muda (mtime)."""
+    try:
+        stamp = os.stat(_manifest_path()).st_mtime_ns
+    except OSError:
+        stamp = None
+    with _LOCK:
+        if _STATE["manifest"] is not None and _STATE["stamp"] == stamp:
+            return _STATE["manifest"]  # type: ignore[return-value]
+    data = _read_json("manifest.json") if stamp is not None else {"version": 0, "kinds": {}}
+    with _LOCK:
+        old = _STATE["manifest"]
+        if old is None or old.get("version") != data.get("version"):  # type: ignore[union-attr]
+            _TOPIC_CACHE.clear()
+        _STATE["manifest"] = data
+        _STATE["stamp"] = stamp
+        _STATE["id_file"] = {
+            (kind, iid): f["file"]
+            for kind, spec in data.get("kinds", {}).items()
+            for f in spec.get("files", [])
+            for iid in f.get("ids", ())
+        }
+    return data
+
+
+def content_version() -> int:
+    return int(manifest().get("version", 0))
+
+
+def _files(kind: str) -> List[dict]:
+    return manifest().get("kinds", {}).get(kind, {}).get("files", [])
+
+
+def ids(kind: str) -> Tuple[str, ...]:
+    """Ids na ordem original do conteúdo (sem abrir nenhum arquivo de tópico)."""
+    return tuple(manifest().get("kinds", {}).get(kind, {}).get("order", []))
+
+
+def topics(kind: str) -> List[str]:
+    return sorted(f["topic"] for f in _files(kind) if f.get("topic"))
+
+
+def file_for(kind: str, item_id: str) -> Optional[str]:
+    manifest()
+    return _STATE["id_file"].get((kind, item_id))  # type: ignore[union-attr]
+
+
+def _load(rel_path: str) -> Tuple[Tuple[dict, ...], Dict[str, dict]]:
+    key = (content_version(), rel_path)
+    with _LOCK:
+        cached = _TOPIC_CACHE.get(key)
+    if cached is not None:
+        return cached
+    items = tuple(_read_json(rel_path))
+    by_id: Dict[str, dict] = {}
+    for item in items:
+        by_id.setdefault(item.get("id"), item)  # id repetido: vale o primeiro
+    with _LOCK:
+        _TOPIC_CACHE[key] = (items, by_id)
+    return items, by_id
+
+
+def load_file(rel_path: str) -> Tuple[dict, ...]:
+    return _load(rel_path)[0]
+
+
+def get_item(kind: str, item_id: str) -> Optional[dict]:
+    """Um item pelo id: abre só o arquivo do tópico dele."""
+    rel_path = file_for(kind, item_id)
+    if rel_path is None:
+        return None
+    return _load(rel_path)[1].get(item_id)
+
+
+def load_topic(kind: str, topic: str) -> Tuple[dict, ...]:
+    for f in _files(kind):
+        if f.get("topic") == topic:
+            return load_file(f["file"])
+    return ()
+
+
+def load_all(kind: str) -> Tuple[dict, ...]:
+    """Todos os itens do tipo, na ordem do manifest. Lê todos os tópicos."""
+    by_id = {}
+    for f in _files(kind):
+        for item in load_file(f["file"]):
+            by_id.setdefault(item.get("id"), item)
+    order = ids(kind)
+    return tuple(by_id[i] for i in order if i in by_id)
+
+
+def loaded_files() -> List[str]:
+    """Arquivos de tópico já carregados neste processo (diagnóstico)."""
+    with _LOCK:
+        return sorted(path for _, path in _TOPIC_CACHE)
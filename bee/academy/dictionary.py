@@ -1,200 +1,180 @@
 # bee/academy/dictionary.py
-# Dicionário de abreviações e indicadores de mercado
+# Dicionário de abreviações e indicadores de mercado (conteúdo em bee/academy/data/dictionary/)
 
 from __future__ import annotations
 
-from typing import List, Dict, Optional
-
-DICTIONARY: List[Dict[str, str]] = [
-    # ---- VALUATION ----
-    {
-        "id": "dict_pl",
-        "term": "P/L",
-        "topic": "Valuation",
-        "definition": "Preço/Lucro. Diz quantos anos de lucro (aprox.) você está pagando no preço atual.",
-        "why_it_matters": "Ajuda a comparar valuation entre empresas do mesmo setor. P/L muito alto pode indicar expectativa forte ou exagero.",
-        "how_to_use": "Compare com histórico da empresa e com concorrentes. Nunca use sozinho.",
-        "formula": "P/L = Preço da ação / Lucro por ação (LPA)",
-        "notes": "Em empresas cíclicas o P/L pode enganar. Se o lucro caiu, o P/L sobe artificialmente."
-    },
-    {
-        "id": "dict_pvp",
-        "term": "P/VP",
-        "topic": "Valuation",
-        "definition": "Preço/Valor Patrimonial. Compara o preço de mercado com o valor contábil por ação.",
-        "why_it_matters": "Útil para bancos/seguradoras e empresas com patrimônio relevante.",
-        "how_to_use": "P/VP abaixo de 1 pode indicar desconto — ou problema no negócio. Compare com o setor.",
-        "formula": "P/VP = Preço da ação / Valor Patrimonial por ação (VPA)",
-        "notes": "Em empresas de tecnologia, o VP pode não refletir ativos intangíveis."
-    },
-    {
-        "id": "dict_ev_ebitda",
-        "term": "EV/EBITDA",
-        "topic": "Valuation",
-        "definition": "Enterprise Value dividido pelo EBITDA. Mostra valuation considerando dívida e caixa.",
-        "why_it_matters": "Comparação mais justa entre empresas com diferentes níveis de endividamento.",
-        "how_to_use": "Use para comparar empresas do mesmo setor. Menor nem sempre é melhor.",
-        "formula": "EV/EBITDA = (Valor de mercado + Dívida - Caixa) / EBITDA",
-        "notes": "EBITDA não é lucro. Pode mascarar capex alto."
-    },
-
-    # ---- RENTABILIDADE ----
-    {
-        "id": "dict_roe",
-        "term": "ROE",
-        "topic": "Rentabilidade",
-        "definition": "Return on Equity. Retorno sobre o patrimônio líquido.",
-        "why_it_matters": "Mostra eficiência em gerar lucro usando o capital dos acionistas.",
-        "how_to_use": "Compare com empresas do mesmo setor e veja consistência ao longo dos anos.",
-        "formula": "ROE = Lucro líquido / Patrimônio líquido",
-        "notes": "ROE pode subir artificialmente se a empresa aumenta dívida e reduz patrimônio."
-    },
-    {
-        "id": "dict_roa",
-        "term": "ROA",
-        "topic": "Rentabilidade",
-        "definition": "Return on Assets. Retorno gerado em cima dos ativos totais.",
-        "why_it_matters": "Útil para ver eficiência operacional geral.",
-        "how_to_use": "Compare com concorrentes. Setores intensivos em ativos tendem a ter ROA menor.",
-        "formula": "ROA = Lucro líquido / Ativos totais",
-        "notes": "Depende bastante do setor."
-    },
-    {
-        "id": "dict_margem_liquida",
-        "term": "Margem Líquida",
-        "topic": "Rentabilidade",
-        "definition": "Percentual do faturamento que vira lucro líquido.",
-        "why_it_matters": "Mostra poder de precificação e eficiência da empresa.",
-        "how_to_use": "Procure margens estáveis/crescentes ao longo do tempo.",
-        "formula": "Margem líquida = Lucro líquido / Receita",
-        "notes": "Empresas de varejo costumam ter margem menor."
-    },
-
-    # ---- ENDIVIDAMENTO ----
-    {
-        "id": "dict_divliq_ebitda",
-        "term": "Dívida Líq./EBITDA",
-        "topic": "Endividamento",
-        "definition": "Quantos anos de EBITDA a empresa precisa para pagar a dívida líquida (aprox.).",
-        "why_it_matters": "Mede alavancagem. Muito alto pode indicar risco em juros altos.",
-        "how_to_use": "Compare por setor. Observe tendência (caindo é bom).",
-        "formula": "Dívida Líquida/EBITDA = (Dívida - Caixa) / EBITDA",
-        "notes": "Setores estáveis toleram mais dívida que setores voláteis."
-    },
-    {
-        "id": "dict_liquidez_corrente",
-        "term": "Liquidez Corrente",
-        "topic": "Endividamento",
-        "definition": "Capacidade de pagar obrigações de curto prazo com ativos de curto prazo.",
-        "why_it_matters": "Indica folga (ou aperto) no curto prazo.",
-        "how_to_use": "Acima de 1 geralmente é ok, mas depende do setor.",
-        "formula": "Liquidez corrente = Ativo circulante / Passivo circulante",
-        "notes": "Muito alta também pode indicar capital mal alocado."
-    },
-
-    # ---- DIVIDENDOS ----
-    {
-        "id": "dict_dy",
-        "term": "DY (Dividend Yield)",
-        "topic": "Dividendos",
-        "definition": "Percentual do preço atual que a empresa pagou em dividendos no período (geralmente 12 meses).",
-        "why_it_matters": "Ajuda a comparar retorno em proventos.",
-        "how_to_use": "Olhe sustentabilidade: payout, geração de caixa e consistência.",
-        "formula": "DY = Dividendos por ação (12m) / Preço da ação",
-        "notes": "DY alto demais pode ser armadilha se o lucro cair."
-    },
-    {
-        "id": "dict_payout",
-        "term": "Payout",
-        "topic": "Dividendos",
-        "definition": "Percentual do lucro que a empresa distribui aos acionistas.",
-        "why_it_matters": "Mostra política de distribuição e espaço para reinvestimento.",
-        "how_to_use": "Payout muito alto pode reduzir crescimento; muito baixo pode indicar retenção.",
-        "formula": "Payout = Dividendos / Lucro",
-        "notes": "Alguns setores têm payout estruturalmente maior."
-    },
-
-    # ---- ANÁLISE TÉCNICA ----
-    {
-        "id": "dict_rsi",
-        "term": "RSI",
-        "topic": "Análise Técnica",
-        "definition": "Relative Strength Index. Indicador que tenta medir sobrecompra/sobrevenda.",
-        "why_it_matters": "Ajuda a identificar momentos de força/exaustão no preço (não é garantia).",
-        "how_to_use": "RSI > 70 costuma ser sobrecompra; RSI < 30 sobrevenda (regra geral). Combine com tendência e suporte/resistência.",
-        "formula": "RSI (14) baseado na média de ganhos/perdas do período",
-        "notes": "Em tendência forte, RSI pode ficar alto/baixo por muito tempo."
-    },
-    {
-        "id": "dict_mm",
-        "term": "MM (Média Móvel)",
-        "topic": "Análise Técnica",
-        "definition": "Média do preço em um período (ex.: 9, 21, 200). Suaviza o ruído.",
-        "why_it_matters": "Ajuda a ver tendência e pontos de suporte/resistência dinâmicos.",
-        "how_to_use": "Use cruzamentos (ex.: MM curta cruzando MM longa) como sinal auxiliar.",
-        "formula": "MM = média dos preços nos últimos N períodos",
-        "notes": "Atrasada por natureza (lag)."
-    },
-    {
-        "id": "dict_suporte_resistencia",
-        "term": "Suporte / Resistência",
-        "topic": "Análise Técnica",
-        "definition": "Níveis onde o preço historicamente encontra dificuldade para cair (suporte) ou subir (resistência).",
-        "why_it_matters": "Ajuda em entradas/saídas e gerenciamento de risco.",
-        "how_to_use": "Procure regiões de toque repetido. Confirme com volume e tendência.",
-        "formula": "",
-        "notes": "São zonas, não linhas exatas."
-    },
-
-    # ---- OUTROS ----
-    {
-        "id": "dict_beta",
-        "term": "Beta",
-        "topic": "Risco",
-        "definition": "Mede a sensibilidade do ativo em relação ao mercado (ex.: IBOV).",
-        "why_it_matters": "Beta alto tende a oscilar mais que o mercado; beta baixo, menos.",
-        "how_to_use": "Use para balancear risco da carteira.",
-        "formula": "Beta = cov(ativo, mercado) / var(mercado)",
-        "notes": "Depende da janela de tempo."
-    },
-    {
-        "id": "dict_volatilidade",
-        "term": "Volatilidade",
-        "topic": "Risco",
-        "definition": "Medida de variação do preço. Maior volatilidade = mais oscilação.",
-        "why_it_matters": "Define risco de curto prazo e tamanho ideal de posição.",
-        "how_to_use": "Ativos mais voláteis pedem menor % na carteira se você quer estabilidade.",
-        "formula": "",
-        "notes": "Não é a mesma coisa que risco de falência (crédito)."
-    },
-]
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+from . import content
 
-def topics_in_dictionary() -> List[str]:
-    topics = sorted({d.get("topic", "").strip() for d in DICTIONARY if d.get("topic")})
-    return [t for t in topics if t]
 
+# --------------------------------------------------------------------------------------
+# Índice de busca (montado na primeira busca, por escopo: tudo ou um tópico)
+# --------------------------------------------------------------------------------------
+_SEARCH_FIELDS = ("term", "definition", "why_it_matters", "how_to_use", "notes", "formula")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MAX_GRAM = 3
+
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acento: 'Ação' -> 'acao'."""
+    norm = unicodedata.normalize("NFKD", str(text or ""))
+    return "".join(ch for ch in norm if not unicodedata.combining(ch)).lower()
+
+
+def _grams(text: str, n: int) -> Iterable[str]:
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _compact(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text)
+
+
+def _gram_index(texts: List[str]) -> Dict[str, Set[int]]:
+    index: Dict[str, Set[int]] = {}
+    for i, text in enumerate(texts):
+        seen = set()
+        for n in range(1, _MAX_GRAM + 1):
+            seen.update(_grams(text, n))
+        for g in seen:
+            index.setdefault(g, set()).add(i)
+    return index
+
+
+def _lookup(index: Dict[str, Set[int]], texts: List[str], q: str) -> Set[int]:
+    """Entradas cujo texto contém q: direto pelo índice até 3 letras, senão cruza trigramas."""
+    if len(q) <= _MAX_GRAM:
+        return set(index.get(q, ()))
+    postings = [index.get(g) for g in set(_grams(q, _MAX_GRAM))]
+    if not all(postings):
+        return set()
+    postings.sort(key=len)
+    cand = set(postings[0])
+    for p in postings[1:]:
+        cand &= p
+        if not cand:
+            break
+    return {i for i in cand if q in texts[i]}
+
+
+def _prefix_range(keys: List[str], ids: List[int], prefix: str) -> Set[int]:
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + "\uffff")
+    return set(ids[lo:hi])
+
+
+class DictionaryIndex:
+    """Índice invertido de n-gramas (1 a 3 letras), com acentos dobrados.
+
+    As entradas ficam em ordem alfabética do termo, então o id já é a posição final:
+    cada faixa do ranking (igual > começa com > palavra com prefixo > termo contém >
+    só no texto) sai de um set ordenado, sem pontuar entrada por entrada.
+    """
+
+    def __init__(self, entries: List[Dict[str, str]]):
+        self.entries = sorted(entries, key=lambda e: fold(e.get("term", "")))
+        terms = [fold(e.get("term", "")) for e in self.entries]
+        compacts = [_compact(t) for t in terms]
+
+        # o termo compacto entra no texto para 'pl' achar 'P/L'
+        self._hay = [
+            fold(" ".join(e.get(f, "") or "" for f in _SEARCH_FIELDS)) + " " + c
+            for e, c in zip(self.entries, compacts)
+        ]
+        self._term_key = [f"{t} {c}" for t, c in zip(terms, compacts)]
+        self._hay_grams = _gram_index(self._hay)
+        self._term_grams = _gram_index(self._term_key)
 
-def search_dictionary(query: str = "", topic: Optional[str] = None) -> List[Dict[str, str]]:
-    q = (query or "").strip().lower()
+        self._exact: Dict[str, Set[int]] = {}
+        starts, tokens = [], []
+        for i, (t, c) in enumerate(zip(terms, compacts)):
+            for key in {t, c} - {""}:
+                self._exact.setdefault(key, set()).add(i)
+                starts.append((key, i))
+            tokens.extend((tok, i) for tok in set(_WORD_RE.findall(t)))
+        starts.sort()
+        tokens.sort()
+        self._start_keys, self._start_ids = [k for k, _ in starts], [i for _, i in starts]
+        self._token_keys, self._token_ids = [k for k, _ in tokens], [i for _, i in tokens]
 
-    def match(item: Dict[str, str]) -> bool:
-        if topic and item.get("topic") != topic:
-            return False
+        self._by_topic: Dict[str, List[int]] = {}
+        for i, e in enumerate(self.entries):
+            topic = (e.get("topic") or "").strip()
+            if topic:
+                self._by_topic.setdefault(topic, []).append(i)
+        self._topics = sorted(self._by_topic)
+
+    def topics(self) -> List[str]:
+        return list(self._topics)
+
+    def search(self, query: str = "", topic: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict[str, str]]:
+        q = fold(query).strip()
         if not q:
-            return True
-        hay = " ".join([
-            item.get("term", ""),
-            item.get("definition", ""),
-            item.get("why_it_matters", ""),
-            item.get("how_to_use", ""),
-            item.get("notes", ""),
-            item.get("formula", ""),
-        ]).lower()
-        # busca simples (contém)
-        return q in hay or q.replace("/", "") in hay or q.replace(".", "") in hay
-
-    results = [d for d in DICTIONARY if match(d)]
-    # ordena por termo
-    results.sort(key=lambda x: x.get("term", ""))
-    return results
+            ids = self._by_topic.get(topic, []) if topic else range(len(self.entries))
+            return [self.entries[i] for i in ids[:limit]]
+
+        # mesmas variantes da busca antiga: 'p/l' e 'p.l' também acham 'pl'
+        variants = list(dict.fromkeys(v for v in (q, q.replace("/", ""), q.replace(".", "")) if v))
+        keys = list(dict.fromkeys(k for v in variants for k in (v, _compact(v)) if k))
+
+        hits: Set[int] = set()
+        contains: Set[int] = set()
+        for v in variants:
+            hits |= _lookup(self._hay_grams, self._hay, v)
+            contains |= _lookup(self._term_grams, self._term_key, v)
+        if topic:
+            hits &= set(self._by_topic.get(topic, ()))
+
+        exact: Set[int] = set()
+        starts: Set[int] = set()
+        token: Set[int] = set()
+        for k in keys:
+            exact |= self._exact.get(k, set())
+            starts |= _prefix_range(self._start_keys, self._start_ids, k)
+        for v in variants:
+            token |= _prefix_range(self._token_keys, self._token_ids, v)
+
+        out: List[int] = []
+        seen: Set[int] = set()
+        for tier in (exact, starts, token, contains, hits):
+            tier = (tier & hits) - seen
+            out.extend(sorted(tier))
+            seen |= tier
+            if limit is not None and len(out) >= limit:
+                break
+        return [self.entries[i] for i in out[:limit]]
+
+
+_INDEXES: Dict[Tuple[int, Optional[str]], DictionaryIndex] = {}
+
+
+def _index(topic: Optional[str] = None) -> DictionaryIndex:
+    """Índice do dicionário inteiro, ou só do tópico (lê apenas o arquivo dele)."""
+    key = (content.content_version(), topic)
+    idx = _INDEXES.get(key)
+    if idx is None:
+        entries = content.load_topic("dictionary", topic) if topic else content.load_all("dictionary")
+        if any(k[0] != key[0] for k in _INDEXES):
+            _INDEXES.clear()  # conteúdo mudou de versão
+        idx = _INDEXES.setdefault(key, DictionaryIndex(list(entries)))
+    return idx
+
+
+def topics_in_dictionary() -> List[str]:
+    return content.topics("dictionary")
+
+
+def search_dictionary(query: str = "", topic: Optional[str] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, str]]:
+    return _index(topic).search(query, limit=limit)
+
+
+def __getattr__(name):
+    # compatibilidade: DICTIONARY agora vem de bee/academy/data/dictionary/
+    if name == "DICTIONARY":
+        return list(content.load_all("dictionary"))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
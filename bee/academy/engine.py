@@ -2,6 +2,7 @@
 from datetime import date
 import hashlib
 import random
+from typing import Sequence
 
 LEVELS = [
     (0, "Iniciante 🐣"),
@@ -41,7 +42,7 @@ def _seed_from_user_day(username: str, day: str) -> int:
     return int(digest[:8], 16)
 
 
-def daily_question_id(username: str, question_ids: list[str], day: str | None = None) -> str:
+def daily_question_id(username: str, question_ids: Sequence[str], day: str | None = None) -> str:
     if not question_ids:
         return ""
     if day is None:
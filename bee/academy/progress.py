@@ -1,6 +1,9 @@
 # bee/academy/progress.py
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
 
 try:
     from bee.config import DB_FILE
@@ -8,10 +11,30 @@ except Exception:
     DB_FILE = "bee_database.db"
 
 
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = set()
+
+
 def _connect():
     return sqlite3.connect(DB_FILE)
 
 
+@contextmanager
+def _tx():
+    """Uma conexão, uma transação: commit no fim, rollback em erro."""
+    if DB_FILE not in _INITIALIZED:
+        init_academy_db()
+    conn = _connect()
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 def init_academy_db():
     conn = _connect()
     cur = conn.cursor()
@@ -27,6 +50,23 @@ def init_academy_db():
         )
     """)
 
+    # Histórico por pergunta, compacto: uma linha por (usuário, pergunta) com o estado SM-2
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS academy_srs (
+            username TEXT NOT NULL,
+            qid TEXT NOT NULL,
+            reps INTEGER NOT NULL DEFAULT 0,
+            interval_days INTEGER NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            due TEXT NOT NULL,
+            last_day TEXT,
+            correct INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, qid)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_academy_srs_due ON academy_srs(username, due)")
+
     cur.execute("""
         CREATE TABLE IF NOT EXISTS academy_favorites (
             username TEXT NOT NULL,
@@ -39,29 +79,16 @@ def init_academy_db():
 
     conn.commit()
     conn.close()
-
-
-def _ensure_user(username: str):
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("SELECT username FROM academy_progress WHERE username = ?", (username,))
-    row = cur.fetchone()
-    if row is None:
-        cur.execute(
-            "INSERT INTO academy_progress (username, xp, streak, last_day, correct, total) VALUES (?, 0, 0, NULL, 0, 0)",
-            (username,)
-        )
-        conn.commit()
-    conn.close()
+    with _INIT_LOCK:
+        _INITIALIZED.add(DB_FILE)
 
 
 def get_progress(username: str) -> dict:
-    _ensure_user(username)
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("SELECT xp, streak, last_day, correct, total FROM academy_progress WHERE username = ?", (username,))
-    xp, streak, last_day, correct, total = cur.fetchone()
-    conn.close()
+    with _tx() as cur:
+        cur.execute("SELECT xp, streak, last_day, correct, total FROM academy_progress WHERE username = ?",
+                    (username,))
+        row = cur.fetchone()
+    xp, streak, last_day, correct, total = row or (0, 0, None, 0, 0)
     return {
         "xp": int(xp or 0),
         "streak": int(streak or 0),
@@ -71,98 +98,153 @@ def get_progress(username: str) -> dict:
     }
 
 
-def _days_diff(last_day: str, today: str) -> int:
-    try:
-        d1 = datetime.strptime(last_day, "%Y-%m-%d").date()
-        d2 = datetime.strptime(today, "%Y-%m-%d").date()
-        return (d2 - d1).days
-    except Exception:
-        return 999999
-
-
-def add_quiz_result(username: str, is_correct: bool, xp_gain_correct: int = 10):
-    _ensure_user(username)
-    today = date.today().isoformat()
+# Streak e XP calculados pelo próprio SQLite dentro do UPSERT: sem ler-modificar-gravar.
+# Mesmo dia mantém a ofensiva, dia seguinte soma 1, qualquer outro caso (buraco,
+# data inválida, relógio para trás) recomeça em 1.
+_UPSERT_RESULT = """
+    INSERT INTO academy_progress (username, xp, streak, last_day, correct, total)
+    VALUES (:username, :xp, 1, :day, :correct, 1)
+    ON CONFLICT(username) DO UPDATE SET
+        xp = academy_progress.xp + excluded.xp,
+        streak = CASE
+            WHEN academy_progress.last_day IS NULL THEN 1
+            WHEN julianday(excluded.last_day) - julianday(academy_progress.last_day) = 0
+                THEN MAX(1, academy_progress.streak)
+            WHEN julianday(excluded.last_day) - julianday(academy_progress.last_day) = 1
+                THEN academy_progress.streak + 1
+            ELSE 1
+        END,
+        last_day = excluded.last_day,
+        correct = academy_progress.correct + excluded.correct,
+        total = academy_progress.total + 1
+"""
+
+
+def add_quiz_results(results: Iterable[Tuple[str, bool]], xp_gain_correct: int = 10,
+                     day: Optional[str] = None) -> int:
+    """Registra várias respostas (username, is_correct) numa única transação.
+
+    As respostas são aplicadas na ordem recebida. Retorna quantas foram gravadas.
+    """
+    day = day or date.today().isoformat()
+    params = [
+        {"username": u, "xp": int(xp_gain_correct) if ok else 0, "day": day, "correct": 1 if ok else 0}
+        for u, ok in results
+    ]
+    if not params:
+        return 0
+    with _tx() as cur:
+        cur.executemany(_UPSERT_RESULT, params)
+    return len(params)
+
+
+def add_quiz_result(username: str, is_correct: bool, xp_gain_correct: int = 10,
+                    qid: Optional[str] = None) -> Optional[dict]:
+    """Registra a resposta; com qid também atualiza a repetição espaçada (mesma transação).
+
+    Retorna o novo estado SM-2 da pergunta (ou None sem qid).
+    """
+    day = date.today().isoformat()
+    params = {"username": username, "xp": int(xp_gain_correct) if is_correct else 0, "day": day,
+              "correct": 1 if is_correct else 0}
+    with _tx() as cur:
+        cur.execute(_UPSERT_RESULT, params)
+        if qid:
+            return _review(cur, username, qid, is_correct, day)
+    return None
+
+
+# --------------------------------------------------------------------------------------
+# Repetição espaçada (SM-2 com resposta binária: acerto = nota 4, erro = nota 1)
+# --------------------------------------------------------------------------------------
+MIN_EASE = 1.3
+START_EASE = 2.5
+
+
+def sm2_next(reps: int, interval_days: int, ease: float, is_correct: bool) -> Tuple[int, int, float]:
+    """(reps, intervalo em dias, facilidade) depois de uma resposta."""
+    grade = 4 if is_correct else 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    if not is_correct:
+        # errou: volta ao começo e reaparece ainda hoje, depois das que já estavam na fila
+        return 0, 0, ease
+    reps += 1
+    if reps == 1:
+        interval_days = 1
+    elif reps == 2:
+        interval_days = 6
+    else:
+        interval_days = max(1, round(interval_days * ease))
+    return reps, interval_days, ease
+
+
+def _review(cur, username: str, qid: str, is_correct: bool, day: str) -> dict:
+    cur.execute("SELECT reps, interval_days, ease, correct, total FROM academy_srs WHERE username = ? AND qid = ?",
+                (username, qid))
+    reps, interval_days, ease, correct, total = cur.fetchone() or (0, 0, START_EASE, 0, 0)
+    reps, interval_days, ease = sm2_next(reps, interval_days, ease, is_correct)
+    due = date.fromordinal(date.fromisoformat(day).toordinal() + interval_days).isoformat()
+    row = {
+        "username": username, "qid": qid, "reps": reps, "interval_days": interval_days, "ease": ease,
+        "due": due, "last_day": day, "correct": correct + (1 if is_correct else 0), "total": total + 1,
+    }
+    cur.execute("""
+        INSERT OR REPLACE INTO academy_srs
+            (username, qid, reps, interval_days, ease, due, last_day, correct, total)
+        VALUES (:username, :qid, :reps, :interval_days, :ease, :due, :last_day, :correct, :total)
+    """, row)
+    return row
 
-    prog = get_progress(username)
-    last_day = prog["last_day"]
-    streak = prog["streak"]
-    xp = prog["xp"]
-    correct = prog["correct"]
-    total = prog["total"]
 
-    total += 1
+def load_srs(username: str) -> Dict[str, str]:
+    """{qid: due} das perguntas já respondidas pelo usuário."""
+    with _tx() as cur:
+        cur.execute("SELECT qid, due FROM academy_srs WHERE username = ?", (username,))
+        rows = cur.fetchall()
+    return {qid: due for qid, due in rows}
 
-    if not last_day:
-        streak = 1
-    else:
-        diff = _days_diff(last_day, today)
-        if diff == 0:
-            streak = max(1, streak)
-        elif diff == 1:
-            streak += 1
-        else:
-            streak = 1
-
-    if is_correct:
-        correct += 1
-        xp += int(xp_gain_correct)
 
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("""
-        UPDATE academy_progress
-        SET xp = ?, streak = ?, last_day = ?, correct = ?, total = ?
-        WHERE username = ?
-    """, (xp, streak, today, correct, total, username))
-    conn.commit()
-    conn.close()
+def count_due(username: str, day: Optional[str] = None) -> int:
+    """Quantas revisões vencem até o dia (usa o índice username, due)."""
+    day = day or date.today().isoformat()
+    with _tx() as cur:
+        cur.execute("SELECT COUNT(*) FROM academy_srs WHERE username = ? AND due <= ?", (username, day))
+        return int(cur.fetchone()[0])
 
 
 def is_favorite(username: str, item_type: str, item_id: str) -> bool:
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT 1 FROM academy_favorites
-        WHERE username = ? AND item_type = ? AND item_id = ?
-    """, (username, item_type, item_id))
-    row = cur.fetchone()
-    conn.close()
+    with _tx() as cur:
+        cur.execute("""
+            SELECT 1 FROM academy_favorites
+            WHERE username = ? AND item_type = ? AND item_id = ?
+        """, (username, item_type, item_id))
+        row = cur.fetchone()
     return row is not None
 
 
 def toggle_favorite(username: str, item_type: str, item_id: str) -> bool:
+    """Remove se existir, senão insere — na mesma transação. Retorna o estado final."""
     now = datetime.now().isoformat(timespec="seconds")
-    if is_favorite(username, item_type, item_id):
-        conn = _connect()
-        cur = conn.cursor()
+    with _tx() as cur:
         cur.execute("""
             DELETE FROM academy_favorites
             WHERE username = ? AND item_type = ? AND item_id = ?
         """, (username, item_type, item_id))
-        conn.commit()
-        conn.close()
-        return False
-
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT OR REPLACE INTO academy_favorites (username, item_type, item_id, created_at)
-        VALUES (?, ?, ?, ?)
-    """, (username, item_type, item_id, now))
-    conn.commit()
-    conn.close()
+        if cur.rowcount:
+            return False
+        cur.execute("""
+            INSERT INTO academy_favorites (username, item_type, item_id, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (username, item_type, item_id, now))
     return True
 
 
 def list_favorites(username: str, item_type: str) -> list[str]:
-    conn = _connect()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT item_id FROM academy_favorites
-        WHERE username = ? AND item_type = ?
-        ORDER BY created_at DESC
-    """, (username, item_type))
-    rows = cur.fetchall()
-    conn.close()
+    with _tx() as cur:
+        cur.execute("""
+            SELECT item_id FROM academy_favorites
+            WHERE username = ? AND item_type = ?
+            ORDER BY created_at DESC
+        """, (username, item_type))
+        rows = cur.fetchall()
     return [r[0] for r in rows]
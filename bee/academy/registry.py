@@ -0,0 +1,64 @@
+# bee/academy/registry.py
+# Acesso ao conteúdo da Academy (dicas, perguntas, dicionário) por id e por tópico.
+# Os itens vêm de bee.academy.content: ids e tópicos saem do manifest, e cada arquivo de
+# tópico só é lido quando algum item dele é pedido. As páginas consultam aqui em vez de
+# varrer as listas.
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from . import content
+
+
+class AcademyRegistry:
+    """Lookups por id e por tópico em O(1), sem carregar o acervo inteiro."""
+
+    # ---- ids na ordem original (só manifest)
+    @property
+    def tip_ids(self) -> Tuple[str, ...]:
+        return content.ids("tips")
+
+    @property
+    def question_ids(self) -> Tuple[str, ...]:
+        # sorteio diário escolhe direto desta tupla, sem remontar a lista a cada render
+        return content.ids("questions")
+
+    # ---- por id
+    def tip(self, tid: str) -> Optional[dict]:
+        return content.get_item("tips", tid)
+
+    def question(self, qid: str) -> Optional[dict]:
+        return content.get_item("questions", qid)
+
+    def term(self, did: str) -> Optional[dict]:
+        return content.get_item("dictionary", did)
+
+    # ---- por tópico
+    def tips_in_topic(self, topic: str) -> Tuple[dict, ...]:
+        return content.load_topic("tips", topic)
+
+    def questions_in_topic(self, topic: str) -> Tuple[dict, ...]:
+        return content.load_topic("questions", topic)
+
+    def tip_topics(self) -> List[str]:
+        return content.topics("tips")
+
+    def question_topics(self) -> List[str]:
+        return content.topics("questions")
+
+    # ---- acervo completo (lê todos os tópicos; evite em caminho quente)
+    @property
+    def tips(self) -> Tuple[dict, ...]:
+        return content.load_all("tips")
+
+    @property
+    def questions(self) -> Tuple[dict, ...]:
+        return content.load_all("questions")
+
+    @property
+    def dictionary(self) -> Tuple[dict, ...]:
+        return content.load_all("dictionary")
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> AcademyRegistry:
+    return AcademyRegistry()
@@ -0,0 +1,82 @@
+# bee/academy/scheduler.py
+# Fila de revisão do quiz: heap por data de vencimento (SM-2 em progress.py).
+# Montada uma vez por sessão; escolher a próxima pergunta é olhar o topo do heap.
+import heapq
+import itertools
+from datetime import date
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Empates no mesmo dia: revisões, depois perguntas novas, depois as que acabou de errar
+_REVIEW, _NEW, _RELEARN = 0, 1, 2
+
+
+class QuizScheduler:
+    """Heap de (vencimento, prioridade, seq, qid) com invalidação preguiçosa.
+
+    Reagendar não procura a entrada antiga: empurra uma nova e marca a atual em
+    `_live`; entradas obsoletas são descartadas quando chegam ao topo.
+    """
+
+    def __init__(self, question_ids: Iterable[str], due_by_qid: Mapping[str, str],
+                 today: Optional[date] = None):
+        today_ord = (today or date.today()).toordinal()
+        self._seq = itertools.count()
+        self._live: Dict[str, Tuple[int, int, int]] = {}
+        heap: List[Tuple[int, int, int, str]] = []
+        for qid in question_ids:
+            due = due_by_qid.get(qid)
+            if due is None:
+                key = (today_ord, _NEW, next(self._seq))
+            else:
+                key = (_ordinal(due, today_ord), _REVIEW, next(self._seq))
+            self._live[qid] = key
+            heap.append((*key, qid))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def _clean_top(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][3]) != heap[0][:3]:
+            heapq.heappop(heap)
+
+    def peek(self) -> Optional[str]:
+        """Pergunta mais urgente (a que vence primeiro). Não remove da fila."""
+        self._clean_top()
+        return self._heap[0][3] if self._heap else None
+
+    def reschedule(self, qid: str, due: str) -> None:
+        """Depois de uma resposta: nova data vinda do SM-2."""
+        if qid not in self._live:
+            return
+        today_ord = date.today().toordinal()
+        due_ord = _ordinal(due, today_ord)
+        key = (due_ord, _RELEARN if due_ord <= today_ord else _REVIEW, next(self._seq))
+        self._live[qid] = key
+        heapq.heappush(self._heap, (*key, qid))
+        self._compact()
+
+    def defer(self, qid: str) -> None:
+        """Pulou sem responder: mesmo vencimento, mas vai para o fim dos empatados."""
+        key = self._live.get(qid)
+        if key is None:
+            return
+        key = (key[0], key[1], next(self._seq))
+        self._live[qid] = key
+        heapq.heappush(self._heap, (*key, qid))
+        self._compact()
+
+    def _compact(self) -> None:
+        # muitas entradas obsoletas: reconstrói para o heap não crescer sem limite
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(*key, qid) for qid, key in self._live.items()]
+            heapq.heapify(self._heap)
+
+
+def _ordinal(iso_day: str, default: int) -> int:
+    try:
+        return date.fromisoformat(str(iso_day)[:10]).toordinal()
+    except ValueError:
+        return default
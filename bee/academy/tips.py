@@ -1,14 +1,10 @@
 # bee/academy/tips.py
+# As dicas agora ficam em bee/academy/data/tips/ (ver bee.academy.content).
+# TIPS continua disponível para compatibilidade, carregado só quando alguém o acessa.
 
-TIPS = [
-    {"id": "t_reserva_001", "topic": "Planejamento", "text": "Antes de investir pesado, monte sua reserva de emergência (3 a 12 meses de custo fixo)."},
-    {"id": "t_regras_001", "topic": "Planejamento", "text": "Crie regras simples: aporte todo mês, diversifique e não mexa em pânico."},
-    {"id": "t_cdi_001", "topic": "Renda Fixa", "text": "CDB 100%+ do CDI com liquidez pode ser ótimo para reserva e caixa."},
-    {"id": "t_ipca_001", "topic": "Renda Fixa", "text": "IPCA+ é excelente para objetivos longos (aposentadoria, patrimônio). No curto prazo pode oscilar."},
-    {"id": "t_etf_001", "topic": "Renda Variável", "text": "ETFs ajudam a diversificar sem você precisar escolher várias ações."},
-    {"id": "t_fii_001", "topic": "FIIs", "text": "Dividendos de FII são legais, mas o preço oscila. Olhe também vacância e qualidade do portfólio."},
-    {"id": "t_risco_001", "topic": "Risco", "text": "Se um investimento promete retorno alto sem risco, desconfie. Normalmente é pegadinha."},
-    {"id": "t_taxas_001", "topic": "Fundos/Taxas", "text": "Taxas (admin/performance) importam MUITO no longo prazo. Compare antes de investir."},
-    {"id": "t_aporte_001", "topic": "Estratégia", "text": "Aporte mensal consistente costuma bater 'tentar acertar o timing' do mercado."},
-    {"id": "t_emocao_001", "topic": "Psicologia", "text": "O maior inimigo do investidor é o emocional: evite decisões no calor do momento."},
-]
+
+def __getattr__(name):
+    if name == "TIPS":
+        from .content import load_all
+        return list(load_all("tips"))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,125 @@
+# bee/amortization.py
+# Financiamento (SAC e Price) e "alugar e investir", mês a mês, em arrays.
+#
+#   schedule(400_000, 0.095, 360, "SAC")          -> parcela/juros/amortização/saldo (360,)
+#   schedule(400_000, [0.08, 0.095, 0.11], 360)   -> as mesmas chaves com shape (3, 360)
+#   compare(valor=500_000, entrada_pct=0.2, ...)  -> tabelas + trajetórias de patrimônio
+#
+# Nada de laço por mês: SAC e Price têm forma fechada para o saldo, e as duas carteiras
+# (quem compra investe quando o aluguel seria maior que a parcela; quem aluga investe a
+# entrada e a diferença) são recorrências lineares W_t = W_{t-1}(1+r) + c_t, resolvidas com
+# cumsum dos aportes descontados. Vários cenários de taxa entram como uma dimensão a mais
+# (broadcast), então varrer dezenas de taxas custa milissegundos. compare() é memoizado
+# pelos parâmetros; os arrays devolvidos são somente leitura porque são compartilhados.
+from functools import lru_cache
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+SYSTEMS = ("SAC", "Price")
+# chaves de compare() que têm uma linha por cenário de taxa
+_PER_SCENARIO = {"parcela", "juros", "amortizacao", "saldo", "patrimonio_comprador", "patrimonio_inquilino",
+                 "total_pago", "total_juros", "diferenca_final", "breakeven_mes", "taxas"}
+
+Rate = Union[float, Sequence[float], np.ndarray]
+
+
+def monthly_rate(annual: Rate) -> np.ndarray:
+    """Taxa anual efetiva -> mensal equivalente."""
+    return np.power(1.0 + np.asarray(annual, dtype=float), 1.0 / 12.0) - 1.0
+
+
+def schedule(principal: float, annual_rate: Rate, months: int, system: str = "SAC") -> Dict[str, np.ndarray]:
+    """Tabela de amortização. Taxa escalar -> arrays (months,); k taxas -> (k, months)."""
+    i = monthly_rate(annual_rate)
+    scalar = i.ndim == 0
+    i = np.atleast_1d(i)[:, None]                        # (k, 1)
+    t = np.arange(1, months + 1, dtype=float)[None, :]   # (1, n)
+    p = float(principal)
+
+    if system == "SAC":
+        amort = np.full((i.shape[0], months), p / months)
+        balance_before = p - amort * (t - 1)
+        interest = balance_before * i
+        payment = amort + interest
+        balance = balance_before - amort
+    elif system == "Price":
+        growth = np.power(1.0 + i, t)
+        zero = i == 0
+        safe_i = np.where(zero, 1.0, i)
+        pmt = np.where(zero, p / months, p * safe_i / (1.0 - np.power(1.0 + safe_i, -months)))
+        payment = np.broadcast_to(pmt, growth.shape).copy()
+        balance = np.where(zero, p - pmt * t, p * growth - pmt * (growth - 1.0) / safe_i)
+        balance_before = np.concatenate([np.full((i.shape[0], 1), p), balance[:, :-1]], axis=1)
+        interest = balance_before * i
+        amort = payment - interest
+    else:
+        raise ValueError(f"sistema desconhecido: {system!r} (use {', '.join(SYSTEMS)})")
+
+    balance = np.clip(balance, 0.0, None)  # resíduo de ponto flutuante no último mês
+    out = {"parcela": payment, "juros": interest, "amortizacao": amort, "saldo": balance}
+    return {k: v[0] for k, v in out.items()} if scalar else out
+
+
+def _grow(flows: np.ndarray, r_month: np.ndarray, initial: np.ndarray) -> np.ndarray:
+    """W_t = W_{t-1}(1+r) + flows_t, com W_0 = initial, para todos os meses de uma vez."""
+    t = np.arange(1, flows.shape[-1] + 1, dtype=float)
+    g = np.power(1.0 + r_month, t)                       # (1+r)^t
+    return g * (initial + np.cumsum(flows / g, axis=-1))
+
+
+def _readonly(d: Dict) -> Dict:
+    for v in d.values():
+        if isinstance(v, np.ndarray):
+            v.setflags(write=False)
+    return d
+
+
+@lru_cache(maxsize=256)
+def _compare(valor: float, entrada_pct: float, taxa_fin: tuple, anos: int, sistema: str, aluguel_pct: float,
+             reajuste_aluguel: float, valorizacao: float, taxa_inv: float, custos_compra_pct: float) -> Dict:
+    n = int(anos) * 12
+    entrada = valor * entrada_pct
+    custos = valor * custos_compra_pct
+    sched = schedule(valor - entrada, np.array(taxa_fin), n, sistema)   # (k, n)
+
+    t = np.arange(1, n + 1, dtype=float)
+    aluguel = valor * aluguel_pct * np.power(1.0 + reajuste_aluguel, np.floor((t - 1) / 12))
+    imovel = valor * np.power(1.0 + valorizacao, t / 12)
+    r = monthly_rate(taxa_inv)
+
+    parcela = sched["parcela"]
+    # cada um investe o que sobra em relação ao outro no mês
+    inquilino = _grow(np.clip(parcela - aluguel, 0.0, None), r, np.full((parcela.shape[0], 1), entrada + custos))
+    comprador_inv = _grow(np.clip(aluguel - parcela, 0.0, None), r, np.zeros((parcela.shape[0], 1)))
+    comprador = imovel - sched["saldo"] + comprador_inv
+
+    diff = comprador - inquilino
+    ahead = diff >= 0
+    # primeiro mês a partir do qual comprar fica à frente até o fim (0 = nunca)
+    tail_ok = np.flip(np.logical_and.accumulate(np.flip(ahead, axis=-1), axis=-1), axis=-1)
+    breakeven = np.where(tail_ok.any(axis=-1), tail_ok.argmax(axis=-1) + 1, 0)
+
+    return _readonly({
+        **sched, "aluguel": aluguel, "imovel": imovel,
+        "patrimonio_comprador": comprador, "patrimonio_inquilino": inquilino,
+        "total_pago": parcela.sum(axis=-1) + entrada + custos, "total_juros": sched["juros"].sum(axis=-1),
+        "diferenca_final": diff[:, -1], "breakeven_mes": breakeven,
+        "taxas": np.array(taxa_fin), "entrada": entrada, "custos": custos, "meses": n,
+    })
+
+
+def compare(valor: float, entrada_pct: float = 0.20, taxa_fin: Rate = 0.095, anos: int = 30, sistema: str = "SAC",
+            aluguel_pct: float = 0.004, reajuste_aluguel: float = 0.045, valorizacao: float = 0.045,
+            taxa_inv: float = 0.10, custos_compra_pct: float = 0.04) -> Dict:
+    """Comprar financiado x alugar e investir. Taxas anuais em fração; aluguel_pct ao mês sobre o valor.
+
+    taxa_fin pode ser uma lista (varredura): todos os arrays ganham a dimensão de cenários
+    na frente. Com taxa escalar, os arrays saem 1-D.
+    """
+    rates = tuple(float(x) for x in np.atleast_1d(np.asarray(taxa_fin, dtype=float)))
+    res = _compare(float(valor), float(entrada_pct), rates, int(anos), sistema, float(aluguel_pct),
+                   float(reajuste_aluguel), float(valorizacao), float(taxa_inv), float(custos_compra_pct))
+    if np.ndim(taxa_fin) > 0:
+        return res
+    return {k: (v[0] if k in _PER_SCENARIO else v) for k, v in res.items()}
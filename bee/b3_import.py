@@ -0,0 +1,256 @@
+# bee/b3_import.py
+# Importação de extratos da B3 (Área do Investidor, e o layout antigo do CEI), CSV ou XLSX.
+#
+#   Negociação -> operações no livro (bee.ledger), todas numa transação
+#   Posição    -> quantidade por ativo direto na carteira
+#
+# O arquivo é lido em blocos (CSV com chunksize, XLSX com openpyxl read_only) e cada bloco
+# já sai agregado por (data, ativo, compra/venda) num groupby: dez anos de notas viram
+# algumas milhares de linhas antes de tocar no banco. Tickers são normalizados uma vez por
+# código distinto, não por linha.
+import codecs
+import io
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .config import CARTEIRA_COLS
+from .ledger import opening_from, record_trades_bulk, ticker_keys
+from .market_data import normalize_ticker
+from .safe_imports import openpyxl
+from .schema import coerce_carteira, decimal_comma, parse_ptbr_number
+
+CHUNK_ROWS = 5000
+SOURCE = "b3"
+
+# cabeçalho normalizado (sem acento, minúsculo, só letras/dígitos) -> coluna interna
+_ALIASES: Dict[str, List[str]] = {
+    "data": ["datadonegocio", "datanegocio", "data", "datadaoperacao", "datapregao"],
+    "lado": ["tipodemovimentacao", "cv", "compravenda", "operacao", "natureza"],
+    "mercado": ["mercado"],
+    "ativo": ["codigodenegociacao", "codigo", "ativo", "ticker", "papel"],
+    "qtd": ["quantidade", "qtd", "quantidadedisponivel"],
+    "preco": ["preco", "precor", "precounitario", "precodefechamento", "precomedio"],
+    "valor": ["valor", "valortotalr", "valortotal", "valordaoperacao", "valoratualizado"],
+}
+_SIDES = {"compra": "BUY", "c": "BUY", "venda": "SELL", "v": "SELL"}
+# opções, termo e futuro não são posição em ações/FIIs
+_SKIP_MARKETS = r"op[cç]|termo|futuro"
+_FRACTIONAL = re.compile(r"^([A-Z]{4}\d{1,2})F$")
+
+
+class StatementError(ValueError):
+    """Arquivo que não parece um extrato de negociação/posição da B3."""
+
+
+# --------------------------------------------------------------------------------------
+# Leitura em blocos
+# --------------------------------------------------------------------------------------
+def _key(col) -> str:
+    txt = unicodedata.normalize("NFKD", str(col)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", txt.lower())
+
+
+def _column_map(columns) -> Dict[str, str]:
+    keys = {_key(c): c for c in columns}
+    out = {}
+    for field, aliases in _ALIASES.items():
+        for alias in aliases:
+            if alias in keys:
+                out[field] = keys[alias]
+                break
+    return out
+
+
+def _sniff(raw: bytes) -> Tuple[str, str]:
+    """(encoding, separador) pela primeira linha."""
+    try:
+        # final=False: o pedaço pode terminar no meio de um caractere de 2 bytes
+        head, encoding = codecs.getincrementaldecoder("utf-8-sig")().decode(raw, final=False), "utf-8-sig"
+    except UnicodeDecodeError:
+        head, encoding = raw.decode("latin-1"), "latin-1"
+    first = head.splitlines()[0] if head else ""
+    return encoding, (";" if first.count(";") > first.count(",") else ",")
+
+
+def _csv_chunks(buf, chunksize: int) -> Iterator[pd.DataFrame]:
+    raw = buf.read(4096)
+    buf.seek(0)
+    encoding, sep = _sniff(raw)
+    # tudo como texto: a convenção "1.234,56" x "1234.56" é decidida uma vez para o arquivo
+    yield from pd.read_csv(buf, sep=sep, encoding=encoding, dtype=str, chunksize=chunksize)
+
+
+def _xlsx_chunks(buf, chunksize: int) -> Iterator[pd.DataFrame]:
+    if not openpyxl:
+        raise StatementError("openpyxl não instalado: salve o extrato como CSV")
+    wb = openpyxl.load_workbook(buf, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next((r for r in rows if r and any(v is not None for v in r)), None)
+        if header is None:
+            return
+        block = []
+        for r in rows:
+            block.append(r)
+            if len(block) >= chunksize:
+                yield pd.DataFrame(block, columns=header)
+                block = []
+        if block:
+            yield pd.DataFrame(block, columns=header)
+    finally:
+        wb.close()
+
+
+def iter_chunks(file, name: str = "", chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Blocos crus do arquivo (caminho, bytes ou UploadedFile do Streamlit)."""
+    if isinstance(file, str):
+        with open(file, "rb") as fh:
+            yield from iter_chunks(fh, name or file, chunksize)
+        return
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    name = (name or getattr(file, "name", "")).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        yield from _xlsx_chunks(file, chunksize)
+    else:
+        yield from _csv_chunks(file, chunksize)
+
+
+# --------------------------------------------------------------------------------------
+# Normalização vetorizada
+# --------------------------------------------------------------------------------------
+def normalize_codes(codes: pd.Series) -> pd.Series:
+    """Código B3 -> ticker do app (PETR4F -> PETR4.SA), uma chamada por código distinto."""
+    clean = codes.fillna("").astype(str).str.strip().str.upper().str.replace(_FRACTIONAL, r"\1", regex=True)
+    uniq = {c: normalize_ticker(c, "Ação/ETF", "BRL") for c in clean.unique()}
+    return clean.map(uniq)
+
+
+_NUMERIC = ("qtd", "preco", "valor")
+
+
+def _file_convention(chunk: pd.DataFrame, cols: Dict[str, str]) -> Optional[bool]:
+    """Convenção decimal pelas colunas numéricas juntas: "35.500,00" no Valor faz o "1.000"
+    da Quantidade ser mil, não 1,0. None enquanto nenhum texto decidir."""
+    vals = pd.concat([chunk[cols[f]] for f in _NUMERIC if f in cols], ignore_index=True).dropna()
+    text = vals[vals.map(type).eq(str)]
+    return decimal_comma(text) if not text.empty else None
+
+
+def _numbers(chunk: pd.DataFrame, cols: Dict[str, str], field: str, comma: Optional[bool]) -> Optional[pd.Series]:
+    return parse_ptbr_number(chunk[cols[field]], comma=comma) if field in cols else None
+
+
+def _trades_chunk(chunk: pd.DataFrame, cols: Dict[str, str], comma: Optional[bool]) -> pd.DataFrame:
+    if "mercado" in cols:
+        chunk = chunk[~chunk[cols["mercado"]].astype(str).str.lower().str.contains(_SKIP_MARKETS, regex=True)]
+    qtd = _numbers(chunk, cols, "qtd", comma)
+    valor = _numbers(chunk, cols, "valor", comma)
+    if "preco" in cols:
+        by_price = qtd * _numbers(chunk, cols, "preco", comma)
+        valor = by_price if valor is None else valor.where(valor != 0, by_price)
+    df = pd.DataFrame({
+        "data": pd.to_datetime(chunk[cols["data"]], dayfirst=True, errors="coerce").dt.normalize(),
+        "ativo": normalize_codes(chunk[cols["ativo"]]),
+        "kind": chunk[cols["lado"]].astype(str).str.strip().str.lower().map(_SIDES),
+        "qtd": qtd.abs(),
+        "valor": valor.abs(),
+    })
+    df = df.dropna(subset=["data", "kind"])
+    df = df[(df["ativo"] != "") & (df["qtd"] > 0)]
+    return df.groupby(["data", "ativo", "kind"], sort=False, as_index=False)[["qtd", "valor"]].sum()
+
+
+def _positions_chunk(chunk: pd.DataFrame, cols: Dict[str, str], comma: Optional[bool]) -> pd.DataFrame:
+    qtd = _numbers(chunk, cols, "qtd", comma)
+    preco = _numbers(chunk, cols, "preco", comma)
+    if preco is None:
+        valor = _numbers(chunk, cols, "valor", comma)
+        preco = (valor / qtd.where(qtd > 0)) if valor is not None else qtd * 0.0
+    df = pd.DataFrame({"ativo": normalize_codes(chunk[cols["ativo"]]), "qtd": qtd, "preco": preco.fillna(0.0)})
+    return df[(df["ativo"] != "") & (df["qtd"] > 0)]
+
+
+def parse_statement(file, name: str = "", chunksize: int = CHUNK_ROWS) -> Tuple[str, pd.DataFrame, Dict]:
+    """Lê o extrato -> (tipo, frame, resumo).
+
+    tipo "negociacao": frame data/ativo/kind/qtd/preco, já agregado por dia;
+    tipo "posicao":    frame ativo/qtd/preco (preço de fechamento), somando instituições.
+    """
+    kind, cols, parts, raw_rows, comma = None, {}, [], 0, None
+    for chunk in iter_chunks(file, name, chunksize):
+        chunk = chunk.dropna(how="all")
+        if kind is None:
+            cols = _column_map(chunk.columns)
+            if {"data", "lado", "ativo", "qtd"} <= cols.keys() and ("valor" in cols or "preco" in cols):
+                kind = "negociacao"
+            elif {"ativo", "qtd"} <= cols.keys():
+                kind = "posicao"
+            else:
+                raise StatementError("colunas não reconhecidas: esperava o extrato de Negociação ou de Posição da B3")
+        raw_rows += len(chunk)
+        if comma is None:
+            comma = _file_convention(chunk, cols)
+        parse = _trades_chunk if kind == "negociacao" else _positions_chunk
+        parts.append(parse(chunk, cols, comma))
+
+    if kind is None:
+        raise StatementError("arquivo vazio")
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    if kind == "negociacao":
+        # blocos diferentes podem ter o mesmo (dia, ativo, lado): agrega de novo
+        df = df.groupby(["data", "ativo", "kind"], as_index=False)[["qtd", "valor"]].sum()
+        df["preco"] = df["valor"] / df["qtd"]
+        df = df.sort_values(["data", "kind"]).drop(columns="valor").reset_index(drop=True)
+    else:
+        df = df.groupby("ativo", as_index=False).agg(qtd=("qtd", "sum"), preco=("preco", "max"))
+    summary = {"tipo": kind, "linhas": raw_rows, "registros": len(df), "ativos": int(df["ativo"].nunique())}
+    if kind == "negociacao" and not df.empty:
+        summary["de"], summary["ate"] = df["data"].min().date(), df["data"].max().date()
+    return kind, df, summary
+
+
+# --------------------------------------------------------------------------------------
+# Gravação
+# --------------------------------------------------------------------------------------
+def import_trades(username: str, trades: pd.DataFrame, carteira_df: Optional[pd.DataFrame] = None) -> int:
+    """Operações agregadas -> livro, numa transação. Reimportar o mesmo período substitui.
+
+    carteira_df (manual): ativo que ainda não está no livro parte do saldo que já tinha ali,
+    senão o extrato de um período só esconderia as ações de antes (e venda sem compra falharia).
+    """
+    records = trades.assign(tipo="Ação/ETF", moeda="BRL").to_dict("records")
+    openings = {}
+    for ativo in trades["ativo"].unique():
+        opening = opening_from(carteira_df, ativo, "Ação/ETF", "BRL")
+        if opening:
+            openings[ativo] = opening
+    return record_trades_bulk(username, records, source=SOURCE, replace=True, openings=openings)
+
+
+def merge_holdings(carteira_df: pd.DataFrame, positions: pd.DataFrame) -> pd.DataFrame:
+    """Posição da B3 -> carteira: quantidade do extrato, preço médio mantido quando o ativo já existia.
+
+    Ativo novo entra com o preço de fechamento do extrato como preço médio (a B3 não informa
+    custo); a Obs avisa para ajustar. Compara pelo ticker do provedor ("PETR4" da carteira é o
+    "PETR4.SA" do extrato) e grava ativo novo sem o ".SA", como a carteira manual guarda.
+    """
+    base = coerce_carteira(carteira_df).astype({"Tipo": object, "Moeda": object})
+    pos = positions.set_index("ativo")
+    keys = ticker_keys(base) if not base.empty else pd.Series(dtype=object)
+    in_statement = keys.isin(pos.index)
+
+    updated = base[in_statement].assign(_k=keys[in_statement]).drop_duplicates("_k")
+    updated["Qtd"] = pos.loc[updated["_k"], "qtd"].to_numpy()
+    fresh = pos[~pos.index.isin(keys)]
+    bare = fresh.index.str.replace(r"\.SA$", "", regex=True)
+    new = pd.DataFrame({
+        "Tipo": "Ação/ETF", "Ativo": bare, "Nome": bare,
+        "Qtd": fresh["qtd"].to_numpy(), "Preco_Medio": fresh["preco"].to_numpy(),
+        "Moeda": "BRL", "Obs": "importado da B3: confira o preço médio",
+    }, columns=CARTEIRA_COLS)
+    out = pd.concat([base[~in_statement], updated.drop(columns="_k"), new], ignore_index=True)
+    return coerce_carteira(out)
@@ -1,9 +1,8 @@
 import streamlit as st
 from datetime import datetime
 
-from .safe_imports import yf
 from .formatters import fmt_ptbr_number, fmt_money_brl, fmt_money_usd
-from .market_data import yf_last_and_prev_close
+from .market_data import market_available, yf_last_and_prev_close
 
 def nav_btn(label, key_page):
     st.sidebar.markdown("<div class='navbtn'>", unsafe_allow_html=True)
@@ -41,7 +40,7 @@ def sidebar_market_monitor():
         btc_usd_val = btc_usd_pct = None
         btc_brl_val = btc_brl_pct = None
 
-        if yf is not None:
+        if market_available():
             tickers_monitor = ["^BVSP", "BRL=X", "BTC-USD", "BTC-BRL"]
             snap = yf_last_and_prev_close(tickers_monitor)
 
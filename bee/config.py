@@ -9,8 +9,29 @@ PROJECT_DIR = os.path.dirname(BEE_DIR)
 ASSETS_DIR = os.path.join(PROJECT_DIR, "assets")
 LOGO_PATH = os.path.join(ASSETS_DIR, "logo.png")
 
+# conteúdo da Academy (dicas, perguntas, dicionário); pode apontar para fora do código
+ACADEMY_DATA_DIR = os.environ.get("BEE_ACADEMY_DATA", os.path.join(BEE_DIR, "academy", "data"))
+
 # mantém igual ao teu original (DB na raiz)
-DB_FILE = os.path.join(PROJECT_DIR, "bee_database.db")
+DB_FILE = os.environ.get("BEE_DB_FILE", os.path.join(PROJECT_DIR, "bee_database.db"))
 
 CARTEIRA_COLS = ["Tipo", "Ativo", "Nome", "Qtd", "Preco_Medio", "Moeda", "Obs"]
 GASTOS_COLS = ["Data", "Categoria", "Descricao", "Tipo", "Valor", "Pagamento"]
+
+# profiling (bee/profiling.py): desligado por padrão (BEE_PROFILE=1 liga), tamanho do buffer e export em JSONL
+PROFILE_ENABLED = os.environ.get("BEE_PROFILE", "0") not in ("0", "false", "False", "")
+PROFILE_BUFFER = int(os.environ.get("BEE_PROFILE_BUFFER", "5000"))
+PROFILE_JSONL = os.environ.get("BEE_PROFILE_JSONL", "")
+
+# usuários que veem a tela de admin (separados por vírgula)
+ADMIN_USERS = {u.strip() for u in os.environ.get("BEE_ADMINS", "").split(",") if u.strip()}
+
+# dados de mercado (bee/providers): "yahoo" ou URL de um provedor HTTP (ex.: o stand-in local)
+MARKET_PROVIDER = os.environ.get("BEE_MARKET_PROVIDER", "yahoo")
+# cache SQLite das respostas do provedor; vazio desliga
+MARKET_CACHE_FILE = os.environ.get("BEE_MARKET_CACHE", os.path.join(PROJECT_DIR, "market_cache.db"))
+# agendador das chamadas ao provedor (bee/providers/scheduler.py)
+MARKET_RATE = float(os.environ.get("BEE_MARKET_RATE", "2"))          # chamadas/s (0 = sem limite)
+MARKET_BURST = int(os.environ.get("BEE_MARKET_BURST", "5"))
+MARKET_BATCH_WINDOW_MS = float(os.environ.get("BEE_MARKET_BATCH_WINDOW_MS", "25"))
+MARKET_RETRIES = int(os.environ.get("BEE_MARKET_RETRIES", "3"))
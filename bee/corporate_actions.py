@@ -0,0 +1,356 @@
+# bee/corporate_actions.py
+# Proventos e eventos societários: dividendos/JCP, desdobramentos, grupamentos e bonificações.
+#
+# Cada ticker é buscado inteiro uma vez; depois só a janela nova (desde o último dia já
+# conferido, com folga), no máximo uma vez por MAX_AGE. Tudo fica no SQLite do app:
+#
+#   corporate_actions(ticker, data, kind, value)    DIV = valor por ação, SPLIT = fator
+#   actions_sync(ticker, checked_at, checked_through)
+#   split_baseline(username, ativo, since)          carteira manual já reflete eventos até `since`
+#
+# A renderização só lê daqui (refresh_in_background busca numa thread). Desdobramento
+# novo recalcula as posições do livro de operações (bee.ledger) e ajusta Qtd/Preco_Medio
+# das linhas manuais da carteira.
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from bee.config import DB_FILE
+except Exception:
+    DB_FILE = "bee_database.db"
+
+log = logging.getLogger(__name__)
+
+MAX_AGE = 24 * 3600
+# provedores às vezes publicam o evento dias depois da data-com
+_OVERLAP_DAYS = 10
+_CHUNK = 500
+
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = set()
+_REFRESH_LOCK = threading.Lock()
+_refreshing: set = set()
+
+
+def _connect():
+    return sqlite3.connect(DB_FILE)
+
+
+def create_tables(cur) -> None:
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS corporate_actions (
+            ticker TEXT NOT NULL,
+            data TEXT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('DIV', 'SPLIT')),
+            value REAL NOT NULL,
+            PRIMARY KEY (ticker, kind, data)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS actions_sync (
+            ticker TEXT PRIMARY KEY,
+            checked_at REAL NOT NULL,
+            checked_through TEXT NOT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS split_baseline (
+            username TEXT NOT NULL,
+            ativo TEXT NOT NULL,
+            since TEXT NOT NULL,
+            PRIMARY KEY (username, ativo)
+        )
+    """)
+
+
+def init_actions_db():
+    conn = _connect()
+    create_tables(conn.cursor())
+    conn.commit()
+    conn.close()
+    with _INIT_LOCK:
+        _INITIALIZED.add(DB_FILE)
+
+
+@contextmanager
+def _tx():
+    if DB_FILE not in _INITIALIZED:
+        init_actions_db()
+    conn = _connect()
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _chunks(items: Sequence) -> Iterable[Sequence]:
+    for i in range(0, len(items), _CHUNK):
+        yield items[i:i + _CHUNK]
+
+
+# --------------------------------------------------------------------------------------
+# Leitura
+# --------------------------------------------------------------------------------------
+def splits_for(cur, ticker: str, after: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[str, float]]:
+    """[(data, fator)] em ordem, com data em (after, until]. Usa o cursor de quem chama."""
+    sql = "SELECT data, value FROM corporate_actions WHERE ticker = ? AND kind = 'SPLIT'"
+    params: list = [ticker]
+    if after:
+        sql += " AND data > ?"
+        params.append(after)
+    if until:
+        sql += " AND data <= ?"
+        params.append(until)
+    cur.execute(sql + " ORDER BY data", params)
+    return [(d, float(v)) for d, v in cur.fetchall()]
+
+
+def load_actions(tickers: Iterable[str], kind: Optional[str] = None, since=None):
+    """DataFrame ticker/data/kind/value (data como datetime) dos tickers pedidos."""
+    import pandas as pd  # Lazy import
+
+    tickers = sorted({t for t in tickers if t})
+    rows = []
+    with _tx() as cur:
+        for part in _chunks(tickers):
+            sql = f"SELECT ticker, data, kind, value FROM corporate_actions WHERE ticker IN ({','.join('?' * len(part))})"
+            params = list(part)
+            if kind:
+                sql += " AND kind = ?"
+                params.append(kind)
+            if since:
+                sql += " AND data >= ?"
+                params.append(str(since)[:10])
+            cur.execute(sql, params)
+            rows += cur.fetchall()
+    df = pd.DataFrame(rows, columns=["ticker", "data", "kind", "value"])
+    df["data"] = pd.to_datetime(df["data"])
+    return df.sort_values(["ticker", "data"], ignore_index=True)
+
+
+# --------------------------------------------------------------------------------------
+# Atualização (rede)
+# --------------------------------------------------------------------------------------
+def stale_tickers(tickers: Iterable[str], max_age: float = MAX_AGE) -> List[str]:
+    tickers = sorted({t for t in tickers if t})
+    fresh = set()
+    cutoff = time.time() - max_age
+    with _tx() as cur:
+        for part in _chunks(tickers):
+            cur.execute(f"SELECT ticker FROM actions_sync WHERE checked_at >= ? "
+                        f"AND ticker IN ({','.join('?' * len(part))})", [cutoff, *part])
+            fresh.update(r[0] for r in cur.fetchall())
+    return [t for t in tickers if t not in fresh]
+
+
+def store_actions(ticker: str, events: List[dict], checked_through: Optional[str] = None) -> List[dict]:
+    """Grava os eventos (idempotente) e marca o ticker como conferido. Devolve só os inéditos."""
+    new = []
+    with _tx() as cur:
+        for e in events:
+            cur.execute("INSERT OR IGNORE INTO corporate_actions (ticker, data, kind, value) VALUES (?, ?, ?, ?)",
+                        (ticker, e["data"], e["kind"], float(e["value"])))
+            if cur.rowcount:
+                new.append(e)
+        cur.execute("""
+            INSERT INTO actions_sync (ticker, checked_at, checked_through) VALUES (?, ?, ?)
+            ON CONFLICT(ticker) DO UPDATE SET checked_at = excluded.checked_at,
+                                              checked_through = excluded.checked_through
+        """, (ticker, time.time(), checked_through or date.today().isoformat()))
+    return new
+
+
+def refresh_actions(tickers: Iterable[str], max_age: float = MAX_AGE) -> Dict[str, int]:
+    """Busca o que venceu -> {ticker: eventos novos}. Falha de um ticker não para os outros."""
+    from .providers import ProviderError, get_provider  # Lazy import
+
+    todo = stale_tickers(tickers, max_age)
+    if not todo:
+        return {}
+    with _tx() as cur:
+        since = {}
+        for part in _chunks(todo):
+            cur.execute(f"SELECT ticker, checked_through FROM actions_sync "
+                        f"WHERE ticker IN ({','.join('?' * len(part))})", list(part))
+            since.update(cur.fetchall())
+
+    provider = get_provider()
+    out, split_tickers = {}, []
+    for t in todo:
+        start = None
+        if t in since:
+            start = (date.fromisoformat(since[t]) - timedelta(days=_OVERLAP_DAYS)).isoformat()
+        try:
+            events = provider.actions(t, start)
+        except ProviderError as e:
+            log.warning("proventos de %s: %s", t, e)
+            continue
+        new = store_actions(t, events)
+        out[t] = len(new)
+        if any(e["kind"] == "SPLIT" for e in new):
+            split_tickers.append(t)
+
+    if split_tickers:
+        from .ledger import rebuild_ticker  # Lazy import (ledger importa este módulo)
+        for t in split_tickers:
+            rebuild_ticker(t)
+    return out
+
+
+def refresh_in_background(tickers: Iterable[str], max_age: float = MAX_AGE) -> bool:
+    """Dispara refresh_actions numa thread se houver algo vencido. Não bloqueia a tela."""
+    tickers = [t for t in dict.fromkeys(tickers) if t]
+    with _REFRESH_LOCK:
+        tickers = [t for t in tickers if t not in _refreshing]
+        if not tickers:
+            return False
+        _refreshing.update(tickers)
+
+    def run():
+        try:
+            refresh_actions(tickers, max_age)
+        except Exception as e:  # nunca derruba o app por causa de provento
+            log.warning("atualização de proventos falhou: %s", e)
+        finally:
+            with _REFRESH_LOCK:
+                _refreshing.difference_update(tickers)
+
+    threading.Thread(target=run, name="bee-actions", daemon=True).start()
+    return True
+
+
+# --------------------------------------------------------------------------------------
+# Carteira
+# --------------------------------------------------------------------------------------
+def _yf_tickers(df):
+    from .market_data import normalize_ticker  # Lazy import (streamlit)
+
+    keys = list(zip(df["Ativo"].astype(str), df["Tipo"].astype(str), df["Moeda"].astype(str)))
+    uniq = {k: normalize_ticker(*k) for k in set(keys)}
+    return [uniq[k] for k in keys]
+
+
+def apply_pending_splits(username: str, carteira_df, skip: Iterable[str] = ()):
+    """Aplica nas linhas manuais os desdobramentos ocorridos depois que o ativo entrou na carteira.
+
+    Devolve (carteira, [(ativo, fator)], marcas). As marcas [(ativo, data)] avançam o split_baseline
+    e devem ser gravadas na mesma transação da carteira ajustada (save_split_baseline), senão um
+    desdobramento é aplicado duas vezes ou nenhuma. Ativos em `skip` (tickers do provedor, os do
+    livro de operações) já saem ajustados pelas posições. Ativo visto pela primeira vez só marca a
+    data de hoje, gravada aqui mesmo (a carteira não muda).
+    """
+    import numpy as np  # Lazy import
+
+    if carteira_df is None or carteira_df.empty:
+        return carteira_df, [], []
+    skip = {s.upper() for s in skip}
+    tickers = _yf_tickers(carteira_df)
+    manual = np.array([t not in skip for t in tickers], dtype=bool)
+    wanted = sorted({t for t, m in zip(tickers, manual) if m and t})
+    if not wanted:
+        return carteira_df, [], []
+
+    today = date.today().isoformat()
+    factors: Dict[str, float] = {}
+    with _tx() as cur:
+        baseline = {}
+        for part in _chunks(wanted):
+            cur.execute(f"SELECT ativo, since FROM split_baseline WHERE username = ? "
+                        f"AND ativo IN ({','.join('?' * len(part))})", [username, *part])
+            baseline.update(cur.fetchall())
+        first_seen, marks = [], []
+        for t in wanted:
+            if t not in baseline:
+                first_seen.append((t, today))
+                continue
+            splits = splits_for(cur, t, after=baseline[t])
+            if splits:
+                factors[t] = float(np.prod([f for _, f in splits]))
+                marks.append((t, splits[-1][0]))
+        save_split_baseline(cur, username, first_seen)
+
+    if not factors:
+        return carteira_df, [], []
+    df = carteira_df.copy()
+    f = np.where(manual, [factors.get(t, 1.0) for t in tickers], 1.0)
+    df["Qtd"] = df["Qtd"].to_numpy(dtype=float) * f
+    df["Preco_Medio"] = df["Preco_Medio"].to_numpy(dtype=float) / f
+    return df, sorted(factors.items()), marks
+
+
+def save_split_baseline(cur, username: str, marks: Iterable[Tuple[str, str]]) -> None:
+    """Grava as marcas [(ativo, data)] com o cursor de quem chama (ex.: a transação da carteira)."""
+    marks = list(marks)
+    if not marks:
+        return
+    create_tables(cur)
+    cur.executemany("""
+        INSERT INTO split_baseline (username, ativo, since) VALUES (?, ?, ?)
+        ON CONFLICT(username, ativo) DO UPDATE SET since = excluded.since
+    """, [(username, t, since) for t, since in marks])
+
+
+def trailing_income(df_calc, days: int = 365):
+    """Proventos dos últimos `days` dias por linha (join vetorizado por ticker), em BRL.
+
+    Espera o frame de atualizar_precos_carteira_memory (Ticker_YF, Preco_Atual, Preco_Atual_BRL).
+    Acrescenta Proventos_12m_BRL e DY_12m_Pct.
+    """
+    import numpy as np  # Lazy import
+
+    df = df_calc.copy()
+    if df.empty:
+        df["Proventos_12m_BRL"], df["DY_12m_Pct"] = [], []
+        return df
+    divs = load_actions(df["Ticker_YF"].unique(), kind="DIV", since=date.today() - timedelta(days=days))
+    per_share = df["Ticker_YF"].map(divs.groupby("ticker")["value"].sum()).fillna(0.0).to_numpy(dtype=float)
+    price = df["Preco_Atual"].to_numpy(dtype=float)
+    has_price = price > 0
+    fx = np.divide(df["Preco_Atual_BRL"].to_numpy(dtype=float), price, out=np.zeros_like(price), where=has_price)
+    df["Proventos_12m_BRL"] = df["Qtd"].to_numpy(dtype=float) * per_share * fx
+    df["DY_12m_Pct"] = np.divide(per_share * 100, price, out=np.zeros_like(price), where=has_price)
+    return df
+
+
+def received_income(username: str):
+    """Proventos efetivamente recebidos por ativo do livro de operações (na moeda do ativo).
+
+    Quantidade na data-com = compras - vendas anteriores a ela, em ações de hoje (os
+    dividendos do provedor já vêm ajustados por desdobramento). Dois merge_asof, sem loop.
+    """
+    import pandas as pd  # Lazy import
+
+    from .ledger import list_trades  # Lazy import (ledger importa este módulo)
+
+    trades = pd.DataFrame(list_trades(username, limit=-1))
+    if trades.empty:
+        return pd.Series(dtype=float, name="recebido")
+    trades = trades[trades["kind"].isin(["BUY", "SELL"])].rename(columns={"ativo": "ticker"})
+    trades["data"] = pd.to_datetime(trades["data"])
+    trades = trades.sort_values("data", kind="stable")
+    events = load_actions(trades["ticker"].unique())
+    splits = events[events["kind"] == "SPLIT"].sort_values("data")
+    divs = events[events["kind"] == "DIV"].sort_values("data")
+    if divs.empty:
+        return pd.Series(dtype=float, name="recebido")
+
+    # fator de cada operação para ações de hoje = produto dos desdobramentos depois dela
+    splits = splits.assign(after=splits.iloc[::-1].groupby("ticker")["value"].cumprod().iloc[::-1])
+    trades = pd.merge_asof(trades, splits[["ticker", "data", "after"]], on="data", by="ticker",
+                           direction="forward", allow_exact_matches=False)
+    signed = trades["qtd"].where(trades["kind"] == "BUY", -trades["qtd"]) * trades["after"].fillna(1.0)
+    trades["held"] = signed.groupby(trades["ticker"]).cumsum()
+
+    held = pd.merge_asof(divs, trades[["ticker", "data", "held"]], on="data", by="ticker",
+                         direction="backward", allow_exact_matches=False)
+    income = (held["held"].fillna(0.0).clip(lower=0) * held["value"]).groupby(held["ticker"]).sum()
+    return income.rename("recebido")
@@ -1,6 +1,10 @@
 import sqlite3
 import hashlib
-from typing import Dict, List, Tuple, Optional
+import json
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple, Optional
+
+from bee.profiling import timed
 
 # Puxa DB_FILE do seu bee/config.py
 try:
@@ -25,6 +29,7 @@ def hash_password(password: str) -> str:
 # --------------------------------------------------------------------------------------
 # Init DB
 # --------------------------------------------------------------------------------------
+@timed()
 def init_db(db_file: Optional[str] = None):
     """Cria todas as tabelas necessárias (idempotente)."""
     conn = _connect(db_file)
@@ -190,13 +195,138 @@ def init_db(db_file: Optional[str] = None):
                   1
               )
               """)
+    # 7. Gastos (uma linha por transação) + índice full-text das descrições
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS gastos (
+            tx_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            data TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            descricao TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            valor REAL NOT NULL,
+            pagamento TEXT NOT NULL
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_gastos_user_data ON gastos (username, data, tx_id)")
+    _init_gastos_fts(c)
+
+    # --- MIGRATION: gastos_json (blob por usuário) -> tabela gastos ---
+    _migrate_gastos_json(c)
+
     conn.commit()
     conn.close()
 
 
+# rowid do índice = (dia juliano << 40) | tx_id: ORDER BY rowid DESC já sai por data e o
+# FTS5 para no LIMIT. "dono" guarda um token por usuário ('u' + hex do username).
+_FTS_ROWID = "((CAST(coalesce(julianday({t}.data), 0) AS INTEGER) << 40) | {t}.tx_id)"
+_FTS_DONO = "('u' || hex({t}.username))"
+_FTS_TX_MASK = (1 << 40) - 1
+
+
+def _fts_row(t: str) -> str:
+    return f"{_FTS_ROWID.format(t=t)}, {t}.descricao, {t}.categoria, {_FTS_DONO.format(t=t)}"
+
+
+def _init_gastos_fts(c) -> None:
+    """FTS5 sem conteúdo próprio (contentless) sobre gastos, mantido por triggers."""
+    c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'gastos_fts'")
+    row = c.fetchone()
+    if row and "dono" in (row[0] or ""):
+        return
+    if row:
+        # --- MIGRATION: índice antigo (global, rowid = tx_id) -> um token por usuário ---
+        for trg in ("gastos_fts_ai", "gastos_fts_ad", "gastos_fts_au"):
+            c.execute(f"DROP TRIGGER IF EXISTS {trg}")
+        c.execute("DROP TABLE gastos_fts")
+    try:
+        c.execute("""
+            CREATE VIRTUAL TABLE gastos_fts USING fts5(
+                descricao, categoria, dono,
+                content='', prefix='1 2 3 4 5 6',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return  # SQLite sem FTS5: search_gastos_db cai no LIKE
+
+    cols = "rowid, descricao, categoria, dono"
+    c.execute(f"""
+        CREATE TRIGGER gastos_fts_ai AFTER INSERT ON gastos BEGIN
+            INSERT INTO gastos_fts ({cols}) VALUES ({_fts_row("new")});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER gastos_fts_ad AFTER DELETE ON gastos BEGIN
+            INSERT INTO gastos_fts (gastos_fts, {cols}) VALUES ('delete', {_fts_row("old")});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER gastos_fts_au AFTER UPDATE OF data, username, descricao, categoria ON gastos BEGIN
+            INSERT INTO gastos_fts (gastos_fts, {cols}) VALUES ('delete', {_fts_row("old")});
+            INSERT INTO gastos_fts ({cols}) VALUES ({_fts_row("new")});
+        END
+    """)
+    c.execute(f"INSERT INTO gastos_fts ({cols}) SELECT {_fts_row('gastos')} FROM gastos")
+
+
+def _iso_day(value) -> Optional[str]:
+    """Normaliza datas vindas do JSON antigo (ISO, dd/mm/aaaa ou epoch ms) para AAAA-MM-DD."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(float(value) / 1000.0, tz=timezone.utc).strftime("%Y-%m-%d")
+        except (OverflowError, OSError, ValueError):
+            return None
+    txt = str(value).strip()
+    for fmt, size in (("%Y-%m-%d", 10), ("%d/%m/%Y", 10)):
+        try:
+            return datetime.strptime(txt[:size], fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _to_float(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    txt = str(value or "").replace("R$", "").strip()
+    if "," in txt:
+        txt = txt.replace(".", "").replace(",", ".")
+    try:
+        return float(txt)
+    except ValueError:
+        return 0.0
+
+
+def _migrate_gastos_json(c) -> None:
+    c.execute("SELECT username, gastos_json FROM user_data WHERE gastos_json IS NOT NULL")
+    pending = c.fetchall()
+    for username, g_json in pending:
+        try:
+            records = json.loads(g_json) if g_json else []
+        except ValueError:
+            records = []
+        rows = []
+        for r in records:
+            day = _iso_day(r.get("Data"))
+            if day is None:
+                continue
+            rows.append((username, day, str(r.get("Categoria") or "Outros"), str(r.get("Descricao") or ""),
+                         str(r.get("Tipo") or "Saída"), _to_float(r.get("Valor")), str(r.get("Pagamento") or "Outros")))
+        c.executemany("""
+            INSERT INTO gastos (username, data, categoria, descricao, tipo, valor, pagamento)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        c.execute("UPDATE user_data SET gastos_json = NULL WHERE username = ?", (username,))
+
+
 # --------------------------------------------------------------------------------------
 # Users & Auth
 # --------------------------------------------------------------------------------------
+@timed()
 def create_user(username: str, password: str, name: str, security_word: str, db_file: Optional[str] = None) -> bool:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -208,8 +338,8 @@ def create_user(username: str, password: str, name: str, security_word: str, db_
         c.execute("INSERT INTO users (username, password, name, security_word) VALUES (?, ?, ?, ?)",
                   (username, pass_hash, name, sec_hash))
 
-        c.execute("INSERT INTO user_data (username, carteira_json, gastos_json) VALUES (?, ?, ?)",
-                  (username, "[]", "[]"))
+        c.execute("INSERT INTO user_data (username, carteira_json, gastos_json) VALUES (?, ?, NULL)",
+                  (username, "[]"))
         conn.commit()
         return True
     except sqlite3.IntegrityError:
@@ -218,6 +348,7 @@ def create_user(username: str, password: str, name: str, security_word: str, db_
         conn.close()
 
 
+@timed()
 def login_user(username: str, password: str, db_file: Optional[str] = None) -> Optional[str]:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -228,6 +359,7 @@ def login_user(username: str, password: str, db_file: Optional[str] = None) -> O
     return row[0] if row else None
 
 
+@timed()
 def update_password_db(username: str, old_pass: str, new_pass: str, db_file: Optional[str] = None) -> bool:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -242,6 +374,7 @@ def update_password_db(username: str, old_pass: str, new_pass: str, db_file: Opt
     return False
 
 
+@timed()
 def reset_password_with_security(username: str, security_word: str, new_password: str,
                                  db_file: Optional[str] = None) -> bool:
     """Reseta a senha se a palavra de segurança bater."""
@@ -269,10 +402,16 @@ def reset_password_with_security(username: str, security_word: str, new_password
     return False
 
 
+@timed()
 def delete_user_db(username: str, db_file: Optional[str] = None) -> None:
+    from .write_queue import discard_writes  # Lazy import (write_queue importa este módulo)
+
+    # save ainda na fila gravaria de novo a carteira/gastos do usuário apagado
+    discard_writes(username, db_file)
     conn = _connect(db_file)
     c = conn.cursor()
-    tables = ["users", "user_data", "targets", "category_budgets", "merchant_rules", "recurring"]
+    tables = ["users", "user_data", "targets", "category_budgets", "merchant_rules", "recurring", "gastos",
+              "trades", "positions", "split_baseline"]
     for t in tables:
         try:
             c.execute(f"DELETE FROM {t} WHERE username = ?", (username,))
@@ -285,29 +424,96 @@ def delete_user_db(username: str, db_file: Optional[str] = None) -> None:
 # --------------------------------------------------------------------------------------
 # Wallet & Gastos (Lazy Import do Pandas mantido)
 # --------------------------------------------------------------------------------------
+GASTOS_DB_COLS = ["data", "categoria", "descricao", "tipo", "valor", "pagamento"]
+
+
+def _gastos_rows(username: str, gastos_df) -> List[Tuple]:
+    import pandas as pd  # Lazy import
+
+    if gastos_df is None or gastos_df.empty:
+        return []
+    dates = pd.to_datetime(gastos_df["Data"], errors="coerce", dayfirst=True)
+    ok = dates.notna()
+    # grava em ordem de data (leituras em ordem de inserção ficam quase ordenadas)
+    order = dates[ok].sort_values(kind="stable").index
+    days = dates.loc[order].dt.strftime("%Y-%m-%d")
+    g = gastos_df.loc[order]
+    valores = pd.to_numeric(g["Valor"], errors="coerce").fillna(0.0).astype(float)
+    return list(zip([username] * len(g), days, g["Categoria"].astype(str), g["Descricao"].astype(str),
+                    g["Tipo"].astype(str), valores, g["Pagamento"].astype(str)))
+
+
+@timed()
 def save_user_data_db(username: str, carteira_df, gastos_df, db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
     c = conn.cursor()
-
-    c_json = carteira_df.to_json(orient="records", date_format="iso") if not carteira_df.empty else "[]"
-    g_json = gastos_df.to_json(orient="records", date_format="iso") if not gastos_df.empty else "[]"
-
-    c.execute("""
-              INSERT INTO user_data (username, carteira_json, gastos_json)
-              VALUES (?, ?, ?) ON CONFLICT(username) DO
-              UPDATE SET carteira_json=excluded.carteira_json, gastos_json=excluded.gastos_json
-              """, (username, c_json, g_json))
+    _write_user_data(c, username, carteira_df, gastos_df)
     conn.commit()
     conn.close()
 
 
+@timed()
+def save_user_data_batch_db(items: List[Dict], db_file: Optional[str] = None) -> None:
+    """Grava vários usuários numa única transação.
+
+    Cada item: {"username", "carteira_df", "gastos_df", "gastos_append", "split_marks"}; chave
+    ausente ou None não mexe naquela parte (ver _write_user_data).
+    """
+    conn = _connect(db_file)
+    c = conn.cursor()
+    try:
+        for item in items:
+            _write_user_data(c, item["username"], item.get("carteira_df"), item.get("gastos_df"),
+                             item.get("gastos_append") or (), item.get("split_marks") or ())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+_INSERT_GASTO = """
+    INSERT INTO gastos (username, data, categoria, descricao, tipo, valor, pagamento)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _write_user_data(c, username: str, carteira_df=None, gastos_df=None, gastos_append=(), split_marks=()) -> None:
+    """carteira_df substitui a carteira; gastos_df substitui o histórico inteiro (restauração/
+    backup, renumera tx_id); gastos_append só insere as linhas novas. None = não mexe.
+    split_marks avança o split_baseline junto com a carteira já ajustada."""
+    if carteira_df is not None:
+        c_json = carteira_df.to_json(orient="records", date_format="iso") if not carteira_df.empty else "[]"
+        c.execute("""
+                  INSERT INTO user_data (username, carteira_json, gastos_json)
+                  VALUES (?, ?, NULL) ON CONFLICT(username) DO
+                  UPDATE SET carteira_json=excluded.carteira_json, gastos_json=NULL
+                  """, (username, c_json))
+    if gastos_df is not None:
+        c.execute("DELETE FROM gastos WHERE username = ?", (username,))
+        c.executemany(_INSERT_GASTO, _gastos_rows(username, gastos_df))
+    for new_rows in gastos_append:
+        c.executemany(_INSERT_GASTO, _gastos_rows(username, new_rows))
+    if split_marks:
+        from .corporate_actions import save_split_baseline  # Lazy import
+
+        save_split_baseline(c, username, split_marks)
+
+
+@timed()
 def load_user_data_db(username: str, db_file: Optional[str] = None):
+    from io import StringIO
+
     import pandas as pd  # Lazy import
 
     conn = _connect(db_file)
     c = conn.cursor()
     c.execute("SELECT carteira_json, gastos_json FROM user_data WHERE username = ?", (username,))
     row = c.fetchone()
+    c.execute(f"SELECT {', '.join(GASTOS_DB_COLS)} FROM gastos WHERE username = ? ORDER BY data, tx_id",
+              (username,))
+    g_rows = c.fetchall()
     conn.close()
 
     carteira_cols = ["Tipo", "Ativo", "Nome", "Qtd", "Preco_Medio", "Moeda", "Obs"]
@@ -323,17 +529,22 @@ def load_user_data_db(username: str, db_file: Optional[str] = None):
 
     try:
         if c_json and c_json != "[]":
-            c_df = pd.read_json(c_json, orient="records")
+            c_df = pd.read_json(StringIO(c_json), orient="records")  # JSON literal é deprecated no pandas 2.1+
     except Exception:
         pass
 
-    try:
-        if g_json and g_json != "[]":
-            g_df = pd.read_json(g_json, orient="records")
-            if "Data" in g_df.columns:
-                g_df["Data"] = pd.to_datetime(g_df["Data"], errors="coerce", dayfirst=True)
-    except Exception:
-        pass
+    if g_rows:
+        g_df = pd.DataFrame(g_rows, columns=gastos_cols)
+        g_df["Data"] = pd.to_datetime(g_df["Data"], format="%Y-%m-%d", errors="coerce")
+    else:
+        # Banco ainda não migrado por init_db
+        try:
+            if g_json and g_json != "[]":
+                g_df = pd.read_json(StringIO(g_json), orient="records")
+                if "Data" in g_df.columns:
+                    g_df["Data"] = pd.to_datetime(g_df["Data"], errors="coerce", dayfirst=True)
+        except Exception:
+            pass
 
     for col in carteira_cols:
         if col not in c_df.columns:
@@ -345,12 +556,168 @@ def load_user_data_db(username: str, db_file: Optional[str] = None):
             g_df[col] = ""
     g_df = g_df[gastos_cols]
 
-    return c_df, g_df
+    from bee.schema import coerce_carteira, coerce_gastos  # Lazy import (pandas)
+    return coerce_carteira(c_df), coerce_gastos(g_df)
+
+
+@timed()
+def load_gastos_db(username: str, db_file: Optional[str] = None, months: Optional[Iterable[str]] = None):
+    """Só os gastos do usuário (sem tocar na carteira), já no schema tipado.
+
+    months (YYYY-MM) restringe aos meses pedidos, pelo índice (username, data).
+    """
+    import pandas as pd  # Lazy import
+    from bee.schema import coerce_gastos
+
+    sql = f"SELECT {', '.join(GASTOS_DB_COLS)} FROM gastos WHERE username = ?"
+    params: list = [username]
+    if months is not None:
+        months = sorted(set(months))
+        if not months:
+            sql += " AND 0"
+        else:
+            sql += " AND (" + " OR ".join("(data >= ? AND data <= ?)" for _ in months) + ")"
+            for m in months:
+                params += [f"{m}-01", f"{m}-31"]
+    conn = _connect(db_file)
+    c = conn.cursor()
+    c.execute(sql + " ORDER BY data, tx_id", params)
+    rows = c.fetchall()
+    conn.close()
+
+    g_df = pd.DataFrame(rows, columns=["Data", "Categoria", "Descricao", "Tipo", "Valor", "Pagamento"])
+    g_df["Data"] = pd.to_datetime(g_df["Data"], format="%Y-%m-%d", errors="coerce")
+    return coerce_gastos(g_df)
+
+
+# --------------------------------------------------------------------------------------
+# Extrato em janela (keyset) + gravação só das linhas alteradas
+# --------------------------------------------------------------------------------------
+# coluna do DataFrame -> coluna da tabela gastos
+GASTOS_FRAME_TO_DB = {"Data": "data", "Categoria": "categoria", "Descricao": "descricao", "Tipo": "tipo",
+                      "Valor": "valor", "Pagamento": "pagamento"}
+
+
+def _gastos_db_value(col: str, value):
+    """Normaliza um valor vindo do editor para a coluna da tabela (None = inválido)."""
+    if col == "data":
+        return _iso_day(value)
+    if col == "valor":
+        return _to_float(value)
+    txt = "" if value is None else str(value).strip()
+    if col == "tipo":
+        txt = txt.capitalize()
+        return txt if txt in ("Entrada", "Saída") else "Saída"
+    if col in ("categoria", "pagamento"):
+        return txt or "Outros"
+    return txt
+
+
+@timed()
+def list_gastos_page_db(username: str, yyyymm: str, categoria: Optional[str] = None,
+                        after: Optional[Tuple[str, int]] = None, limit: int = 100,
+                        db_file: Optional[str] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+    """Uma página do mês, do mais recente para o mais antigo, com keyset em (data, tx_id).
+
+    `after` é o cursor devolvido pela página anterior; retorna (linhas, cursor_da_próxima | None).
+    """
+    sql = f"""
+        SELECT tx_id, {', '.join(GASTOS_DB_COLS)} FROM gastos
+        WHERE username = ? AND data >= ? AND data <= ?
+    """
+    params: list = [username, f"{yyyymm}-01", f"{yyyymm}-31"]
+    if categoria:
+        sql += " AND categoria = ?"
+        params.append(categoria)
+    if after:
+        sql += " AND (data < ? OR (data = ? AND tx_id < ?))"
+        params += [after[0], after[0], int(after[1])]
+    sql += " ORDER BY data DESC, tx_id DESC LIMIT ?"
+    params.append(int(limit) + 1)
+
+    conn = _connect(db_file)
+    c = conn.cursor()
+    c.execute(sql, params)
+    rows = c.fetchall()
+    conn.close()
+
+    keys = ["tx_id"] + GASTOS_DB_COLS
+    page = [dict(zip(keys, r)) for r in rows[:limit]]
+    next_cursor = (page[-1]["data"], page[-1]["tx_id"]) if len(rows) > limit else None
+    return page, next_cursor
+
+
+@timed()
+def apply_gastos_changes_db(username: str, updates: Dict[int, Dict], deletes: List[int], inserts: List[Dict],
+                            db_file: Optional[str] = None) -> Dict:
+    """Aplica um change set do extrato numa transação só.
+
+    updates: {tx_id: {"Valor": 10.0, ...}} (colunas do frame); deletes: [tx_id];
+    inserts: linhas novas completas. Retorna {"afetadas", "ausentes", "meses"}.
+
+    tx_id que não existe mais (página aberta antes de uma restauração, que renumera tudo)
+    desfaz o change set inteiro: "ausentes" lista esses ids e "afetadas" fica 0.
+    "meses" (YYYY-MM) são os meses das datas gravadas, para recarregar só eles.
+    """
+    conn = _connect(db_file)
+    c = conn.cursor()
+    touched, missing, months = 0, [], set()
+    try:
+        for tx_id, changes in updates.items():
+            sets = {}
+            for col, val in changes.items():
+                db_col = GASTOS_FRAME_TO_DB.get(col)
+                if db_col is None:
+                    continue
+                val = _gastos_db_value(db_col, val)
+                if val is not None:
+                    sets[db_col] = val
+            if not sets:
+                continue
+            assign = ", ".join(f"{k} = ?" for k in sets)
+            c.execute(f"UPDATE gastos SET {assign} WHERE username = ? AND tx_id = ?",
+                      (*sets.values(), username, int(tx_id)))
+            if c.rowcount:
+                touched += c.rowcount
+            else:
+                missing.append(int(tx_id))
+            if "data" in sets:
+                months.add(sets["data"][:7])
+
+        for tx_id in deletes:
+            c.execute("DELETE FROM gastos WHERE username = ? AND tx_id = ?", (username, int(tx_id)))
+            if c.rowcount:
+                touched += c.rowcount
+            else:
+                missing.append(int(tx_id))
+
+        rows = []
+        for r in inserts:
+            vals = {db: _gastos_db_value(db, r.get(col)) for col, db in GASTOS_FRAME_TO_DB.items()}
+            if vals["data"] is None:
+                continue
+            rows.append((username, *[vals[k] for k in GASTOS_DB_COLS]))
+            months.add(vals["data"][:7])
+        if rows:
+            c.executemany(_INSERT_GASTO, rows)
+            touched += len(rows)
+
+        if missing:
+            conn.rollback()
+            return {"afetadas": 0, "ausentes": missing, "meses": set()}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return {"afetadas": touched, "ausentes": [], "meses": months}
 
 
 # --------------------------------------------------------------------------------------
 # Targets, Budgets, Rules, Recurring
 # --------------------------------------------------------------------------------------
+@timed()
 def load_targets_db(username: str, db_file: Optional[str] = None) -> Dict[str, float]:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -365,6 +732,7 @@ def load_targets_db(username: str, db_file: Optional[str] = None) -> Dict[str, f
     return {r[0]: float(r[1]) for r in rows}
 
 
+@timed()
 def save_targets_db(username: str, targets: Dict[str, float], db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -378,6 +746,18 @@ def save_targets_db(username: str, targets: Dict[str, float], db_file: Optional[
     conn.close()
 
 
+@timed()
+def delete_targets_db(username: str, classes: List[str], db_file: Optional[str] = None) -> None:
+    if not classes:
+        return
+    conn = _connect(db_file)
+    c = conn.cursor()
+    c.executemany("DELETE FROM targets WHERE username = ? AND classe = ?", [(username, str(k)) for k in classes])
+    conn.commit()
+    conn.close()
+
+
+@timed()
 def get_budgets_db(username: str, db_file: Optional[str] = None) -> Dict[str, float]:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -390,6 +770,7 @@ def get_budgets_db(username: str, db_file: Optional[str] = None) -> Dict[str, fl
     return {r[0]: float(r[1]) for r in rows}
 
 
+@timed()
 def set_budget_db(username: str, categoria: str, budget: float, db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -402,6 +783,7 @@ def set_budget_db(username: str, categoria: str, budget: float, db_file: Optiona
     conn.close()
 
 
+@timed()
 def list_rules_db(username: str, db_file: Optional[str] = None) -> List[Dict]:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -415,6 +797,7 @@ def list_rules_db(username: str, db_file: Optional[str] = None) -> List[Dict]:
     return [{"pattern": r[0], "categoria": r[1], "active": int(r[2])} for r in rows]
 
 
+@timed()
 def add_rule_db(username: str, pattern: str, categoria: str, active: int = 1, db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -427,6 +810,7 @@ def add_rule_db(username: str, pattern: str, categoria: str, active: int = 1, db
     conn.close()
 
 
+@timed()
 def list_recurring_db(username: str, db_file: Optional[str] = None) -> List[Dict]:
     conn = _connect(db_file)
     c = conn.cursor()
@@ -458,6 +842,7 @@ def list_recurring_db(username: str, db_file: Optional[str] = None) -> List[Dict
     return out
 
 
+@timed()
 def add_recurring_db(username: str, descricao: str, categoria: str, tipo: str, valor: float, pagamento: str,
                      day_of_month: int, active: int = 1, db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
@@ -472,9 +857,62 @@ def add_recurring_db(username: str, descricao: str, categoria: str, tipo: str, v
     conn.close()
 
 
+@timed()
 def set_recurring_active_db(username: str, rec_id: int, active: int, db_file: Optional[str] = None) -> None:
     conn = _connect(db_file)
     c = conn.cursor()
     c.execute("UPDATE recurring SET active = ? WHERE username = ? AND rec_id = ?", (int(active), username, int(rec_id)))
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+# --------------------------------------------------------------------------------------
+# Busca no extrato
+# --------------------------------------------------------------------------------------
+def _fts_query(query: str) -> str:
+    """Cada palavra vira um prefixo entre aspas: 'pada ifo' -> '"pada"* "ifo"*'."""
+    terms = [t.replace('"', '""') for t in str(query or "").split() if t.strip()]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+@timed()
+def search_gastos_db(username: str, query: str, limit: int = 50, offset: int = 0,
+                     db_file: Optional[str] = None) -> Tuple[List[Dict], bool]:
+    """Busca por prefixo (sem acento) em descrição/categoria de todo o histórico do usuário.
+
+    Retorna (linhas da página, tem_mais). Sem FTS5 no SQLite, cai num LIKE.
+    Mais recentes primeiro pela data da transação (tx_id só desempata). O MATCH já começa
+    pelo token do usuário e o rowid do índice carrega a data, então o FTS5 entrega as linhas
+    em ordem e para no LIMIT, sem ordenar todos os acertos.
+    """
+    terms = _fts_query(query)
+    if not terms:
+        return [], False
+    dono = "u" + username.encode("utf-8").hex().upper()
+    match = f'dono : "{dono}" AND {{descricao categoria}} : ({terms})'
+
+    cols = ", ".join(f"g.{c}" for c in GASTOS_DB_COLS)
+    conn = _connect(db_file)
+    c = conn.cursor()
+    try:
+        c.execute(f"""
+            SELECT g.tx_id, {cols}
+            FROM gastos_fts f CROSS JOIN gastos g ON g.tx_id = (f.rowid & {_FTS_TX_MASK})
+            WHERE gastos_fts MATCH ? AND g.username = ?
+            ORDER BY f.rowid DESC
+            LIMIT ? OFFSET ?
+        """, (match, username, int(limit) + 1, int(offset)))
+    except sqlite3.OperationalError:
+        like = f"%{str(query).strip()}%"
+        c.execute(f"""
+            SELECT g.tx_id, {cols}
+            FROM gastos g
+            WHERE g.username = ? AND (g.descricao LIKE ? OR g.categoria LIKE ?)
+            ORDER BY g.data DESC, g.tx_id DESC
+            LIMIT ? OFFSET ?
+        """, (username, like, like, int(limit) + 1, int(offset)))
+    rows = c.fetchall()
+    conn.close()
+
+    keys = ["tx_id"] + GASTOS_DB_COLS
+    out = [dict(zip(keys, r)) for r in rows[:limit]]
+    return out, len(rows) > limit
@@ -37,3 +37,12 @@ def human_time_ago(dt: datetime) -> str:
         return f"{d}d"
     except Exception:
         return ""
+
+def fmt_as_of(as_of: float, what: str = "Cotações") -> str:
+    """'🕒 Cotações de agora' / 'de 12m atrás' a partir do epoch da busca."""
+    if not as_of:
+        return ""
+    ago = human_time_ago(datetime.fromtimestamp(float(as_of), tz=timezone.utc))
+    if not ago:
+        return ""
+    return f"🕒 {what} de agora" if ago == "agora" else f"🕒 {what} de {ago} atrás"
@@ -0,0 +1,110 @@
+# bee/fx.py
+# Câmbio para BRL.
+#
+#   fx_tickers({"USD", "EUR"})          -> ["BRL=X", "EURBRL=X"]  (entra no mesmo lote da carteira)
+#   spot_rates({"USD"}, quotes_df)      -> {"BRL": 1.0, "USD": 5.43}
+#   rate_at("USD", "2023-05-10")        -> cotação de fechamento vigente naquela data
+#   convert_at(valores, "USD", datas)   -> vetorizado, para caminhos históricos
+#
+# Nada de taxa fixa de reserva: sem cotação (nem a última conhecida, nem o último
+# fechamento da série), a moeda volta em `missing` e quem chama decide o que mostrar.
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .market_data import get_history
+
+# Ticker do Yahoo com "quantos BRL vale 1 unidade da moeda"
+FX_TICKERS: Dict[str, str] = {
+    "USD": "BRL=X",
+    "EUR": "EURBRL=X",
+    "GBP": "GBPBRL=X",
+    "CAD": "CADBRL=X",
+    "CHF": "CHFBRL=X",
+    "JPY": "JPYBRL=X",
+    "BTC": "BTC-BRL",
+}
+
+SERIES_PERIOD = "5y"
+
+
+def fx_ticker(currency: str) -> Optional[str]:
+    return FX_TICKERS.get((currency or "").upper())
+
+
+def fx_tickers(currencies: Iterable[str]) -> List[str]:
+    out = []
+    for cur in currencies:
+        t = fx_ticker(cur)
+        if t and t not in out:
+            out.append(t)
+    return out
+
+
+def rate_series(currency: str, period: str = SERIES_PERIOD) -> pd.Series:
+    """Fechamentos diários (BRL por unidade), índice de datas sem fuso. Vazia se indisponível."""
+    cur = (currency or "").upper()
+    if cur == "BRL":
+        return pd.Series(dtype=float)
+    t = fx_ticker(cur)
+    if not t:
+        return pd.Series(dtype=float)
+    hist = get_history(t, period)  # st.cache_data + cache SQLite do provedor
+    if hist is None or hist.empty or "Close" not in hist.columns:
+        return pd.Series(dtype=float)
+    s = pd.to_numeric(hist["Close"], errors="coerce").dropna()
+    s.index = pd.to_datetime(s.index).normalize()
+    return s[~s.index.duplicated(keep="last")].sort_index()
+
+
+def spot_rates(currencies: Iterable[str], quotes: Optional[pd.DataFrame] = None) -> Tuple[Dict[str, float], List[str]]:
+    """Taxa atual de cada moeda -> ({moeda: taxa}, [moedas sem taxa]).
+
+    `quotes` é o DataFrame de yf_last_and_prev_close do lote da carteira (que já trouxe os
+    tickers de câmbio). Sem cotação no lote, usa o último fechamento da série diária.
+    """
+    by_ticker = {}
+    if quotes is not None and not quotes.empty:
+        by_ticker = dict(zip(quotes["ticker"], quotes["last"]))
+
+    rates: Dict[str, float] = {"BRL": 1.0}
+    missing: List[str] = []
+    for cur in {(c or "BRL").upper() for c in currencies}:
+        if cur in rates:
+            continue
+        t = fx_ticker(cur)
+        value = by_ticker.get(t) if t else None
+        if not value:
+            s = rate_series(cur)
+            value = float(s.iloc[-1]) if not s.empty else None
+        if value:
+            rates[cur] = float(value)
+        else:
+            missing.append(cur)
+    return rates, sorted(missing)
+
+
+def rate_at(currency: str, when) -> Optional[float]:
+    cur = (currency or "").upper()
+    if cur == "BRL":
+        return 1.0
+    s = rate_series(cur)
+    if s.empty:
+        return None
+    value = s.asof(pd.Timestamp(when).normalize())
+    return None if pd.isna(value) else float(value)
+
+
+def convert_at(values, currency: str, dates) -> pd.Series:
+    """values (em `currency`) * taxa vigente em cada data. Datas antes da série ficam NaN."""
+    values = pd.Series(values, dtype=float).reset_index(drop=True)
+    cur = (currency or "").upper()
+    if cur == "BRL":
+        return values
+    s = rate_series(cur)
+    if s.empty:
+        return pd.Series(float("nan"), index=values.index)
+    idx = pd.DatetimeIndex(pd.to_datetime(pd.Series(dates).reset_index(drop=True))).normalize()
+    # asof vetorizado: último fechamento <= data (fim de semana/feriado pega a sexta)
+    rates = s.reindex(s.index.union(idx)).ffill().reindex(idx).to_numpy()
+    return values * rates
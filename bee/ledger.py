@@ -0,0 +1,428 @@
+# bee/ledger.py
+# Livro de operações (compra/venda/provento) e posições materializadas por usuário.
+#
+# Cada operação nova atualiza a posição do ativo em O(1) (preço médio, como a Receita
+# usa): lê uma linha de `positions`, aplica, grava, tudo na mesma transação. Operação
+# com data anterior à última já aplicada naquele ativo muda o preço médio do que veio
+# depois; aí só esse ativo é recalculado do zero.
+#
+# Importações de extrato (muitas operações de uma vez) entram por record_trades_bulk:
+# um executemany das operações e um rebuild dos ativos tocados, na mesma transação.
+#
+# Desdobramentos/grupamentos/bonificações vêm de bee.corporate_actions e entram no replay
+# entre as operações (multiplicam a quantidade, o custo fica). Evento novo recalcula o ativo.
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bee.corporate_actions import create_tables as create_action_tables, splits_for
+
+try:
+    from bee.config import DB_FILE
+except Exception:
+    DB_FILE = "bee_database.db"
+
+KINDS = ("BUY", "SELL", "DIV")
+KIND_LABELS = {"BUY": "Compra", "SELL": "Venda", "DIV": "Provento"}
+
+# quantidade residual de venda total (frações de cripto, arredondamento)
+_EPS = 1e-9
+
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = set()
+
+
+def _connect():
+    return sqlite3.connect(DB_FILE)
+
+
+@contextmanager
+def _tx():
+    """Uma conexão, uma transação: commit no fim, rollback em erro."""
+    if DB_FILE not in _INITIALIZED:
+        init_ledger_db()
+    conn = _connect()
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def init_ledger_db():
+    conn = _connect()
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS trades (
+            trade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            ativo TEXT NOT NULL,
+            tipo TEXT NOT NULL DEFAULT '',
+            moeda TEXT NOT NULL DEFAULT 'BRL',
+            data TEXT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('BUY', 'SELL', 'DIV')),
+            qtd REAL NOT NULL,
+            preco REAL NOT NULL,
+            taxas REAL NOT NULL DEFAULT 0,
+            source TEXT NOT NULL DEFAULT 'manual'
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_user_ativo ON trades (username, ativo, data, trade_id)")
+
+    # Estado corrente por ativo; last_data/last_trade_id dizem até onde o livro foi aplicado
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS positions (
+            username TEXT NOT NULL,
+            ativo TEXT NOT NULL,
+            tipo TEXT NOT NULL DEFAULT '',
+            moeda TEXT NOT NULL DEFAULT 'BRL',
+            qtd REAL NOT NULL DEFAULT 0,
+            custo REAL NOT NULL DEFAULT 0,
+            realizado REAL NOT NULL DEFAULT 0,
+            proventos REAL NOT NULL DEFAULT 0,
+            last_data TEXT,
+            last_trade_id INTEGER,
+            PRIMARY KEY (username, ativo)
+        )
+    """)
+    create_action_tables(cur)  # o replay lê os desdobramentos na mesma transação
+    conn.commit()
+    conn.close()
+    with _INIT_LOCK:
+        _INITIALIZED.add(DB_FILE)
+
+
+# --------------------------------------------------------------------------------------
+# Motor (puro)
+# --------------------------------------------------------------------------------------
+def empty_position(ativo: str, tipo: str = "", moeda: str = "BRL") -> Dict:
+    return {"ativo": ativo, "tipo": tipo, "moeda": moeda, "qtd": 0.0, "custo": 0.0, "realizado": 0.0,
+            "proventos": 0.0, "last_data": None, "last_trade_id": None}
+
+
+def apply_trade(pos: Dict, kind: str, qtd: float, preco: float, taxas: float = 0.0) -> Dict:
+    """Aplica uma operação à posição (preço médio). Devolve a posição nova."""
+    pos = dict(pos)
+    qtd, preco, taxas = float(qtd), float(preco), float(taxas or 0.0)
+    if kind == "BUY":
+        pos["qtd"] += qtd
+        pos["custo"] += qtd * preco + taxas  # taxas entram no custo, como no IR
+    elif kind == "SELL":
+        if qtd > pos["qtd"] + _EPS:
+            raise ValueError(f"venda de {qtd:g} {pos['ativo']} com só {pos['qtd']:g} em carteira")
+        avg = pos["custo"] / pos["qtd"] if pos["qtd"] > _EPS else 0.0
+        pos["realizado"] += qtd * (preco - avg) - taxas
+        pos["qtd"] -= qtd
+        pos["custo"] -= qtd * avg
+        if pos["qtd"] <= _EPS:
+            pos["qtd"], pos["custo"] = 0.0, 0.0
+    elif kind == "DIV":
+        pos["proventos"] += qtd * preco - taxas  # qtd = cotas com direito, preco = valor por cota
+    elif kind == "SPLIT":
+        pos["qtd"] *= qtd  # qtd = fator (2 = desdobra 1:2, 0.1 = grupa 10:1); o custo não muda
+    else:
+        raise ValueError(f"tipo de operação desconhecido: {kind!r}")
+    return pos
+
+
+def avg_price(pos: Dict) -> float:
+    return pos["custo"] / pos["qtd"] if pos["qtd"] > _EPS else 0.0
+
+
+def replay(trades: Iterable[Dict], ativo: str, tipo: str = "", moeda: str = "BRL",
+           splits: Iterable[Tuple[str, float]] = ()) -> Dict:
+    """Posição a partir do zero, com as operações já em ordem (data, trade_id).
+
+    `splits` = [(data, fator)] em ordem; o da data-com vale antes das operações daquele dia.
+    """
+    pos = empty_position(ativo, tipo, moeda)
+    pending = list(splits)
+
+    def apply_splits(until: Optional[str]):
+        nonlocal pos
+        while pending and (until is None or pending[0][0] <= until):
+            day, factor = pending.pop(0)
+            if pos["qtd"] > _EPS:
+                pos = apply_trade(pos, "SPLIT", factor, 0.0)
+                pos["last_data"] = day
+
+    for t in trades:
+        apply_splits(t["data"])
+        pos = apply_trade(pos, t["kind"], t["qtd"], t["preco"], t.get("taxas", 0.0))
+        pos["tipo"], pos["moeda"] = t.get("tipo") or pos["tipo"], t.get("moeda") or pos["moeda"]
+        pos["last_data"], pos["last_trade_id"] = t["data"], t.get("trade_id")
+    apply_splits(None)
+    return pos
+
+
+# --------------------------------------------------------------------------------------
+# Persistência
+# --------------------------------------------------------------------------------------
+_POS_COLS = ["ativo", "tipo", "moeda", "qtd", "custo", "realizado", "proventos", "last_data", "last_trade_id"]
+
+_UPSERT_POSITION = f"""
+    INSERT INTO positions (username, {', '.join(_POS_COLS)})
+    VALUES (:username, {', '.join(':' + c for c in _POS_COLS)})
+    ON CONFLICT(username, ativo) DO UPDATE SET
+        {', '.join(f'{c} = excluded.{c}' for c in _POS_COLS if c != 'ativo')}
+"""
+
+
+def ticker_key(ativo: str, tipo: str = "", moeda: str = "BRL") -> str:
+    """Chave do ativo no livro: o ticker do provedor ("PETR4" -> "PETR4.SA"), o mesmo que os
+    proventos/desdobramentos usam. A carteira manual guarda o ticker como o usuário digitou."""
+    from bee.market_data import normalize_ticker  # Lazy import (streamlit)
+
+    return normalize_ticker(str(ativo or ""), tipo or "Ação/ETF", (moeda or "BRL").upper())
+
+
+def ticker_keys(carteira_df):
+    """ticker_key por linha da carteira (uma chamada por combinação distinta)."""
+    import pandas as pd  # Lazy import
+
+    rows = list(zip(carteira_df["Ativo"].astype(str), carteira_df["Tipo"].astype(str),
+                    carteira_df["Moeda"].astype(str)))
+    uniq = {r: ticker_key(*r) for r in set(rows)}
+    return pd.Series([uniq[r] for r in rows], index=carteira_df.index, dtype=object)
+
+
+def _iso(day) -> str:
+    if isinstance(day, (date, datetime)):
+        return day.strftime("%Y-%m-%d")
+    return str(day)[:10]
+
+
+def _load_position(cur, username: str, ativo: str) -> Optional[Dict]:
+    cur.execute(f"SELECT {', '.join(_POS_COLS)} FROM positions WHERE username = ? AND ativo = ?",
+                (username, ativo))
+    row = cur.fetchone()
+    return dict(zip(_POS_COLS, row)) if row else None
+
+
+def _rebuild(cur, username: str, ativos: Iterable[str]) -> None:
+    for ativo in ativos:
+        cur.execute("""
+            SELECT trade_id, tipo, moeda, data, kind, qtd, preco, taxas FROM trades
+            WHERE username = ? AND ativo = ? ORDER BY data, trade_id
+        """, (username, ativo))
+        cols = ["trade_id", "tipo", "moeda", "data", "kind", "qtd", "preco", "taxas"]
+        trades = [dict(zip(cols, r)) for r in cur.fetchall()]
+        if not trades:
+            cur.execute("DELETE FROM positions WHERE username = ? AND ativo = ?", (username, ativo))
+            continue
+        cur.execute(_UPSERT_POSITION, {"username": username, **replay(trades, ativo, splits=splits_for(cur, ativo))})
+
+
+OPENING_SOURCE = "abertura"
+
+
+def record_trade(username: str, ativo: str, kind: str, qtd: float, preco: float, data=None,
+                 taxas: float = 0.0, tipo: str = "", moeda: str = "BRL", source: str = "manual",
+                 opening: Optional[Tuple[float, float]] = None) -> Dict:
+    """Grava a operação e atualiza a posição na mesma transação. Devolve a posição.
+
+    opening = (qtd, preço médio) que o ativo já tinha na carteira manual. Só vale na primeira
+    operação do ativo: vira uma compra de abertura no mesmo dia, antes desta, para o livro
+    partir do saldo que o usuário já tinha (e não de zero).
+    """
+    ativo = ticker_key(ativo, tipo, moeda)
+    kind = kind.upper()
+    if not ativo or kind not in KINDS or float(qtd) <= 0 or float(preco) < 0:
+        raise ValueError("operação inválida")
+    day = _iso(data or date.today())
+
+    with _tx() as cur:
+        pos = _load_position(cur, username, ativo)
+        if pos is None:
+            pos = empty_position(ativo, tipo, moeda)
+            if opening and float(opening[0]) > _EPS:
+                pos = apply_trade(pos, "BUY", opening[0], opening[1])
+                cur.execute("""
+                    INSERT INTO trades (username, ativo, tipo, moeda, data, kind, qtd, preco, taxas, source)
+                    VALUES (?, ?, ?, ?, ?, 'BUY', ?, ?, 0, ?)
+                """, (username, ativo, tipo, moeda, day, float(opening[0]), float(opening[1]), OPENING_SOURCE))
+        backdated = pos["last_data"] is not None and (
+            day < pos["last_data"]
+            # desdobramento entre a última operação aplicada e esta: replay aplica na ordem certa
+            or (pos["qtd"] > _EPS and bool(splits_for(cur, ativo, after=pos["last_data"], until=day))))
+        if not backdated:
+            pos = apply_trade(pos, kind, qtd, preco, taxas)  # valida (venda a descoberto) antes do INSERT
+        cur.execute("""
+            INSERT INTO trades (username, ativo, tipo, moeda, data, kind, qtd, preco, taxas, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (username, ativo, tipo or pos["tipo"], moeda or pos["moeda"], day, kind, float(qtd), float(preco),
+              float(taxas or 0.0), source))
+        if backdated:
+            _rebuild(cur, username, [ativo])
+            return _load_position(cur, username, ativo)
+        pos.update({"tipo": tipo or pos["tipo"], "moeda": moeda or pos["moeda"], "last_data": day,
+                    "last_trade_id": cur.lastrowid})
+        cur.execute(_UPSERT_POSITION, {"username": username, **pos})
+    return pos
+
+
+def record_trades_bulk(username: str, trades: List[Dict], source: str = "import", replace: bool = False,
+                       openings: Optional[Dict[str, Tuple[float, float]]] = None) -> int:
+    """Muitas operações (ex.: extrato da corretora) numa transação + rebuild dos ativos tocados.
+
+    Cada item: ativo, kind, qtd, preco, data e opcionalmente taxas, tipo, moeda.
+    replace=True apaga antes as operações da mesma `source` nesses ativos dentro do período
+    do lote: reimportar o mesmo extrato não duplica nada.
+    openings = {ativo: (qtd, preço médio)} da carteira manual (opening_from), como em record_trade:
+    ativo ainda sem nada no livro ganha uma compra de abertura antes da primeira operação do lote.
+    """
+    keys = {}
+    for t in trades:
+        k = (str(t["ativo"]), t.get("tipo", ""), t.get("moeda", "BRL"))
+        if k not in keys:
+            keys[k] = ticker_key(*k)
+    rows = [(username, keys[(str(t["ativo"]), t.get("tipo", ""), t.get("moeda", "BRL"))], t.get("tipo", ""),
+             t.get("moeda", "BRL"), _iso(t["data"]), str(t["kind"]).upper(), float(t["qtd"]), float(t["preco"]),
+             float(t.get("taxas", 0.0) or 0.0), source) for t in trades]
+    if not rows:
+        return 0
+    ativos = sorted({r[1] for r in rows})
+    with _tx() as cur:
+        if replace:
+            days = [r[4] for r in rows]
+            cur.executemany("DELETE FROM trades WHERE username = ? AND ativo = ? AND source = ? AND data BETWEEN ? AND ?",
+                            [(username, a, source, min(days), max(days)) for a in ativos])
+        seeds = []
+        for raw, (qtd, preco) in (openings or {}).items():
+            ativo = ticker_key(raw)
+            first = [r for r in rows if r[1] == ativo]
+            if not first or float(qtd) <= _EPS:
+                continue
+            cur.execute("SELECT 1 FROM trades WHERE username = ? AND ativo = ? LIMIT 1", (username, ativo))
+            if cur.fetchone() is None:  # histórico já existente no livro manda, não o saldo manual
+                day = min(r[4] for r in first)
+                seeds.append((username, ativo, first[0][2], first[0][3], day, "BUY", float(qtd), float(preco), 0.0,
+                              OPENING_SOURCE))
+        # abertura antes das operações do lote: mesmo dia, trade_id menor
+        cur.executemany("""
+            INSERT INTO trades (username, ativo, tipo, moeda, data, kind, qtd, preco, taxas, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, seeds + rows)
+        _rebuild(cur, username, ativos)
+    return len(rows)
+
+
+def rebuild_positions(username: str, ativos: Optional[Iterable[str]] = None) -> None:
+    """Recalcula do livro (todos os ativos do usuário se `ativos` for None)."""
+    with _tx() as cur:
+        if ativos is None:
+            cur.execute("SELECT DISTINCT ativo FROM trades WHERE username = ? "
+                        "UNION SELECT ativo FROM positions WHERE username = ?", (username, username))
+            ativos = [r[0] for r in cur.fetchall()]
+        _rebuild(cur, username, list(ativos))
+
+
+def rebuild_ticker(ativo: str) -> None:
+    """Recalcula o ativo para todo usuário que o tem no livro (ex.: desdobramento novo)."""
+    with _tx() as cur:
+        cur.execute("SELECT DISTINCT username FROM trades WHERE ativo = ?", (ativo,))
+        for (username,) in cur.fetchall():
+            _rebuild(cur, username, [ativo])
+
+
+def delete_trade(username: str, trade_id: int) -> None:
+    with _tx() as cur:
+        cur.execute("SELECT ativo FROM trades WHERE username = ? AND trade_id = ?", (username, int(trade_id)))
+        row = cur.fetchone()
+        if not row:
+            return
+        cur.execute("DELETE FROM trades WHERE username = ? AND trade_id = ?", (username, int(trade_id)))
+        _rebuild(cur, username, [row[0]])
+
+
+def list_positions(username: str, include_closed: bool = False) -> List[Dict]:
+    with _tx() as cur:
+        cur.execute(f"SELECT {', '.join(_POS_COLS)} FROM positions WHERE username = ? ORDER BY ativo", (username,))
+        rows = [dict(zip(_POS_COLS, r)) for r in cur.fetchall()]
+    return [r for r in rows if include_closed or r["qtd"] > _EPS]
+
+
+def list_trades(username: str, ativo: Optional[str] = None, limit: int = 50) -> List[Dict]:
+    """Mais recentes primeiro; limit=-1 traz tudo."""
+    cols = ["trade_id", "ativo", "tipo", "moeda", "data", "kind", "qtd", "preco", "taxas", "source"]
+    sql = f"SELECT {', '.join(cols)} FROM trades WHERE username = ?"
+    params: list = [username]
+    if ativo:
+        sql += " AND ativo = ?"
+        params.append(ticker_key(ativo))
+    sql += " ORDER BY data DESC, trade_id DESC LIMIT ?"
+    params.append(int(limit))
+    with _tx() as cur:
+        cur.execute(sql, params)
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def delete_user_ledger(username: str) -> None:
+    with _tx() as cur:
+        cur.execute("DELETE FROM trades WHERE username = ?", (username,))
+        cur.execute("DELETE FROM positions WHERE username = ?", (username,))
+
+
+# --------------------------------------------------------------------------------------
+# Ponte com a carteira da sessão
+# --------------------------------------------------------------------------------------
+# st.session_state["carteira_df"] e a tabela users.carteira guardam só as linhas manuais.
+# A junção com o livro é uma visão (wallet_view) para valorizar e mostrar; nunca é salva,
+# senão posições do livro virariam linhas manuais e o saldo manual de antes se perderia.
+# Os dois lados se comparam por ticker_key: "PETR4" na carteira e "PETR4.SA" no livro são o mesmo.
+def ledger_tickers(positions: List[Dict]) -> set:
+    return {p["ativo"] for p in positions}
+
+
+def opening_from(carteira_df, ativo: str, tipo: str = "", moeda: str = "BRL") -> Optional[Tuple[float, float]]:
+    """(qtd, preço médio) da linha manual do ativo, para semear a primeira operação."""
+    if carteira_df is None or carteira_df.empty:
+        return None
+    rows = carteira_df[ticker_keys(carteira_df) == ticker_key(ativo, tipo, moeda)]
+    if rows.empty:
+        return None
+    qtd = rows["Qtd"].astype(float)
+    if qtd.sum() <= _EPS:
+        return None
+    return float(qtd.sum()), float((qtd * rows["Preco_Medio"].astype(float)).sum() / qtd.sum())
+
+
+def wallet_view(username: str, carteira_df):
+    """Carteira como o app mostra: linhas manuais + posições do livro. Só leitura."""
+    return merge_positions(carteira_df, list_positions(username, include_closed=True))
+
+
+def merge_positions(carteira_df, positions: List[Dict]):
+    """Ativos com livro de operações passam a vir das posições; o resto da carteira fica."""
+    import pandas as pd  # Lazy import
+
+    from bee.config import CARTEIRA_COLS
+
+    if not positions:
+        return carteira_df
+    ledger = ledger_tickers(positions)
+    base = carteira_df if carteira_df is not None else pd.DataFrame(columns=CARTEIRA_COLS)
+    keys = ticker_keys(base) if not base.empty else pd.Series(dtype=object)
+    # a linha manual empresta ticker (como o usuário escreve), nome e observação
+    keep_meta = base.assign(_k=keys).drop_duplicates("_k").set_index("_k")[["Ativo", "Nome", "Obs"]] \
+        if not base.empty else None
+    rows = []
+    for p in positions:
+        if p["qtd"] <= _EPS:
+            continue
+        ativo, nome, obs = p["ativo"], p["ativo"], "livro de operações"
+        if keep_meta is not None and p["ativo"] in keep_meta.index:
+            meta = keep_meta.loc[p["ativo"]]
+            ativo, nome, obs = meta["Ativo"] or ativo, meta["Nome"] or nome, meta["Obs"] or obs
+        rows.append({"Tipo": p["tipo"] or "Ação/ETF", "Ativo": ativo, "Nome": nome, "Qtd": p["qtd"],
+                     "Preco_Medio": avg_price(p), "Moeda": p["moeda"] or "BRL", "Obs": obs})
+    manual = base[~keys.isin(ledger)] if not base.empty else base
+    out = pd.concat([manual.astype(object), pd.DataFrame(rows, columns=CARTEIRA_COLS)], ignore_index=True)
+
+    from bee.schema import coerce_carteira  # Lazy import (pandas)
+    return coerce_carteira(out)
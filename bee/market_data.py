@@ -1,11 +1,13 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-import requests
-import feedparser
 from datetime import datetime
 
-from .safe_imports import yf, go, px, dtparser, GoogleTranslator
+from .safe_imports import go, GoogleTranslator
+from .providers import ProviderError, get_provider
 from .formatters import fmt_ptbr_number
+from .schema import parse_ptbr_number
+from .profiling import timed
 
 def normalize_ticker(ativo: str, tipo: str, moeda: str) -> str:
     a = (ativo or "").strip().upper()
@@ -48,148 +50,151 @@ def calculate_rsi(data, window=14):
     except Exception:
         return None
 
-@st.cache_data(ttl=600)
-def yf_last_and_prev_close(tickers: list[str]) -> pd.DataFrame:
-    if yf is None or not tickers:
-        return pd.DataFrame(columns=["ticker", "last", "prev", "var_pct"])
+# --------------------------------------------------------------------------------------
+# Leituras do provedor
+# Cotações e fundamentos vêm do stale-while-revalidate do provedor (bee/providers/swr.py):
+# valor já visto volta na hora, com "as_of" para a UI mostrar a idade, sem st.cache_data
+# por cima (ele seguraria o valor velho e esconderia a atualização).
+# As funções _cached levantam ProviderError em vez de devolver vazio: o st.cache_data
+# não guarda exceção, então uma falha não fica em cache. As públicas lá embaixo
+# traduzem a falha para o "vazio" que as páginas já tratam.
+# --------------------------------------------------------------------------------------
+_QUOTE_COLS = ["ticker", "last", "prev", "var_pct", "as_of"]
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _translate_cached(text: str) -> str:
+    if not GoogleTranslator:
+        return text
     try:
-        data = yf.download(tickers, period="5d", progress=False, threads=True, group_by="ticker", auto_adjust=False)
+        return GoogleTranslator(source="auto", target="pt").translate(text)
     except Exception:
-        return pd.DataFrame(columns=["ticker", "last", "prev", "var_pct"])
+        return text
+
+
+def _info(ticker: str) -> dict:
+    provider = get_provider()
+    inf = provider.fundamentals(ticker)
+    if not inf:
+        return {}
 
+    try:
+        q = provider.quotes([ticker]).get(ticker)
+    except ProviderError:
+        q = None
+    current_price = float(q["last"]) if q else float(inf.get("currentPrice") or inf.get("regularMarketPrice") or 0.0)
+    if not current_price:
+        raise ProviderError(f"sem preço para {ticker}")
+
+    def safe_get(keys, d="—"):
+        for k in keys:
+            if k in inf and inf[k]:
+                return inf[k]
+        return d
+
+    summary = safe_get(["longBusinessSummary"], "")
+    if summary:
+        summary = _translate_cached(summary)
+
+    # idade do dado mais velho entre fundamentos e preço
+    stamps = [x for x in (inf.get("as_of"), (q or {}).get("as_of")) if x]
+
+    return {
+        "currentPrice": current_price,
+        "longName": safe_get(["longName", "shortName"], ticker),
+        "sector": safe_get(["sector"]),
+        "industry": safe_get(["industry"]),
+        "summary": summary,
+        "trailingPE": safe_get(["trailingPE", "forwardPE"], None),
+        "dividendYield": safe_get(["dividendYield"], None),
+        "marketCap": safe_get(["marketCap"], None),
+        "roe": safe_get(["returnOnEquity"]),
+        "margins": safe_get(["profitMargins"]),
+        "beta": safe_get(["beta"]),
+        "as_of": min(stamps) if stamps else None,
+    }
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _history_cached(ticker: str, period: str) -> pd.DataFrame:
+    return get_provider().history(ticker, period)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _history_plot_cached(ticker: str, period: str):
+    df = _history_cached(ticker, period)
+    if df.empty:
+        return None, None
+    fig = go.Figure(data=[
+        go.Candlestick(x=df.index, open=df["Open"], high=df["High"], low=df["Low"], close=df["Close"], name=ticker)
+    ])
+    fig.update_layout(
+        xaxis_rangeslider_visible=False,
+        template="plotly_dark",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=320
+    )
+    return fig, calculate_rsi(df)
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def _news_cached(query: str, limit: int) -> list[dict]:
     out = []
-    if len(tickers) == 1:
-        t = tickers[0]
+    for it in get_provider().news(query, limit):
         try:
-            s = data["Close"]
-            s = pd.to_numeric(s, errors="coerce").dropna()
-            if len(s) >= 2:
-                last = float(s.iloc[-1])
-                prev = float(s.iloc[-2])
-                var_pct = ((last - prev) / prev) * 100 if prev else 0.0
-                out.append({"ticker": t, "last": last, "prev": prev, "var_pct": var_pct})
-        except Exception:
-            pass
-    else:
-        for t in tickers:
-            try:
-                s = None
-                if isinstance(data.columns, pd.MultiIndex):
-                    if ("Close", t) in data.columns:
-                        s = data[("Close", t)]
-                    elif (t, "Close") in data.columns:
-                        s = data[(t, "Close")]
-                else:
-                    if "Close" in data.columns:
-                        s = data["Close"]
-                if s is None:
-                    continue
-                s = pd.to_numeric(s, errors="coerce").dropna()
-                if len(s) >= 2:
-                    last = float(s.iloc[-1])
-                    prev = float(s.iloc[-2])
-                    var_pct = ((last - prev) / prev) * 100 if prev else 0.0
-                    out.append({"ticker": t, "last": last, "prev": prev, "var_pct": var_pct})
-            except Exception:
-                pass
-    return pd.DataFrame(out)
-
-@st.cache_data(ttl=1200)
+            p_dt = datetime.fromisoformat(it["published"])
+        except (KeyError, TypeError, ValueError):
+            p_dt = datetime.now()
+        out.append({"title": it["title"], "link": it["link"], "source": it["source"], "published_dt": p_dt})
+    return out
+
+
+def market_available() -> bool:
+    return get_provider().available
+
+
+@timed()
+def yf_last_and_prev_close(tickers: list[str]) -> pd.DataFrame:
+    if not tickers:
+        return pd.DataFrame(columns=_QUOTE_COLS)
+    try:
+        quotes = get_provider().quotes(list(tickers))
+    except ProviderError:
+        return pd.DataFrame(columns=_QUOTE_COLS)
+    return pd.DataFrame([{"ticker": t, **q} for t, q in quotes.items()], columns=_QUOTE_COLS)
+
+@timed()
 def yf_info_extended(ticker: str) -> dict:
-    if yf is None or not ticker:
+    if not ticker:
         return {}
     try:
-        tk = yf.Ticker(ticker)
-        current_price = 0.0
-        try:
-            h = tk.history(period="5d", auto_adjust=False)
-            if not h.empty:
-                current_price = float(h["Close"].iloc[-1])
-        except Exception:
-            pass
-
-        if current_price == 0.0:
-            try:
-                if hasattr(tk, "fast_info") and tk.fast_info:
-                    current_price = float(tk.fast_info.last_price or 0.0)
-            except Exception:
-                pass
-
-        inf = tk.info or {}
-
-        def safe_get(keys, d="—"):
-            for k in keys:
-                if k in inf and inf[k]:
-                    return inf[k]
-            return d
-
-        summary = safe_get(["longBusinessSummary"], "")
-        if summary and GoogleTranslator:
-            try:
-                summary = GoogleTranslator(source="auto", target="pt").translate(summary)
-            except Exception:
-                pass
-
-        return {
-            "currentPrice": current_price,
-            "longName": safe_get(["longName", "shortName"], ticker),
-            "sector": safe_get(["sector"]),
-            "industry": safe_get(["industry"]),
-            "summary": summary,
-            "trailingPE": safe_get(["trailingPE", "forwardPE"], None),
-            "dividendYield": safe_get(["dividendYield"], None),
-            "marketCap": safe_get(["marketCap"], None),
-            "roe": safe_get(["returnOnEquity"]),
-            "margins": safe_get(["profitMargins"]),
-            "beta": safe_get(["beta"])
-        }
-    except Exception:
+        return _info(ticker)
+    except ProviderError:
         return {}
 
-@st.cache_data(ttl=3600)
+@timed()
+def get_history(ticker: str, period: str = "1y") -> pd.DataFrame:
+    try:
+        return _history_cached(ticker, period)
+    except ProviderError:
+        return pd.DataFrame()
+
+@timed()
 def get_stock_history_plot(ticker: str, period="1y"):
-    if yf is None or go is None:
+    if not go:
         return None, None
     try:
-        df = yf.Ticker(ticker).history(period=period, auto_adjust=False)
-        if df.empty:
-            return None, None
-        fig = go.Figure(data=[
-            go.Candlestick(x=df.index, open=df["Open"], high=df["High"], low=df["Low"], close=df["Close"], name=ticker)
-        ])
-        fig.update_layout(
-            xaxis_rangeslider_visible=False,
-            template="plotly_dark",
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=0, r=0, t=10, b=0),
-            height=320
-        )
-        rsi_val = calculate_rsi(df)
-        return fig, rsi_val
-    except Exception:
+        return _history_plot_cached(ticker, period)
+    except Exception:  # ProviderError ou dado que o plotly não aceita
         return None, None
 
-@st.cache_data(ttl=900)
+@timed()
 def get_google_news_items(query: str, limit: int = 8) -> list[dict]:
-    url = f"https://news.google.com/rss/search?q={query}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
-    headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        resp = requests.get(url, headers=headers, timeout=6)
-        if resp.status_code != 200:
-            return []
-        feed = feedparser.parse(resp.content)
-        items = []
-        for e in getattr(feed, "entries", [])[:limit]:
-            try:
-                p_dt = dtparser.parse(e.published) if dtparser else datetime.now()
-            except Exception:
-                p_dt = datetime.now()
-            title = getattr(e, "title", "Notícia").rsplit(" - ", 1)[0]
-            source = getattr(e, "source", {}).get("title") or "News"
-            items.append({"title": title, "link": e.link, "source": source, "published_dt": p_dt})
-        return items
-    except Exception:
+        return _news_cached(query, limit)
+    except ProviderError:
         return []
 
 def smart_load_csv(uploaded_file, sep_priority=","):
@@ -217,70 +222,55 @@ def smart_load_csv(uploaded_file, sep_priority=","):
         pass
     return None
 
+@timed()
 def atualizar_precos_carteira_memory(df):
     df = df.copy()
     if df.empty:
         return df, {"total_brl": 0, "pnl_brl": 0, "pnl_pct": 0}
 
-    usdbrl = 5.80
-    if yf is not None:
-        try:
-            fx = yf_last_and_prev_close(["BRL=X"])
-            if not fx.empty:
-                usdbrl = float(fx.iloc[0]["last"])
-        except Exception:
-            pass
+    from .valuation import ConversionMatrix, fx_batch, quote_currency  # valuation -> fx -> este módulo
 
     df["Ticker_YF"] = df.apply(
         lambda r: normalize_ticker(str(r["Ativo"]), "Ação", str(r.get("Moeda", "BRL")).upper()),
         axis=1,
     )
-
-    df["Preco_Atual"] = 0.0
-    df["Var_Dia_Pct"] = 0.0
+    for c in ["Qtd", "Preco_Medio"]:
+        df[c] = parse_ptbr_number(df[c])
 
     is_rf = df["Tipo"].astype(str).str.contains("Renda Fixa|RF", case=False, na=False)
-    df.loc[is_rf, "Preco_Atual"] = df.loc[is_rf, "Preco_Medio"]
+    cost_ccy = df["Moeda"].astype(str).str.upper().replace({"": "BRL", "NAN": "BRL"})
+    # renda fixa não tem cotação: o "preço" é o próprio custo, na moeda do custo
+    quote_ccy = quote_currency(df["Ticker_YF"], cost_ccy).where(~is_rf, cost_ccy)
 
+    # ativos + um ticker de câmbio por moeda, tudo num lote só
     tickers = df.loc[~is_rf, "Ticker_YF"].unique().tolist()
-    px_map = {}
-
-    if tickers and yf is not None:
-        px_df = yf_last_and_prev_close(tickers)
-        for _, r in px_df.iterrows():
-            px_map[r["ticker"]] = {"price": float(r["last"]), "var": float(r["var_pct"])}
-
-    for i, row in df.iterrows():
-        if bool(is_rf.iloc[i]):
-            continue
-        data_tick = px_map.get(row["Ticker_YF"], {"price": 0.0, "var": 0.0})
-        df.at[i, "Preco_Atual"] = data_tick["price"]
-        df.at[i, "Var_Dia_Pct"] = data_tick["var"]
-
-    for c in ["Qtd", "Preco_Medio"]:
-        if df[c].dtype == object:
-            df[c] = df[c].astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
-        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+    batch = tickers + [t for t in fx_batch(quote_ccy, cost_ccy) if t not in tickers]
+    px_df = yf_last_and_prev_close(batch) if batch else pd.DataFrame(columns=_QUOTE_COLS)
+    as_of = float(px_df["as_of"].min()) if not px_df.empty else None  # a cotação mais velha dá a idade
 
-    df["Preco_Atual_BRL"] = df["Preco_Atual"]
-    mask_usd_source = df["Ticker_YF"].astype(str).str.endswith("-USD")
-    df.loc[mask_usd_source, "Preco_Atual_BRL"] *= usdbrl
+    last = dict(zip(px_df["ticker"], px_df["last"]))
+    var = dict(zip(px_df["ticker"], px_df["var_pct"]))
+    df["Preco_Atual"] = np.where(is_rf, df["Preco_Medio"], df["Ticker_YF"].map(last).fillna(0.0))
+    df["Var_Dia_Pct"] = np.where(is_rf, 0.0, df["Ticker_YF"].map(var).fillna(0.0))
 
-    mask_user_usd = df["Moeda"].astype(str).str.upper() == "USD"
-    df["Preco_Medio_BRL"] = df["Preco_Medio"]
-    df.loc[mask_user_usd, "Preco_Medio_BRL"] = df.loc[mask_user_usd, "Preco_Medio"] * usdbrl
+    # uma matriz de conversão por reprecificação; sem taxa, a linha fica NaN (fora do total)
+    fx = ConversionMatrix.from_quotes(set(quote_ccy) | set(cost_ccy), px_df)
+    df["Preco_Atual_BRL"] = df["Preco_Atual"].to_numpy(dtype=float) * fx.factors(quote_ccy)
+    df["Preco_Medio_BRL"] = df["Preco_Medio"].to_numpy(dtype=float) * fx.factors(cost_ccy)
 
     df["Total_BRL"] = df["Qtd"] * df["Preco_Atual_BRL"]
     df["Custo_BRL"] = df["Qtd"] * df["Preco_Medio_BRL"]
     df["PnL_BRL"] = df["Total_BRL"] - df["Custo_BRL"]
-    df["PnL_Pct"] = df.apply(lambda x: (x["PnL_BRL"] / x["Custo_BRL"] * 100) if x["Custo_BRL"] > 0 else 0, axis=1)
+    custo_pos = df["Custo_BRL"] > 0
+    df["PnL_Pct"] = np.where(custo_pos, df["PnL_BRL"] / df["Custo_BRL"].where(custo_pos, 1.0) * 100, 0.0)
 
     total = float(df["Total_BRL"].sum())
     pnl = float(df["PnL_BRL"].sum())
     custo = float(df["Custo_BRL"].sum())
     pnl_pct = (pnl / custo * 100) if custo > 0 else 0.0
 
-    return df, {"total_brl": total, "pnl_brl": pnl, "pnl_pct": pnl_pct}
+    return df, {"total_brl": total, "pnl_brl": pnl, "pnl_pct": pnl_pct, "as_of": as_of,
+                "fx_missing": fx.missing, "fx_rates": {c: r for c, r in fx.to_base.items() if c != "BRL"}}
 
 def investidor10_link(ativo: str) -> str:
     a = (ativo or "").strip().upper().replace(".SA", "")
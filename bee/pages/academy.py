@@ -2,17 +2,21 @@ import streamlit as st
 import random
 
 # Mantendo seus imports de lógica
-from bee.academy.questions import QUESTIONS
-from bee.academy.tips import TIPS
+from bee.academy.registry import get_registry
 from bee.academy.engine import calc_level, daily_question_id
+from bee.academy.content import content_version
+from bee.academy.scheduler import QuizScheduler
 from bee.academy.progress import (
     get_progress,
     add_quiz_result,
+    count_due,
+    load_srs,
     toggle_favorite,
     is_favorite,
     list_favorites,
 )
-from bee.academy.dictionary import DICTIONARY, search_dictionary, topics_in_dictionary
+from bee.academy.dictionary import search_dictionary, topics_in_dictionary
+from bee.profiling import timed
 
 
 # =========================================================
@@ -23,24 +27,35 @@ def _username() -> str:
 
 
 def _tip_by_id(tid: str):
-    for t in TIPS:
-        if t.get("id") == tid: return t
-    return None
+    return get_registry().tip(tid)
 
 
 def _question_by_id(qid: str):
-    for q in QUESTIONS:
-        if q.get("id") == qid: return q
-    return None
+    return get_registry().question(qid)
 
 
-def _pick_question(mode: str, username: str) -> dict:
-    if not QUESTIONS: return {}
+def _scheduler(username: str) -> QuizScheduler:
+    """Fila de revisão do usuário, montada uma vez por sessão (e por versão do conteúdo)."""
+    qids = get_registry().question_ids
+    key = (username, content_version(), len(qids))
+    cached = st.session_state.get("academy_sched")
+    if not cached or cached[0] != key:
+        cached = (key, QuizScheduler(qids, load_srs(username)))
+        st.session_state["academy_sched"] = cached
+    return cached[1]
+
+
+def _pick_question(mode: str, username: str, exclude: str = "") -> dict:
+    reg = get_registry()
+    qids = reg.question_ids
+    if not qids: return {}
     if mode == "daily":
-        qid = daily_question_id(username, [q["id"] for q in QUESTIONS])
-        q = _question_by_id(qid)
-        return q or QUESTIONS[0]
-    return random.choice(QUESTIONS)
+        qid = daily_question_id(username, qids)
+    elif mode == "random":
+        qid = random.choice([q for q in qids if q != exclude] or qids)
+    else:
+        qid = _scheduler(username).peek()
+    return reg.question(qid) or reg.question(qids[0]) or {}
 
 
 # =========================================================
@@ -165,10 +180,12 @@ def _tab_study(username: str):
     if "academy_tip_index" not in st.session_state:
         st.session_state["academy_tip_index"] = 0
 
-    if not TIPS: return st.info("Sem dicas cadastradas.")
+    reg = get_registry()
+    tip_ids = reg.tip_ids
+    if not tip_ids: return st.info("Sem dicas cadastradas.")
 
-    idx = st.session_state["academy_tip_index"] % len(TIPS)
-    tip = TIPS[idx]
+    idx = st.session_state["academy_tip_index"] % len(tip_ids)
+    tip = reg.tip(tip_ids[idx]) or {}
     tip_id = tip.get("id", f"tip_{idx}")
     fav = is_favorite(username, "tip", tip_id)
 
@@ -212,8 +229,11 @@ def _tab_quiz(username: str):
     st.subheader("🧠 Quiz Rápido")
 
     # Seletor de modo mais limpo
-    mode = st.segmented_control("Modo de Jogo", ["Pergunta do dia", "Aleatório"], default="Pergunta do dia")
-    qmode = "daily" if mode == "Pergunta do dia" else "random"
+    modes = {"Pergunta do dia": "daily", "Aleatório": "random", "Revisão": "review"}
+    mode = st.segmented_control("Modo de Jogo", list(modes), default="Pergunta do dia")
+    qmode = modes.get(mode, "daily")
+    if qmode == "review":
+        st.caption(f"🔁 Revisões pendentes hoje: {count_due(username)}")
 
     if "academy_current_qid" not in st.session_state or st.session_state.get("academy_qmode") != qmode:
         q = _pick_question(qmode, username)
@@ -238,7 +258,9 @@ def _tab_quiz(username: str):
             if st.button("Confirmar Resposta", type="primary", use_container_width=True, key=f"btn_{qid}"):
                 idx = q["options"].index(choice)
                 correct = (idx == q["answer"])
-                add_quiz_result(username, correct, xp_gain_correct=10)
+                srs = add_quiz_result(username, correct, xp_gain_correct=10, qid=qid)
+                if srs:
+                    _scheduler(username).reschedule(qid, srs["due"])
                 if correct:
                     st.balloons()
                     st.success(f"✅ Correto! {q.get('explanation', '')}")
@@ -250,8 +272,12 @@ def _tab_quiz(username: str):
                 toggle_favorite(username, "question", qid)
                 st.rerun()
         with c_next:
-            if st.button("Pular ➡", use_container_width=True, key=f"skip_{qid}"):
-                q2 = _pick_question("random", username)
+            # pular fica no modo atual; a pergunta do dia é uma só
+            if st.button("Pular ➡", use_container_width=True, key=f"skip_{qid}", disabled=qmode == "daily",
+                         help="Uma pergunta por dia" if qmode == "daily" else None):
+                if qmode == "review":
+                    _scheduler(username).defer(qid)
+                q2 = _pick_question(qmode, username, exclude=qid)
                 st.session_state["academy_current_qid"] = q2.get("id", "")
                 st.rerun()
 
@@ -286,15 +312,16 @@ def _tab_dictionary(username: str):
     with c2:
         topic = st.selectbox("Filtrar", ["Todos"] + topics_in_dictionary(), label_visibility="collapsed")
 
-    results = search_dictionary(query=q, topic=None if topic == "Todos" else topic)
+    results = search_dictionary(query=q, topic=None if topic == "Todos" else topic, limit=100)
 
     if not results:
         st.info("Nenhum termo encontrado.")
         return
 
-    for item in results[:100]:  # Limitando para não travar
+    fav_ids = set(list_favorites(username, "dict"))  # uma consulta, não uma por card
+    for item in results:  # já vem limitado a 100 para não travar
         iid = item["id"]
-        fav = is_favorite(username, "dict", iid)
+        fav = iid in fav_ids
         icon_fav = "★" if fav else "☆"
 
         # HTML Card customizado com botão invisível do Streamlit por cima ou lógica separada
@@ -321,6 +348,7 @@ def _tab_dictionary(username: str):
 # =========================================================
 # MAIN RENDER
 # =========================================================
+@timed()
 def render_academy():
     _academy_css()
     username = _username()
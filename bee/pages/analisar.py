@@ -1,10 +1,11 @@
 import pandas as pd
 import streamlit as st
 
-from bee.safe_imports import yf, go
-from bee.formatters import fmt_money_brl
-from bee.market_data import normalize_ticker, yf_info_extended, get_stock_history_plot, get_google_news_items
+from bee.formatters import fmt_as_of, fmt_money_brl
+from bee.market_data import (normalize_ticker, yf_info_extended, get_history, get_stock_history_plot,
+                             get_google_news_items, market_available)
 from bee.formatters import fmt_ptbr_number
+from bee.profiling import timed
 
 
 def _max_drawdown_pct(close: pd.Series) -> float:
@@ -53,6 +54,7 @@ def _apply_analyzer_css():
     """, unsafe_allow_html=True)
 
 
+@timed()
 def render_analisar():
     _apply_analyzer_css()  # <<< CSS MÁGICO
 
@@ -106,16 +108,14 @@ def render_analisar():
       <div class="kpi-card"><div class="kpi-label">MARKET CAP</div><div class="kpi-value">{mcap_txt}</div></div>
     </div>
     """, unsafe_allow_html=True)
+    if info.get("as_of"):
+        st.caption(fmt_as_of(info["as_of"], "Dados"))
 
     st.markdown("---")
 
     # Histórico
-    if yf is None: return st.warning("yfinance não disponível.")
-    try:
-        t = yf.Ticker(tk_real)
-        hist = t.history(period="2y", auto_adjust=False)
-    except:
-        hist = pd.DataFrame()
+    if not market_available(): return st.warning("Dados de mercado indisponíveis.")
+    hist = get_history(tk_real, "2y")
 
     if hist is None or hist.empty or "Close" not in hist.columns:
         st.warning("Sem histórico suficiente.")
@@ -124,11 +124,8 @@ def render_analisar():
         sma200 = close.rolling(200).mean()
         sma200_last = float(sma200.dropna().iloc[-1]) if len(sma200.dropna()) else None
 
-        try:
-            h1y = t.history(period="1y", auto_adjust=False)
-            c1y = h1y["Close"].dropna() if not h1y.empty else close
-        except:
-            c1y = close
+        # 52 semanas saem do mesmo histórico de 2 anos (uma chamada a menos)
+        c1y = close[close.index >= close.index.max() - pd.DateOffset(years=1)] if not close.empty else close
 
         hi52 = float(c1y.max()) if not c1y.empty else 0
         lo52 = float(c1y.min()) if not c1y.empty else 0
@@ -1,6 +1,8 @@
 import streamlit as st
 import math
 from ..formatters import fmt_money_brl
+from ..profiling import timed
+from ..safe_imports import go
 
 
 # =========================================================
@@ -71,6 +73,46 @@ def _nav_btn(label: str, tab_key: str, icon: str = ""):
 # TELAS INDIVIDUAIS
 # =========================================================
 
+def _heatmap(g: dict, z_title: str, hover_fmt: str):
+    from ..sensitivity import AXES  # Lazy import
+
+    if not go:
+        st.dataframe(g["z"], use_container_width=True)
+        return
+    fig = go.Figure(go.Heatmap(
+        x=g["x"], y=g["y"], z=g["z"], colorscale="Viridis", colorbar=dict(title=z_title),
+        hovertemplate=f"{AXES[g['x_name']]}: %{{x:.2f}}<br>{AXES[g['y_name']]}: %{{y:,.0f}}<br>"
+                      f"{z_title}: %{{z:{hover_fmt}}}<extra></extra>"))
+    fig.update_layout(height=420, margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)",
+                      plot_bgcolor="rgba(0,0,0,0)", xaxis_title=AXES[g["x_name"]], yaxis_title=AXES[g["y_name"]])
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_sensitivity_juros(vp: float, pmt: float, taxa: float, anos: int):
+    from ..sensitivity import grid  # Lazy import
+
+    c1, c2 = st.columns(2)
+    eixo = c1.radio("Variar a taxa junto com", ["Aporte", "Período"], horizontal=True, key="sens_juros_eixo")
+    passos = c2.slider("Pontos por eixo", 11, 201, 41, step=10, key="sens_juros_passos")
+    x = ("taxa", max(taxa - 5, 0.0), taxa + 5, passos)
+    if eixo == "Aporte":
+        g = grid("montante", x, ("aporte", 0.0, max(pmt, 100.0) * 2, passos), vp=vp, anos=anos)
+    else:
+        g = grid("montante", x, ("anos", 1, 50, passos), vp=vp, aporte=pmt)
+    _heatmap(g, "Montante (R$)", ",.0f")
+    st.caption(f"{g['z'].size:,} cenários.".replace(",", "."))
+
+
+def _render_sensitivity_milhao(invest_mensal: float, taxa_anual: float, meta: float):
+    from ..sensitivity import grid  # Lazy import
+
+    passos = st.slider("Pontos por eixo", 11, 201, 41, step=10, key="sens_milhao_passos")
+    g = grid("tempo_meta", ("taxa", max(taxa_anual - 5, 0.0), taxa_anual + 5, passos),
+             ("aporte", max(invest_mensal, 100.0) * 0.25, max(invest_mensal, 100.0) * 3, passos), meta=meta)
+    _heatmap(g, "Anos até a meta", ".1f")
+    st.caption(f"{g['z'].size:,} cenários. Em branco: não chega à meta.".replace(",", "."))
+
+
 def _render_juros():
     st.markdown("#### 📈 Juros Compostos")
     st.caption("Simule o poder do tempo e dos aportes constantes.")
@@ -101,43 +143,109 @@ def _render_juros():
             </div>
             """, unsafe_allow_html=True)
 
+        with st.expander("🗺️ Mapa de sensibilidade"):
+            _render_sensitivity_juros(vp, pmt, taxa, anos)
+
+
+def _wealth_chart(res: dict, sistema: str):
+    if not go:
+        return
+    # fim de cada ano; no ano 0 o comprador tem a entrada no imóvel e o inquilino, entrada + custos investidos
+    anos = list(range(res["meses"] // 12 + 1))
+    idx = [a * 12 - 1 for a in anos[1:]]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=anos, y=[res["entrada"]] + list(res["patrimonio_comprador"][idx]), mode="lines",
+                             line=dict(color="#60a5fa", width=3), name=f"Comprar financiado ({sistema})"))
+    fig.add_trace(go.Scatter(x=anos, y=[res["entrada"] + res["custos"]] + list(res["patrimonio_inquilino"][idx]),
+                             mode="lines", line=dict(color="#4ade80", width=3), name="Alugar e investir"))
+    fig.update_layout(height=360, margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)",
+                      plot_bgcolor="rgba(0,0,0,0)", xaxis_title="Anos", yaxis_title="Patrimônio (R$)",
+                      legend=dict(orientation="h", y=-0.2))
+    st.plotly_chart(fig, use_container_width=True)
+
 
 def _render_aluguel():
     st.markdown("#### 🏠 Alugar vs Financiar")
-    st.caption("Comparativo financeiro simples.")
+    st.caption("Financiamento SAC ou Price mês a mês contra alugar e investir a diferença.")
 
     with st.container(border=True):
-        c1, c2 = st.columns(2)
+        c1, c2, c3 = st.columns(3)
         valor_imovel = c1.number_input("Valor do Imóvel", value=500000.0, step=10000.0)
-        taxa_fin = c2.number_input("Taxa Financiamento (% a.a.)", value=9.5, step=0.1)
-        taxa_inv = c2.number_input("Rendimento Investimento (% a.a.)", value=11.0, step=0.1)
+        entrada_pct = c2.number_input("Entrada (%)", value=20.0, step=5.0, min_value=0.0, max_value=100.0)
+        prazo = c3.number_input("Prazo (anos)", value=30, step=5, min_value=1, max_value=40)
+        c4, c5, c6 = st.columns(3)
+        taxa_fin = c4.number_input("Taxa Financiamento (% a.a.)", value=9.5, step=0.1)
+        taxa_inv = c5.number_input("Rendimento Investimento (% a.a.)", value=11.0, step=0.1)
+        aluguel_pct = c6.number_input("Aluguel (% do imóvel ao mês)", value=0.40, step=0.05, min_value=0.0,
+                                      help="0,4% ao mês = R$ 2.000 num imóvel de R$ 500 mil.")
+        sistema = st.radio("Sistema de amortização", ["SAC", "Price"], horizontal=True, key="alug_sistema")
+
+        with st.expander("Premissas"):
+            p1, p2, p3 = st.columns(3)
+            reajuste = p1.number_input("Reajuste do Aluguel (% a.a.)", value=4.5, step=0.5)
+            valorizacao = p2.number_input("Valorização do Imóvel (% a.a.)", value=4.5, step=0.5)
+            custos = p3.number_input("ITBI + Cartório (% do imóvel)", value=4.0, step=0.5, min_value=0.0)
 
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("Simular", type="primary", use_container_width=True):
-            # Conta de padaria para estimativa
-            custo_total_fin = valor_imovel * (1 + (taxa_fin / 100) * 1.5)
-
-            # Cenário Investidor
-            entrada = valor_imovel * 0.20
-            pot_inv = entrada * (1 + (taxa_inv / 100)) ** 30
-
-            col_a, col_b = st.columns(2)
+            from ..amortization import compare  # Lazy import
+
+            premissas = dict(valor=valor_imovel, entrada_pct=entrada_pct / 100, anos=int(prazo),
+                             aluguel_pct=aluguel_pct / 100, reajuste_aluguel=reajuste / 100,
+                             valorizacao=valorizacao / 100, taxa_inv=taxa_inv / 100, custos_compra_pct=custos / 100)
+            res = compare(taxa_fin=taxa_fin / 100, sistema=sistema, **premissas)
+            outro = compare(taxa_fin=taxa_fin / 100, sistema="Price" if sistema == "SAC" else "SAC", **premissas)
+
+            diff = float(res["diferenca_final"])
+            cor = "#4ade80" if diff < 0 else "#60a5fa"
+            vence = "Alugar e investir" if diff < 0 else "Comprar"
+            empate = (f"Comprar passa à frente no ano {(int(res['breakeven_mes']) - 1) // 12 + 1}"
+                      if res["breakeven_mes"] > 0 else "Comprar não passa à frente no prazo")
+            col_a, col_b, col_c = st.columns(3)
             with col_a:
                 st.markdown(f"""
                 <div class="result-card" style="border-top-color:#f87171;">
-                    <div class="result-label">CUSTO FINANCIAMENTO</div>
-                    <div class="result-value">{fmt_money_brl(custo_total_fin, 2)}</div>
-                    <div class="result-sub">Pago ao banco (aprox.)</div>
+                    <div class="result-label">PARCELA ({sistema})</div>
+                    <div class="result-value">{fmt_money_brl(res["parcela"][0], 2)}</div>
+                    <div class="result-sub">Última: <b>{fmt_money_brl(res["parcela"][-1], 2)}</b> |
+                        Aluguel inicial: <b>{fmt_money_brl(res["aluguel"][0], 2)}</b></div>
                 </div>
                 """, unsafe_allow_html=True)
             with col_b:
                 st.markdown(f"""
-                <div class="result-card" style="border-top-color:#4ade80;">
-                    <div class="result-label">SE INVESTIR A ENTRADA</div>
-                    <div class="result-value">{fmt_money_brl(pot_inv, 2)}</div>
-                    <div class="result-sub">Em 30 anos (20% inicial)</div>
+                <div class="result-card" style="border-top-color:#f87171;">
+                    <div class="result-label">JUROS PAGOS AO BANCO</div>
+                    <div class="result-value">{fmt_money_brl(res["total_juros"], 0)}</div>
+                    <div class="result-sub">No {"Price" if sistema == "SAC" else "SAC"}:
+                        <b>{fmt_money_brl(outro["total_juros"], 0)}</b></div>
                 </div>
                 """, unsafe_allow_html=True)
+            with col_c:
+                st.markdown(f"""
+                <div class="result-card" style="border-top-color:{cor};">
+                    <div class="result-label">EM {int(prazo)} ANOS: {vence.upper()}</div>
+                    <div class="result-value" style="color:{cor};">{fmt_money_brl(abs(diff), 0)}</div>
+                    <div class="result-sub">{empate}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            _wealth_chart(res, sistema)
+
+            with st.expander("Sensibilidade à taxa do financiamento"):
+                import numpy as np  # Lazy import
+                import pandas as pd  # Lazy import
+
+                taxas = np.round(np.arange(max(taxa_fin - 3.0, 0.5), taxa_fin + 3.01, 0.5), 2)
+                sweep = compare(taxa_fin=taxas / 100, sistema=sistema, **premissas)
+                st.dataframe(pd.DataFrame({
+                    "Taxa (% a.a.)": taxas,
+                    "Parcela inicial": sweep["parcela"][:, 0],
+                    "Juros totais": sweep["total_juros"],
+                    "Comprar − Alugar no fim": sweep["diferenca_final"],
+                }), hide_index=True, use_container_width=True, column_config={
+                    c: st.column_config.NumberColumn(format="R$ %.0f")
+                    for c in ("Parcela inicial", "Juros totais", "Comprar − Alugar no fim")})
+            st.caption("Valores nominais. Quem paga menos no mês investe a diferença ao rendimento informado; "
+                       "patrimônio de quem compra = imóvel valorizado − saldo devedor + investimentos.")
 
 
 def _render_milhao():
@@ -167,6 +275,9 @@ def _render_milhao():
                 </div>
                 """, unsafe_allow_html=True)
 
+        with st.expander("🗺️ Mapa de sensibilidade"):
+            _render_sensitivity_milhao(invest_mensal, taxa_anual, meta)
+
 
 def _render_renda_fixa():
     st.markdown("#### 🏦 Simulador Renda Fixa")
@@ -193,9 +304,89 @@ def _render_renda_fixa():
             """, unsafe_allow_html=True)
 
 
+def _band_chart(res: dict, goal: float = 0.0):
+    if not go:
+        return
+    x, b = res["years"], res["bands"]
+    fig = go.Figure()
+    # faixas de fora para dentro: 5–95 e 25–75, mediana por cima
+    for lo, hi, alpha, name in (("p5", "p95", 0.12, "5% a 95%"), ("p25", "p75", 0.25, "25% a 75%")):
+        fig.add_trace(go.Scatter(x=x, y=b[hi], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=x, y=b[lo], mode="lines", line=dict(width=0), fill="tonexty",
+                                 fillcolor=f"rgba(74,222,128,{alpha})", name=name))
+    fig.add_trace(go.Scatter(x=x, y=b["p50"], mode="lines", line=dict(color="#4ade80", width=3), name="Mediana"))
+    if goal > 0:
+        fig.add_hline(y=goal, line_dash="dot", line_color="#facc15", annotation_text="Meta")
+    fig.update_layout(height=360, margin=dict(l=0, r=0, t=10, b=0), paper_bgcolor="rgba(0,0,0,0)",
+                      plot_bgcolor="rgba(0,0,0,0)", xaxis_title="Anos", yaxis_title="R$ de hoje",
+                      legend=dict(orientation="h", y=-0.2))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_monte_carlo():
+    st.markdown("#### 🎲 Simulação com Volatilidade")
+    st.caption("Milhares de cenários de mercado, com inflação: valores em reais de hoje.")
+
+    with st.container(border=True):
+        c1, c2, c3 = st.columns(3)
+        vp = c1.number_input("Valor Inicial (R$)", value=10000.0, step=1000.0, key="mc_vp")
+        pmt = c2.number_input("Aporte Mensal (R$)", value=1000.0, step=100.0, key="mc_pmt")
+        meta = c3.number_input("Meta (R$ de hoje, opcional)", value=1_000_000.0, step=50000.0, key="mc_meta")
+        c4, c5, c6 = st.columns(3)
+        taxa = c4.number_input("Retorno Esperado (% a.a.)", value=10.0, step=0.5, key="mc_taxa")
+        vol = c5.number_input("Volatilidade (% a.a.)", value=15.0, step=1.0, min_value=0.0, key="mc_vol",
+                              help="Renda fixa ~1–3%, carteira mista ~10%, só ações ~20–25%.")
+        inflacao = c6.number_input("Inflação (% a.a.)", value=4.0, step=0.5, key="mc_infl")
+        anos = st.slider("Período (Anos)", 1, 60, 25, key="mc_anos")
+
+        with st.expander("Retiradas (aposentadoria)"):
+            r1, r2 = st.columns(2)
+            saque = r1.number_input("Retirada Mensal (R$ de hoje)", value=0.0, step=500.0, key="mc_saque")
+            inicio = r2.slider("Começa a retirar no ano", 0, 60, min(20, anos), key="mc_inicio")
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("Simular", type="primary", use_container_width=True, key="mc_run"):
+            from ..projections import simulate  # Lazy import
+
+            with st.spinner("Simulando cenários..."):
+                res = simulate(initial=vp, monthly=pmt, years=anos, ret=taxa / 100, vol=vol / 100,
+                               inflation=inflacao / 100, goal=meta, withdrawal=saque,
+                               withdraw_after_years=min(inicio, anos) if saque > 0 else None)
+
+            prob = res["success_prob"] * 100
+            cor = "#4ade80" if prob >= 80 else "#facc15" if prob >= 50 else "#f87171"
+            quando = (f"Mediana: meta em {res['goal_years_p50']:.1f} anos" if res.get("goal_years_p50") is not None
+                      else "Em metade dos cenários a meta não é atingida")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.markdown(f"""
+                <div class="result-card" style="border-top-color:{cor};">
+                    <div class="result-label">CHANCE DE SUCESSO</div>
+                    <div class="result-value" style="color:{cor};">{prob:.0f}%</div>
+                    <div class="result-sub">{quando if meta > 0 else "Sem zerar o patrimônio"}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col_b:
+                st.markdown(f"""
+                <div class="result-card">
+                    <div class="result-label">PATRIMÔNIO FINAL (MEDIANA)</div>
+                    <div class="result-value">{fmt_money_brl(res["final"]["p50"], 0)}</div>
+                    <div class="result-sub">
+                        Pessimista (5%): <b>{fmt_money_brl(res["final"]["p5"], 0)}</b> |
+                        Otimista (95%): <b>{fmt_money_brl(res["final"]["p95"], 0)}</b>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            _band_chart(res, meta)
+            st.caption(f"{res['n_paths']:,} cenários em {res['elapsed_s'] * 1000:.0f} ms. "
+                       f"Retornos lognormais com média de {taxa:.1f}% a.a.; não é promessa de rentabilidade."
+                       .replace(",", "."))
+
+
 # =========================================================
 # MAIN RENDER
 # =========================================================
+@timed()
 def render_calculadoras():
     _apply_calc_css()
     st.markdown("## 🧮 Calculadoras")
@@ -205,7 +396,7 @@ def render_calculadoras():
         st.session_state["calc_aba"] = "juros"
 
     # --- MENU DE NAVEGAÇÃO (BOTÕES) ---
-    n1, n2, n3, n4 = st.columns(4, gap="small")
+    n1, n2, n3, n4, n5 = st.columns(5, gap="small")
 
     with n1:
         _nav_btn("Juros", "juros", "📈")
@@ -215,6 +406,8 @@ def render_calculadoras():
         _nav_btn("Milhão", "milhao", "💰")
     with n4:
         _nav_btn("Renda Fixa", "rf", "🏦")
+    with n5:
+        _nav_btn("Cenários", "mc", "🎲")
 
     st.markdown("---")
 
@@ -228,4 +421,6 @@ def render_calculadoras():
     elif aba == "milhao":
         _render_milhao()
     elif aba == "rf":
-        _render_renda_fixa()
\ No newline at end of file
+        _render_renda_fixa()
+    elif aba == "mc":
+        _render_monte_carlo()
@@ -4,10 +4,18 @@ import streamlit as st
 
 from bee.config import DB_FILE
 from bee.safe_imports import px
-from bee.formatters import fmt_money_brl
-from bee.db import save_user_data_db, load_targets_db, save_targets_db
+from bee.formatters import fmt_as_of, fmt_money_brl
+from bee.db import delete_targets_db, load_targets_db, save_targets_db
+from bee.write_queue import flush_writes, queue_wallet_save
 from bee.market_data import atualizar_precos_carteira_memory
 from bee.dialogs import show_asset_details_popup
+from bee.schema import CARTEIRA_CAT_COLS, coerce_carteira
+from bee.profiling import timed
+from bee.ledger import (KIND_LABELS, avg_price, ledger_tickers, list_positions, list_trades, merge_positions,
+                        opening_from, record_trade, ticker_key, ticker_keys)
+from bee.b3_import import StatementError, import_trades, merge_holdings, parse_statement
+from bee.rebalance import ASSET_PREFIX, plan as rebalance_plan, split_targets
+from bee.corporate_actions import apply_pending_splits, received_income, refresh_in_background, trailing_income
 
 CARTEIRA_COLS = ["Tipo", "Ativo", "Nome", "Qtd", "Preco_Medio", "Moeda", "Obs"]
 
@@ -29,11 +37,7 @@ def _mask(val, formatter_func=None):
 # HELPERS DE DADOS
 # =========================================================
 def _ensure_wallet_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty: return pd.DataFrame(columns=CARTEIRA_COLS)
-    df = df.copy()
-    for c in CARTEIRA_COLS:
-        if c not in df.columns: df[c] = "" if c in ["Tipo", "Ativo", "Nome", "Moeda", "Obs"] else 0.0
-    return df[CARTEIRA_COLS].copy()
+    return coerce_carteira(df)
 
 
 def _normalize_tipo(tipo: str) -> str:
@@ -73,7 +77,7 @@ def _apply_wallet_css():
         <style>
           .kpi-container {
             display: grid;
-            grid-template-columns: repeat(3, 1fr);
+            grid-template-columns: repeat(4, 1fr);
             gap: 15px;
             margin-bottom: 25px;
           }
@@ -131,7 +135,7 @@ def _dialog_add_asset(username: str):
     c1, c2, c3 = st.columns([1.2, 1.2, 0.8])
     f_tipo = c1.selectbox("Tipo", ["Ação/ETF", "Cripto", "Renda Fixa", "Caixa"], key="dlg_tipo")
     f_ativo = (c2.text_input("Ticker", placeholder="PETR4", key="dlg_ativo").upper().strip())
-    f_moeda = c3.selectbox("Moeda", ["BRL", "USD"], key="dlg_moeda")
+    f_moeda = c3.selectbox("Moeda", ["BRL", "USD", "EUR", "GBP"], key="dlg_moeda")
 
     c4, c5 = st.columns(2)
     f_qtd = c4.number_input("Quantidade", min_value=0.0, step=1.0, key="dlg_qtd")
@@ -141,7 +145,10 @@ def _dialog_add_asset(username: str):
     c6, c7 = st.columns([1, 1])
     if c6.button("Cancelar", use_container_width=True): st.rerun()
     if c7.button("Salvar Ativo", type="primary", use_container_width=True):
-        if f_ativo and f_qtd > 0:
+        if ticker_key(f_ativo, _normalize_tipo(f_tipo), f_moeda) in ledger_tickers(
+                list_positions(username, include_closed=True)):
+            st.warning(f"{f_ativo} já vem do livro de operações: registre a compra em Gerenciar Carteira.")
+        elif f_ativo and f_qtd > 0:
             new_asset = {
                 "Tipo": _normalize_tipo(f_tipo), "Ativo": f_ativo, "Nome": f_ativo,
                 "Qtd": float(f_qtd), "Preco_Medio": float(f_preco), "Moeda": f_moeda, "Obs": ""
@@ -149,8 +156,7 @@ def _dialog_add_asset(username: str):
             df_new = pd.concat([df, pd.DataFrame([new_asset])], ignore_index=True)
             st.session_state["carteira_df"] = _ensure_wallet_columns(df_new)
             st.session_state["wallet_mode"] = True
-            save_user_data_db(username, st.session_state["carteira_df"],
-                              st.session_state.get("gastos_df", pd.DataFrame()))
+            queue_wallet_save(username, st.session_state["carteira_df"])
             st.toast("Ativo adicionado!", icon="✅")
             st.rerun()
         else:
@@ -180,37 +186,62 @@ def _render_targets_and_rebalance(df_calc: pd.DataFrame):
     total = float(dfb["Total_BRL"].sum()) if not dfb.empty else 0.0
     if total <= 0: return
 
-    cur_val = dfb.groupby("TipoBucket")["Total_BRL"].sum().to_dict()
-    cur_pct = {k: (float(cur_val.get(k, 0.0)) / total * 100.0) for k in keys}
-
     # Se tiver em modo privacidade, não mostra porcentagens detalhadas ou valores
     if st.session_state.get("privacy_mode", False):
         st.info("🙈 Modo Privacidade Ativo: Rebalanceamento oculto.")
         return
 
-    view = pd.DataFrame([
-        {"Classe": k, "Atual %": round(cur_pct.get(k, 0.0), 2), "Alvo %": round(float(new_targets.get(k, 0.0)), 2),
-         "Desvio %": round(cur_pct.get(k, 0.0) - float(new_targets.get(k, 0.0)), 2)}
-        for k in keys
-    ])
     st.markdown("---")
-    st.dataframe(view, use_container_width=True, hide_index=True,
-                 column_config={"Desvio %": st.column_config.NumberColumn(format="%.2f %%")})
+    with st.expander("📌 Metas por ativo (opcional)"):
+        st.caption("Percentual dentro da classe. Ativos sem meta dividem o restante da classe pelo valor atual.")
+        _, asset_t = split_targets(targets)
+        meta_df = dfb[["Ativo", "TipoBucket"]].drop_duplicates("Ativo").reset_index(drop=True)
+        meta_df["Meta na classe %"] = meta_df["Ativo"].astype(str).str.upper().map(asset_t)
+        meta_edit = st.data_editor(meta_df.rename(columns={"TipoBucket": "Classe"}), hide_index=True,
+                                   use_container_width=True, disabled=["Ativo", "Classe"], key="editor_metas_ativo",
+                                   column_config={"Meta na classe %": st.column_config.NumberColumn(
+                                       min_value=0.0, max_value=100.0, step=1.0, format="%.1f")})
+        if st.button("💾 Salvar metas por ativo", use_container_width=True):
+            metas = {f"{ASSET_PREFIX}{str(a).upper()}": round(float(v), 2)
+                     for a, v in zip(meta_edit["Ativo"], meta_edit["Meta na classe %"]) if pd.notna(v)}
+            # meta apagada volta a "sem meta"; as de classe vão junto para não ficarem só as por ativo
+            delete_targets_db(username, [k for k in targets if k.startswith(ASSET_PREFIX) and k not in metas], DB_FILE)
+            save_targets_db(username, {**{k: round(float(v), 2) for k, v in new_targets.items()}, **metas}, DB_FILE)
+            st.toast("Metas por ativo salvas!", icon="✅")
+            st.rerun()
 
     st.markdown("#### 🤖 Sugestão de Aporte")
-    c_ap, c_btn = st.columns([2, 1])
+    c_ap, c_sell, c_lot = st.columns([2, 1, 1])
     aporte = c_ap.number_input("Valor do Aporte (R$)", 0.0, step=100.0, value=1000.0)
-    if aporte > 0:
-        new_total = total + float(aporte)
-        desired_val = {k: (float(new_targets.get(k, 0.0)) / 100.0) * new_total for k in keys}
-        need = {k: max(0.0, desired_val.get(k, 0.0) - float(cur_val.get(k, 0.0))) for k in keys}
-        sum_pos = float(sum(need.values()))
-        if sum_pos > 0:
-            recs = [{"Classe": k, "Sugerido (R$)": round(float(aporte) * (v / sum_pos), 2)} for k, v in need.items() if
-                    v > 0]
-            st.dataframe(pd.DataFrame(recs).sort_values("Sugerido (R$)", ascending=False), use_container_width=True,
-                         hide_index=True,
-                         column_config={"Sugerido (R$)": st.column_config.NumberColumn(format="R$ %.2f")})
+    allow_sell = c_sell.toggle("Permitir vendas", value=False)
+    round_lot = c_lot.toggle("Lote padrão (100)", value=False, help="Desligado: mercado fracionário, de 1 em 1.")
+
+    all_targets = {**{k: v for k, v in targets.items() if k.startswith(ASSET_PREFIX)}, **new_targets}
+    assets, classes, leftover = rebalance_plan(dfb, all_targets, aporte, allow_sell=allow_sell, round_lot=round_lot)
+
+    st.dataframe(classes.rename(columns={"Atual_Pct": "Atual %", "Alvo_Pct": "Alvo %", "Valor_Ordem": "Ordem (R$)",
+                                         "Pos_Pct": "Depois %"}),
+                 use_container_width=True, hide_index=True,
+                 column_config={"Atual %": st.column_config.NumberColumn(format="%.2f %%"),
+                                "Alvo %": st.column_config.NumberColumn(format="%.2f %%"),
+                                "Ordem (R$)": st.column_config.NumberColumn(format="R$ %.2f"),
+                                "Depois %": st.column_config.NumberColumn(format="%.2f %%")})
+
+    orders = assets[assets["Qtd_Ordem"].abs() > 1e-9].copy()
+    if orders.empty:
+        st.info("Nada a fazer com esse valor: nenhum lote cabe ou a carteira já está no alvo.")
+        return
+    orders["Operação"] = orders["Qtd_Ordem"].map(lambda q: "Comprar" if q > 0 else "Vender")
+    orders = orders.sort_values("Valor_Ordem", ascending=False)
+    st.dataframe(
+        orders[["Operação", "Ativo", "Qtd_Ordem", "Valor_Ordem", "Alvo_Pct", "Pos_Pct"]].rename(
+            columns={"Qtd_Ordem": "Qtd", "Valor_Ordem": "Valor (R$)", "Alvo_Pct": "Alvo %", "Pos_Pct": "Depois %"}),
+        use_container_width=True, hide_index=True,
+        column_config={"Qtd": st.column_config.NumberColumn(format="%.4g"),
+                       "Valor (R$)": st.column_config.NumberColumn(format="R$ %.2f"),
+                       "Alvo %": st.column_config.NumberColumn(format="%.2f %%"),
+                       "Depois %": st.column_config.NumberColumn(format="%.2f %%")})
+    st.caption(f"Sobra em caixa: {fmt_money_brl(leftover, 2)}")
 
 
 def _render_monitor_fixed(df_calc: pd.DataFrame):
@@ -221,22 +252,25 @@ def _render_monitor_fixed(df_calc: pd.DataFrame):
         st.info("🙈 Detalhes dos ativos ocultos pelo Modo Privacidade.")
         return
 
-    cols = ["Ativo", "Qtd", "Preco_Medio", "Preco_Atual_BRL", "PnL_Pct", "Total_BRL", "Var_Dia_Pct"]
+    cols = ["Ativo", "Qtd", "Preco_Medio", "Preco_Atual_BRL", "PnL_Pct", "Total_BRL", "Var_Dia_Pct", "DY_12m_Pct",
+            "Proventos_12m_BRL"]
     live_df = df_calc[cols].copy()
     for col in cols[1:]: live_df[col] = pd.to_numeric(live_df[col], errors="coerce").fillna(0.0)
     live_df = live_df.sort_values("PnL_Pct", ascending=False).reset_index(drop=True)
     live_df = live_df.rename(
         columns={"Preco_Atual_BRL": "Cotação", "PnL_Pct": "Rentab %", "Total_BRL": "Total", "Var_Dia_Pct": "24h %",
-                 "Preco_Medio": "PM"})
+                 "Preco_Medio": "PM", "DY_12m_Pct": "DY 12m %", "Proventos_12m_BRL": "Proventos 12m"})
 
     selection = st.dataframe(
-        live_df[["Ativo", "Qtd", "PM", "Cotação", "24h %", "Rentab %", "Total"]],
+        live_df[["Ativo", "Qtd", "PM", "Cotação", "24h %", "Rentab %", "Total", "DY 12m %", "Proventos 12m"]],
         column_config={
             "Qtd": st.column_config.NumberColumn(format="%.4f"), "PM": st.column_config.NumberColumn(format="R$ %.2f"),
             "Cotação": st.column_config.NumberColumn(format="R$ %.2f"),
             "24h %": st.column_config.NumberColumn(format="%.2f %%"),
             "Rentab %": st.column_config.NumberColumn(format="%.2f %%"),
             "Total": st.column_config.NumberColumn(format="R$ %.2f"),
+            "DY 12m %": st.column_config.NumberColumn(format="%.2f %%"),
+            "Proventos 12m": st.column_config.NumberColumn(format="R$ %.2f"),
         },
         hide_index=True, use_container_width=True, height=420, on_select="rerun", selection_mode="single-row"
     )
@@ -247,7 +281,7 @@ def _render_monitor_fixed(df_calc: pd.DataFrame):
 
 
 def _render_treemap_and_insights(df_calc: pd.DataFrame):
-    if px is None: return
+    if not px: return
 
     # Se privacidade ON, não mostra mapa pois revela tamanho das posições
     if st.session_state.get("privacy_mode", False):
@@ -295,34 +329,151 @@ def _render_treemap_and_insights(df_calc: pd.DataFrame):
 def _render_manage(username: str):
     st.markdown("### 🧰 Gerenciamento")
     # Gerenciamento não mascara pois é para edição
-    df_edit = _ensure_wallet_columns(st.session_state.get("carteira_df", pd.DataFrame(columns=CARTEIRA_COLS)))
+    manual = _ensure_wallet_columns(st.session_state.get("carteira_df", pd.DataFrame(columns=CARTEIRA_COLS)))
+    # ativos do livro mudam por operação; a linha manual deles fica guardada, mas fora do editor
+    owned = ledger_tickers(list_positions(username, include_closed=True))
+    in_ledger = ticker_keys(manual).isin(owned) if not manual.empty else manual["Ativo"].isin(owned)
+    if owned:
+        st.caption(f"Controlados pelo livro de operações (edite registrando operações abaixo): "
+                   f"{', '.join(sorted(k[:-3] if k.endswith('.SA') else k for k in owned))}.")
+    # category vira selectbox fechado no editor; aqui Tipo/Moeda seguem texto livre
+    df_edit = manual[~in_ledger].astype({c: "object" for c in CARTEIRA_CAT_COLS})
     edited = st.data_editor(df_edit[["Tipo", "Ativo", "Qtd", "Preco_Medio", "Moeda", "Obs"]], num_rows="dynamic",
                             use_container_width=True, key="editor_carteira", height=500)
     c1, c2, c3 = st.columns([1, 2, 1])
     with c2:
         if st.button("💾 Salvar Alterações", type="primary", use_container_width=True):
-            edited["Tipo"] = edited["Tipo"].astype(str).apply(_normalize_tipo)
-            if "Nome" not in edited.columns: edited["Nome"] = edited["Ativo"]
-            st.session_state["carteira_df"] = _ensure_wallet_columns(edited)
-            save_user_data_db(username, st.session_state["carteira_df"],
-                              st.session_state.get("gastos_df", pd.DataFrame()))
-            st.toast("Carteira salva!", icon="✅")
-            st.rerun()
+            typed = _ensure_wallet_columns(edited.assign(Nome=edited["Ativo"]))
+            clash = sorted(set(typed.loc[ticker_keys(typed).isin(owned), "Ativo"].astype(str))) \
+                if not typed.empty else []
+            if clash:
+                st.warning(f"{', '.join(clash)} já vem do livro de operações: registre uma operação em vez de "
+                           f"editar a quantidade.")
+            else:
+                edited["Tipo"] = edited["Tipo"].astype(str).apply(_normalize_tipo)
+                if "Nome" not in edited.columns: edited["Nome"] = edited["Ativo"]
+                st.session_state["carteira_df"] = _ensure_wallet_columns(
+                    pd.concat([_ensure_wallet_columns(edited), manual[in_ledger]], ignore_index=True))
+                queue_wallet_save(username, st.session_state["carteira_df"])
+                st.toast("Carteira salva!", icon="✅")
+                st.rerun()
+
+    _render_ledger(username)
+
+
+def _render_ledger(username: str):
+    st.markdown("### 🧾 Operações")
+    st.caption("Compras, vendas e proventos registrados aqui atualizam quantidade e preço médio sozinhos.")
+
+    with st.form("form_trade", clear_on_submit=True):
+        c1, c2, c3, c4 = st.columns([1, 1.2, 1, 0.8])
+        kind = c1.selectbox("Operação", list(KIND_LABELS), format_func=KIND_LABELS.get)
+        ativo = c2.text_input("Ticker", placeholder="PETR4").upper().strip()
+        data = c3.date_input("Data", format="DD/MM/YYYY")
+        moeda = c4.selectbox("Moeda", ["BRL", "USD", "EUR", "GBP"])
+        c5, c6, c7, c8 = st.columns(4)
+        qtd = c5.number_input("Quantidade", min_value=0.0, step=1.0)
+        preco = c6.number_input("Preço (por cota)", min_value=0.0, step=0.01, format="%.2f")
+        taxas = c7.number_input("Taxas", min_value=0.0, step=0.01, format="%.2f")
+        tipo = c8.selectbox("Tipo", ["Ação/ETF", "Cripto", "Renda Fixa"])
+        if st.form_submit_button("Registrar", type="primary", use_container_width=True):
+            # primeira operação de um ativo que já estava na carteira: o saldo manual vira abertura
+            owned = ledger_tickers(list_positions(username, include_closed=True))
+            tipo = _normalize_tipo(tipo)
+            opening = None if ticker_key(ativo, tipo, moeda) in owned else opening_from(
+                st.session_state.get("carteira_df"), ativo, tipo, moeda)
+            try:
+                record_trade(username, ativo, kind, qtd, preco, data=data, taxas=taxas, tipo=tipo, moeda=moeda,
+                             opening=opening)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                # o livro já está no banco; a carteira manual não muda
+                if opening:
+                    st.toast(f"Saldo de {opening[0]:g} {ativo} da carteira entrou como abertura.", icon="🧾")
+                st.toast(f"{KIND_LABELS[kind]} de {ativo} registrada!", icon="✅")
+                st.rerun()
+
+    _render_b3_import(username, key="up_b3")
+
+    positions = list_positions(username, include_closed=True)
+    if not positions:
+        return
+    pos_df = pd.DataFrame(positions)
+    pos_df["Preço médio"] = [avg_price(p) for p in positions]
+    pos_df["recebido"] = pos_df["ativo"].map(received_income(username)).fillna(0.0)
+    st.dataframe(
+        pos_df[["ativo", "qtd", "Preço médio", "realizado", "proventos", "recebido", "last_data"]],
+        hide_index=True, use_container_width=True,
+        column_config={
+            "ativo": "Ativo", "qtd": "Qtd", "last_data": "Última operação",
+            "Preço médio": st.column_config.NumberColumn(format="%.2f"),
+            "realizado": st.column_config.NumberColumn("Lucro realizado", format="%.2f"),
+            "proventos": st.column_config.NumberColumn("Proventos lançados", format="%.2f"),
+            "recebido": st.column_config.NumberColumn("Proventos (histórico)", format="%.2f",
+                                                      help="Calculado pelos eventos do ativo e pela quantidade na data-com."),
+        },
+    )
+    with st.expander("Últimas operações"):
+        trades = pd.DataFrame(list_trades(username, limit=50))
+        trades["kind"] = trades["kind"].map(KIND_LABELS)
+        st.dataframe(trades[["data", "kind", "ativo", "qtd", "preco", "taxas", "source"]], hide_index=True,
+                     use_container_width=True)
+
+
+def _render_b3_import(username: str, key: str):
+    up = st.file_uploader("📂 Importar extrato da B3 (CSV/XLSX)", type=["csv", "xlsx"], key=key,
+                          help="Área do Investidor > Extratos > Negociação (operações) ou Posição (saldo atual).")
+    if not up:
+        return
+    try:
+        with st.spinner("Lendo extrato..."):
+            kind, df_imp, resumo = parse_statement(up, up.name)
+    except (StatementError, ValueError) as e:
+        st.error(f"Não consegui ler o arquivo: {e}")
+        return
+    if df_imp.empty:
+        st.warning("Nenhuma operação de ações/FIIs encontrada no arquivo.")
+        return
+
+    if kind == "negociacao":
+        st.caption(f"{resumo['linhas']} linhas → {resumo['registros']} operações em {resumo['ativos']} ativos, "
+                   f"de {resumo['de']:%d/%m/%Y} a {resumo['ate']:%d/%m/%Y}. Reimportar o mesmo período substitui.")
+    else:
+        st.caption(f"Posição com {resumo['ativos']} ativos. Ativos novos entram com o preço de fechamento como "
+                   f"preço médio.")
+    if st.button("🚀 Importar", type="primary", use_container_width=True, key=f"{key}_go"):
+        try:
+            if kind == "negociacao":
+                # vai para o livro (partindo do saldo manual de cada ativo); a carteira manual não muda
+                import_trades(username, df_imp, st.session_state.get("carteira_df"))
+            else:
+                carteira = merge_holdings(st.session_state.get("carteira_df"), df_imp)
+                st.session_state["carteira_df"] = carteira
+                queue_wallet_save(username, carteira)
+        except ValueError as e:  # ex.: venda sem a compra correspondente no período do extrato
+            st.error(f"Importação cancelada: {e}")
+            return
+        st.session_state["wallet_mode"] = True
+        st.toast(f"{resumo['registros']} registros importados!", icon="✅")
+        st.rerun()
 
 
 # =========================================================
 # MAIN
 # =========================================================
+@timed()
 def render_carteira():
     _apply_wallet_css()
     st.markdown("## 💼 Minha Carteira")
     username = st.session_state.get("username", "")
     df = _ensure_wallet_columns(st.session_state.get("carteira_df", pd.DataFrame(columns=CARTEIRA_COLS)))
-    if df.empty and not st.session_state.get("wallet_mode", False):
+    positions = list_positions(username, include_closed=True)
+    if df.empty and not positions and not st.session_state.get("wallet_mode", False):
         st.info("Você ainda não tem uma carteira configurada.")
         c1, c2 = st.columns(2)
         with c1:
-            st.file_uploader("📂 Importar CSV", key="up_start")
+            _render_b3_import(username, key="up_start")
         with c2:
             if st.button("✨ Criar Nova Carteira", use_container_width=True):
                 st.session_state["carteira_df"] = pd.DataFrame(columns=CARTEIRA_COLS)
@@ -330,12 +481,24 @@ def render_carteira():
                 st.rerun()
         return
 
-    st.session_state["carteira_df"] = df
+    # desdobramentos: só as linhas manuais são ajustadas e salvas; o livro já sai ajustado das posições
+    df, splits, marks = apply_pending_splits(username, df, skip=[p["ativo"] for p in positions])
+    if splits:
+        st.session_state["carteira_df"] = df
+        queue_wallet_save(username, df, split_marks=marks)
+        flush_writes(username)  # a marca precisa estar no banco antes do próximo rerun
+        st.toast("Desdobramento/grupamento aplicado: " + ", ".join(f"{t} ×{f:g}" for t, f in splits), icon="✂️")
+    df = merge_positions(df, positions)  # visão: desdobramento aplicado no livro aparece sem recarregar
     if df.empty:
         df_calc, kpi = pd.DataFrame(), {}
     else:
         with st.spinner("Atualizando cotações..."):
             df_calc, kpi = atualizar_precos_carteira_memory(df)
+        # proventos: leitura local; a busca (no máximo 1x/dia por ticker) roda numa thread
+        variable = ~df_calc["Tipo"].astype(str).isin(["Renda Fixa", "Caixa"])
+        refresh_in_background(df_calc.loc[variable, "Ticker_YF"])
+        df_calc = trailing_income(df_calc)
+        kpi["income_12m"] = float(df_calc["Proventos_12m_BRL"].sum())
 
     total_brl = float(kpi.get("total_brl", 0.0))
     pnl_brl = float(kpi.get("pnl_brl", 0.0))
@@ -346,6 +509,7 @@ def render_carteira():
     # --- APLICAÇÃO DA MÁSCARA (AQUI ESTÁ A CORREÇÃO) ---
     val_total = _mask(total_brl, _compact_brl)
     val_pnl = _mask(pnl_brl, _compact_brl)
+    val_income = _mask(float(kpi.get("income_12m", 0.0)), _compact_brl)
 
     # Mascara a porcentagem se necessário
     if st.session_state.get("privacy_mode", False):
@@ -357,9 +521,14 @@ def render_carteira():
         <div class="kpi-container">
           <div class="kpi-card"><div class="kpi-label">PATRIMÔNIO TOTAL</div><div class="kpi-value">{val_total}</div></div>
           <div class="kpi-card"><div class="kpi-label">LUCRO / PREJUÍZO</div><div class="kpi-value">{val_pnl}</div><div class="kpi-sub {sign_cls}">{val_pct}</div></div>
+          <div class="kpi-card"><div class="kpi-label">PROVENTOS 12M</div><div class="kpi-value">{val_income}</div></div>
           <div class="kpi-card"><div class="kpi-label">TOTAL DE ATIVOS</div><div class="kpi-value">{len(df_calc)}</div></div>
         </div>
         """, unsafe_allow_html=True)
+    if kpi.get("as_of"):
+        st.caption(fmt_as_of(kpi["as_of"]))
+    if kpi.get("fx_missing"):
+        st.warning(f"Sem cotação de câmbio para {', '.join(kpi['fx_missing'])}: esses ativos ficam fora do total.")
 
     if "carteira_aba" not in st.session_state: st.session_state["carteira_aba"] = "visao_geral"
     nav1, nav2, nav3 = st.columns(3, gap="small")
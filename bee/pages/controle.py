@@ -12,8 +12,13 @@ import streamlit as st
 from bee.config import DB_FILE
 from bee.safe_imports import px
 from bee.formatters import fmt_money_brl
+from bee.state import set_gastos_df
+from bee.schema import GASTOS_CAT_COLS, categorize, coerce_gastos, parse_ptbr_number
+from bee.write_queue import flush_writes, queue_gastos_append
+from bee.profiling import timed
 from bee.db import (
-    save_user_data_db, get_budgets_db, set_budget_db,
+    search_gastos_db, list_gastos_page_db, apply_gastos_changes_db, load_gastos_db,
+    get_budgets_db, set_budget_db,
     list_rules_db, add_rule_db,
     list_recurring_db, add_recurring_db, set_recurring_active_db
 )
@@ -118,7 +123,7 @@ def _set_recurring_active(u, rid, a): set_recurring_active_db(u, rid, a, DB_FILE
 
 
 def _ensure_gastos_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or len(df) == 0: return pd.DataFrame(columns=GASTOS_COLS)
+    if df is None or len(df) == 0: return coerce_gastos(None)
     df = df.copy()
     rename_map = {}
     for col in df.columns:
@@ -144,11 +149,7 @@ def _ensure_gastos_columns(df: pd.DataFrame) -> pd.DataFrame:
     df["Data"] = pd.to_datetime(df["Data"], dayfirst=True, errors="coerce")
     df = df.dropna(subset=["Data"])
 
-    if df["Valor"].dtype == object:
-        df["Valor"] = df["Valor"].astype(str).str.replace(r"[R$ ]", "", regex=True).str.replace(".", "",
-                                                                                                regex=False).str.replace(
-            ",", ".", regex=False)
-    df["Valor"] = pd.to_numeric(df["Valor"], errors="coerce").fillna(0.0)
+    df["Valor"] = parse_ptbr_number(df["Valor"])
 
     df["Tipo"] = df["Tipo"].astype(str).str.strip().str.capitalize()
     df.loc[~df["Tipo"].isin(["Entrada", "Saída"]), "Tipo"] = "Saída"
@@ -160,24 +161,64 @@ def _ensure_gastos_columns(df: pd.DataFrame) -> pd.DataFrame:
     df["Pagamento"] = df["Pagamento"].astype(str).replace("nan", "").str.strip()
     df.loc[df["Pagamento"] == "", "Pagamento"] = "Outros"
 
+    return coerce_gastos(df)
+
+
+def _gastos_canonical() -> pd.DataFrame:
+    """Frame de gastos normalizado uma única vez por versão da sessão.
+
+    Quem troca o frame sem passar por set_gastos_df (ex.: login) é detectado pela
+    identidade do objeto e normalizado de novo na próxima leitura.
+    """
+    raw = st.session_state.get("gastos_df")
+    ver = st.session_state.get("gastos_version", 0)
+    cached = st.session_state.get("_gastos_canon")
+    if cached is not None and cached[0] == ver and cached[1] is raw:
+        return raw
+
+    df = _ensure_gastos_columns(raw)
+    st.session_state["gastos_df"] = df
+    st.session_state["_gastos_canon"] = (ver, df)
+    return df
+
+
+def _set_gastos_canonical(df: pd.DataFrame) -> pd.DataFrame:
+    """Publica um frame já normalizado como nova versão canônica da sessão."""
+    set_gastos_df(df)
+    st.session_state["_gastos_canon"] = (st.session_state["gastos_version"], df)
     return df
 
 
-def _append_rows(gastos_df: pd.DataFrame, rows: list[dict]) -> pd.DataFrame:
-    base = _ensure_gastos_columns(gastos_df)
-    if not rows: return base
-    new_df = _ensure_gastos_columns(pd.DataFrame(rows))
-    return pd.concat([base, new_df], ignore_index=True)
+def _new_rows(rows: list[dict]) -> pd.DataFrame:
+    """Linhas novas já normalizadas: as mesmas vão para a sessão e para o banco."""
+    return _ensure_gastos_columns(pd.DataFrame(rows))
+
+
+def _append_rows(gastos_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """Anexa linhas novas (de _new_rows) a um frame canônico."""
+    if new_df.empty: return gastos_df
+    if gastos_df is None or gastos_df.empty: return new_df
+    # concat de categorias diferentes vira object; reconverte só as 3 colunas
+    out = pd.concat([gastos_df, new_df], ignore_index=True)
+    return categorize(out, GASTOS_CAT_COLS)
 
 
 # --- FUNÇÃO RESTAURADA ---
+def _replace_months(gastos_df: pd.DataFrame, fresh: pd.DataFrame, months: set) -> pd.DataFrame:
+    """Troca no frame canônico as linhas dos meses recarregados do banco."""
+    keep = gastos_df[~_ym(gastos_df["Data"]).isin(months)]
+    out = _append_rows(keep, _ensure_gastos_columns(fresh))
+    return out.sort_values("Data", kind="stable", ignore_index=True)
+
+
 def _spent_by_category_month(gastos_df: pd.DataFrame, month_key: str) -> dict:
-    df = _ensure_gastos_columns(gastos_df)
-    if df.empty: return {}
+    """Espera o frame canônico (ver _gastos_canonical)."""
+    df = gastos_df
+    if df is None or df.empty: return {}
     # Filtra mês e apenas saídas
     dfm = df[(_ym(df["Data"]) == month_key) & (df["Tipo"] == "Saída")]
     if dfm.empty: return {}
-    return dfm.groupby("Categoria")["Valor"].sum().to_dict()
+    return dfm.groupby("Categoria", observed=True)["Valor"].sum().to_dict()
 
 
 # --- RECORRÊNCIAS ---
@@ -198,8 +239,9 @@ def _mark_recurring_applied(username, rec_id, yyyymm):
 
 
 def _apply_recurring_for_month(username, gastos_df, yyyymm):
+    """Lança as recorrências do mês ainda não lançadas -> (frame, linhas novas)."""
     rec_list = _list_recurring(username)
-    if not rec_list: return _ensure_gastos_columns(gastos_df), 0
+    if not rec_list: return gastos_df, _new_rows([])
     df_rec = pd.DataFrame(rec_list)
     created = 0
     rows = []
@@ -219,8 +261,9 @@ def _apply_recurring_for_month(username, gastos_df, yyyymm):
         })
         _mark_recurring_applied(username, rec_id, yyyymm)
         created += 1
-    if created > 0: gastos_df = _append_rows(gastos_df, rows)
-    return _ensure_gastos_columns(gastos_df), created
+    new_df = _new_rows(rows)
+    if created > 0: gastos_df = _append_rows(gastos_df, new_df)
+    return gastos_df, new_df
 
 
 # --- IMPORTAÇÃO ---
@@ -260,7 +303,7 @@ def _nav_btn(label: str, tab_key: str, icon: str = ""):
 
 def _render_add_transaction_inline(username: str):
     with st.expander("➕ Nova Transação", expanded=False):
-        df_g = _ensure_gastos_columns(st.session_state.get("gastos_df", pd.DataFrame(columns=GASTOS_COLS)))
+        df_g = _gastos_canonical()
 
         default_cats = ["Moradia", "Alimentação", "Transporte", "Lazer", "Investimento", "Salário", "Saúde", "Educação"]
         existing_cats = df_g["Categoria"].dropna().unique().tolist()
@@ -296,15 +339,15 @@ def _render_add_transaction_inline(username: str):
                     "Descricao": d_desc.strip(), "Tipo": d_tipo,
                     "Valor": float(d_val), "Pagamento": d_pag
                 }
-                df_new = _append_rows(df_g, [new_row])
-                st.session_state["gastos_df"] = df_new
-                save_user_data_db(username, st.session_state.get("carteira_df", pd.DataFrame()), df_new)
+                new_df = _new_rows([new_row])
+                _set_gastos_canonical(_append_rows(df_g, new_df))
+                queue_gastos_append(username, new_df)
                 st.toast("Salvo", icon="✅")
                 st.rerun()
 
 
 def _render_dashboard(username: str):
-    df_g = _ensure_gastos_columns(st.session_state.get("gastos_df", pd.DataFrame(columns=GASTOS_COLS)))
+    df_g = _gastos_canonical()
     today = datetime.now()
     all_months = sorted(list(set(_ym(df_g["Data"]).dropna().tolist()) | {_month_key(today)}))
 
@@ -331,7 +374,7 @@ def _render_dashboard(username: str):
     """, unsafe_allow_html=True)
 
     if not dfm.empty and total_sai > 0:
-        df_cat = dfm[dfm["Tipo"] == "Saída"].groupby("Categoria")["Valor"].sum().reset_index().sort_values("Valor",
+        df_cat = dfm[dfm["Tipo"] == "Saída"].groupby("Categoria", observed=True)["Valor"].sum().reset_index().sort_values("Valor",
                                                                                                            ascending=False)
         l, r = st.columns([1.5, 1])
         with l:
@@ -354,7 +397,7 @@ def _render_dashboard(username: str):
 
 
 def _render_extrato(username: str):
-    df_g = _ensure_gastos_columns(st.session_state.get("gastos_df", pd.DataFrame(columns=GASTOS_COLS)))
+    df_g = _gastos_canonical()
     today = datetime.now()
     all_months = sorted(list(set(_ym(df_g["Data"]).dropna().tolist()) | {_month_key(today)}))
 
@@ -364,25 +407,83 @@ def _render_extrato(username: str):
     with c2:
         mes = st.selectbox("Mês", all_months, index=len(all_months) - 1, key="ext_mes", label_visibility="collapsed")
 
-    df_new, count = _apply_recurring_for_month(username, df_g, mes)
-    if count > 0:
-        st.session_state["gastos_df"] = df_new
-        save_user_data_db(username, st.session_state.get("carteira_df", pd.DataFrame()), df_new)
+    df_new, rec_rows = _apply_recurring_for_month(username, df_g, mes)
+    if not rec_rows.empty:
+        _set_gastos_canonical(df_new)
+        queue_gastos_append(username, rec_rows)
         st.toast(f"Recorrências lançadas.", icon="✅")
         st.rerun()
 
     dfm = df_g[_ym(df_g["Data"]) == mes].copy().sort_values("Data", ascending=False)
 
     f1, f2 = st.columns([2, 1])
-    q = f1.text_input("Buscar", placeholder="Filtrar...", label_visibility="collapsed", key="ext_busca")
+    q = f1.text_input("Buscar", placeholder="Buscar em todo o histórico...", label_visibility="collapsed",
+                      key="ext_busca")
     cat = f2.selectbox("Categoria", ["Todas"] + sorted(dfm["Categoria"].unique()), label_visibility="collapsed",
                        key="ext_cat")
 
-    if q: dfm = dfm[dfm["Descricao"].str.lower().str.contains(q.lower(), na=False)]
-    if cat != "Todas": dfm = dfm[dfm["Categoria"] == cat]
+    if q.strip():
+        _render_search_results(username, q)
+        return
 
-    edited = st.data_editor(
-        dfm, use_container_width=True, num_rows="dynamic", height=450, key="editor_extrato",
+    _render_extrato_window(username, mes, None if cat == "Todas" else cat)
+
+
+EXTRATO_PAGE_SIZE = 100
+
+
+def _extrato_page(username: str, mes: str, cat):
+    """Página atual do editor. Guarda a pilha de cursores (keyset) por mês/categoria."""
+    scope = (mes, cat)
+    if st.session_state.get("_ext_scope") != scope:
+        st.session_state["_ext_scope"] = scope
+        st.session_state["ext_cursors"] = [None]
+    cursors = st.session_state["ext_cursors"]
+    # cada edição no data_editor é um rerun: a página só volta ao banco quando muda a página
+    # ou a versão dos gastos da sessão (lançamento, recorrência, importação, save)
+    page_key = (username, scope, cursors[-1], st.session_state.get("gastos_version", 0))
+    cached = st.session_state.get("_ext_page")
+    if cached is not None and cached[0] == page_key:
+        return cached[1], cached[2], len(cursors) - 1
+
+    flush_writes(username, gastos_only=True)  # linhas novas ainda na fila entram na página
+    rows, next_cursor = list_gastos_page_db(username, mes, cat, after=cursors[-1], limit=EXTRATO_PAGE_SIZE)
+
+    df_page = pd.DataFrame([list(r.values()) for r in rows], columns=["tx_id"] + GASTOS_COLS)
+    df_page["Data"] = pd.to_datetime(df_page["Data"], format="%Y-%m-%d", errors="coerce")
+    df_page = df_page.set_index("tx_id")
+    st.session_state["_ext_page"] = (page_key, df_page, next_cursor)
+    return df_page, next_cursor, len(cursors) - 1
+
+
+def _extrato_change_set(df_page: pd.DataFrame, editor_state: dict, mes: str):
+    """Traduz o estado do st.data_editor (posições) em updates/deletes/inserts por tx_id."""
+    ids = df_page.index.tolist()
+    updates = {}
+    for pos, changes in (editor_state.get("edited_rows") or {}).items():
+        pos = int(pos)
+        if pos < len(ids) and changes:
+            updates[ids[pos]] = dict(changes)
+    deletes = [ids[int(pos)] for pos in (editor_state.get("deleted_rows") or []) if int(pos) < len(ids)]
+    for tx_id in deletes:
+        updates.pop(tx_id, None)
+    inserts = []
+    for row in editor_state.get("added_rows") or []:
+        row = dict(row)
+        if not row.get("Data"): row["Data"] = f"{mes}-01"
+        inserts.append(row)
+    return updates, deletes, inserts
+
+
+def _render_extrato_window(username: str, mes: str, cat):
+    aviso = st.session_state.pop("_ext_aviso", None)
+    if aviso:
+        st.warning(aviso)
+    df_page, next_cursor, page_idx = _extrato_page(username, mes, cat)
+
+    editor_key = f"editor_extrato_{mes}_{cat}_{page_idx}_{st.session_state.get('gastos_version', 0)}"
+    st.data_editor(
+        df_page, use_container_width=True, num_rows="dynamic", height=450, key=editor_key, hide_index=True,
         column_config={
             "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
             "Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f"),
@@ -390,19 +491,71 @@ def _render_extrato(username: str):
             "Pagamento": st.column_config.SelectboxColumn("Pgto", options=["Pix", "Crédito", "Débito", "Dinheiro"])
         }
     )
+    updates, deletes, inserts = _extrato_change_set(df_page, st.session_state.get(editor_key) or {}, mes)
+    n_changes = len(updates) + len(deletes) + len(inserts)
 
-    if st.button("Atualizar Tabela", type="primary", use_container_width=True):
-        df_others = df_g[_ym(df_g["Data"]) != mes]
-        df_final = pd.concat([df_others, edited], ignore_index=True)
-        st.session_state["gastos_df"] = _ensure_gastos_columns(df_final)
-        save_user_data_db(username, st.session_state.get("carteira_df", pd.DataFrame()), st.session_state["gastos_df"])
-        st.toast("Atualizado", icon="✅")
+    c_prev, c_save, c_next = st.columns([1, 2, 1])
+    if c_prev.button("⬅ Anterior", use_container_width=True, disabled=page_idx == 0, key="ext_prev"):
+        st.session_state["ext_cursors"].pop()
+        st.rerun()
+    if c_next.button("Próxima ➡", use_container_width=True, disabled=next_cursor is None, key="ext_next"):
+        st.session_state["ext_cursors"].append(next_cursor)
+        st.rerun()
+
+    label = f"Salvar {n_changes} alteração(ões)" if n_changes else "Atualizar Tabela"
+    if c_save.button(label, type="primary", use_container_width=True, disabled=n_changes == 0):
+        flush_writes(username, gastos_only=True)
+        res = apply_gastos_changes_db(username, updates, deletes, inserts)
+        if res["ausentes"]:
+            # página de antes de uma restauração (tx_id renumerado): nada foi gravado
+            st.session_state["ext_cursors"] = [None]
+            _set_gastos_canonical(_ensure_gastos_columns(load_gastos_db(username)))
+            st.session_state["_ext_aviso"] = (f"{len(res['ausentes'])} transação(ões) mudaram no banco desde que "
+                                              "a página abriu. Nada foi salvo; refaça as alterações.")
+            st.rerun()
+        # recarrega do banco só os meses tocados (o da página + os das datas gravadas)
+        months = {mes} | res["meses"]
+        _set_gastos_canonical(_replace_months(_gastos_canonical(), load_gastos_db(username, months=months), months))
+        st.toast(f"{res['afetadas']} linha(s) atualizada(s)", icon="✅")
+        st.rerun()
+
+
+EXTRATO_SEARCH_PAGE = 50
+
+
+def _render_search_results(username: str, q: str):
+    """Resultados da busca full-text (todas as datas), paginados no banco."""
+    if st.session_state.get("_ext_busca_q") != q:
+        st.session_state["_ext_busca_q"] = q
+        st.session_state["ext_busca_page"] = 0
+    page = int(st.session_state.get("ext_busca_page", 0))
+
+    flush_writes(username, gastos_only=True)
+    rows, has_more = search_gastos_db(username, q, limit=EXTRATO_SEARCH_PAGE, offset=page * EXTRATO_SEARCH_PAGE)
+    if not rows:
+        st.info("Nenhuma transação encontrada.")
+        return
+
+    df_res = pd.DataFrame(rows).drop(columns=["tx_id"])
+    df_res.columns = GASTOS_COLS
+    df_res["Data"] = pd.to_datetime(df_res["Data"], format="%Y-%m-%d", errors="coerce")
+    st.caption(f"Resultados em todo o histórico • página {page + 1}. Limpe a busca para editar o mês.")
+    st.dataframe(df_res, use_container_width=True, hide_index=True, height=450,
+                 column_config={"Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                                "Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f")})
+
+    c_prev, _, c_next = st.columns([1, 2, 1])
+    if c_prev.button("⬅ Anterior", use_container_width=True, disabled=page == 0, key="ext_busca_prev"):
+        st.session_state["ext_busca_page"] = page - 1
+        st.rerun()
+    if c_next.button("Próxima ➡", use_container_width=True, disabled=not has_more, key="ext_busca_next"):
+        st.session_state["ext_busca_page"] = page + 1
         st.rerun()
 
 
 def _render_envelopes(username: str):
     st.subheader("Metas de Gasto")
-    df_g = _ensure_gastos_columns(st.session_state.get("gastos_df", pd.DataFrame(columns=GASTOS_COLS)))
+    df_g = _gastos_canonical()
     budgets = _get_budgets(username)
     spent = _spent_by_category_month(df_g, _month_key(datetime.now()))  # Função Restaurada!
 
@@ -538,9 +691,9 @@ def _render_import_excel(username: str):
                 "Valor": abs(float(valor_val)), "Pagamento": "Outros"
             })
 
-        df_new = _append_rows(st.session_state.get("gastos_df", pd.DataFrame()), rows)
-        st.session_state["gastos_df"] = df_new
-        save_user_data_db(username, st.session_state.get("carteira_df", pd.DataFrame()), df_new)
+        new_df = _new_rows(rows)
+        _set_gastos_canonical(_append_rows(_gastos_canonical(), new_df))
+        queue_gastos_append(username, new_df)
         st.success(f"{len(rows)} linhas importadas!")
         st.rerun()
 
@@ -548,6 +701,7 @@ def _render_import_excel(username: str):
 # =========================================================
 # MAIN ENTRY
 # =========================================================
+@timed()
 def render_controle():
     _apply_unified_css()
     username = st.session_state.get("username", "") or "guest"
@@ -2,14 +2,16 @@ import streamlit as st
 import pandas as pd
 
 # Imports relativos
-from ..safe_imports import yf
-from ..formatters import fmt_ptbr_number, fmt_money_brl, fmt_money_usd
+from ..formatters import fmt_as_of, fmt_ptbr_number, fmt_money_brl, fmt_money_usd
 from ..market_data import (
+    market_available,
     yf_last_and_prev_close,
     atualizar_precos_carteira_memory
 )
+from ..profiling import timed
 
 
+@timed()
 def render_home():
     # --- CABEÇALHO ---
     # Blindagem do nome do usuário
@@ -27,11 +29,13 @@ def render_home():
     ibov_val, ibov_pct = 0.0, 0.0
     usd_val, usd_pct = 0.0, 0.0
     btcu_val, btcu_pct = 0.0, 0.0
+    as_of = None
 
-    if yf:
+    if market_available():
         tickers = ["^BVSP", "BRL=X", "BTC-USD"]
         snap = yf_last_and_prev_close(tickers)
         if not snap.empty:
+            as_of = float(snap["as_of"].min())
             # IBOV
             row_ib = snap[snap["ticker"] == "^BVSP"]
             if not row_ib.empty:
@@ -58,6 +62,8 @@ def render_home():
         st.metric("DÓLAR", fmt_money_brl(usd_val, 2), f"{usd_pct:+.2f}%")
     with col3:
         st.metric("BITCOIN (USD)", fmt_money_usd(btcu_val, 0), f"{btcu_pct:+.2f}%")
+    if as_of:
+        st.caption(fmt_as_of(as_of))
 
     st.markdown("---")
 
@@ -65,6 +71,10 @@ def render_home():
     st.subheader("🚀 Destaques da Carteira (24h)")
 
     df_cart = st.session_state.get("carteira_df", pd.DataFrame())
+    if st.session_state.get("username"):
+        from ..ledger import wallet_view  # Lazy import
+
+        df_cart = wallet_view(st.session_state["username"], df_cart)  # manual + livro de operações
 
     if df_cart.empty:
         st.info("Sua carteira está vazia. Adicione ativos na aba 'Carteira' para ver os destaques.")
@@ -1,6 +1,7 @@
 import streamlit as st
 from ..market_data import get_google_news_items
 from ..formatters import human_time_ago
+from ..profiling import timed
 
 
 def _apply_news_css():
@@ -77,6 +78,7 @@ def _apply_news_css():
     """, unsafe_allow_html=True)
 
 
+@timed()
 def render_noticias():
     _apply_news_css()
 
@@ -0,0 +1,158 @@
+# bee/profiling.py
+# Instrumentação leve: onde cada rerun do Streamlit gasta tempo.
+#
+#   with span("css"): ...            # trecho
+#   @timed()                         # função inteira (nome = módulo.função)
+#   with rerun(): main()             # agrupa os spans de um rerun
+#
+# Os spans vão para um buffer circular do processo (PROFILE_BUFFER entradas) e, se
+# BEE_PROFILE_JSONL estiver definido, cada rerun é anexado ao arquivo no fim.
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from .config import PROFILE_BUFFER, PROFILE_ENABLED, PROFILE_JSONL
+
+_LOCK = threading.Lock()
+_SPANS: deque = deque(maxlen=max(1, PROFILE_BUFFER))
+_RERUN_IDS = itertools.count(1)
+_local = threading.local()
+
+
+def _current() -> dict:
+    ctx = getattr(_local, "ctx", None)
+    if ctx is None:
+        ctx = {"rerun": None, "depth": 0, "pending": None}
+        _local.ctx = ctx
+    return ctx
+
+
+def _record(name: str, ms: float, ctx: dict, error: bool) -> None:
+    rec = {"name": name, "ms": round(ms, 3), "ts": time.time(), "rerun": ctx["rerun"],
+           "depth": ctx["depth"], "error": error}
+    with _LOCK:
+        _SPANS.append(rec)
+    if ctx["pending"] is not None:
+        ctx["pending"].append(rec)
+
+
+_CONTROL_FLOW = None
+
+
+def _control_flow() -> tuple:
+    """st.stop()/st.rerun() levantam exceções de controle: saída normal, não erro."""
+    global _CONTROL_FLOW
+    if _CONTROL_FLOW is None:
+        try:
+            from streamlit.runtime.scriptrunner import RerunException, StopException  # Lazy import
+            _CONTROL_FLOW = (RerunException, StopException)
+        except ImportError:
+            _CONTROL_FLOW = ()
+    return _CONTROL_FLOW
+
+
+@contextmanager
+def span(name: str):
+    """Mede o bloco. Exceções contam, marcadas como erro; st.stop/st.rerun contam como saída normal."""
+    if not PROFILE_ENABLED:
+        yield
+        return
+    ctx = _current()
+    ctx["depth"] += 1
+    error = False
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        error = not isinstance(e, _control_flow())
+        raise
+    finally:
+        ctx["depth"] -= 1
+        _record(name, (time.perf_counter() - t0) * 1000.0, ctx, error)
+
+
+def timed(name: Optional[str] = None):
+    """Decorator: cada chamada vira um span."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+@contextmanager
+def rerun(name: str = "rerun"):
+    """Marca um rerun inteiro; os spans dentro dele ficam com o mesmo id."""
+    if not PROFILE_ENABLED:
+        yield
+        return
+    ctx = _current()
+    ctx["rerun"] = next(_RERUN_IDS)
+    ctx["pending"] = [] if PROFILE_JSONL else None
+    try:
+        with span(name):
+            yield
+    finally:
+        if ctx["pending"]:
+            _export(ctx["pending"])
+        ctx["rerun"] = None
+        ctx["pending"] = None
+
+
+def _export(records: List[dict]) -> None:
+    try:
+        with open(PROFILE_JSONL, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+
+# --------------------------------------------------------------------------------------
+# Leitura
+# --------------------------------------------------------------------------------------
+def recent_spans(limit: Optional[int] = None) -> List[dict]:
+    with _LOCK:
+        spans = list(_SPANS)
+    return spans[-limit:] if limit else spans
+
+
+def _percentile(sorted_ms: List[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = (len(sorted_ms) - 1) * p
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_ms) - 1)
+    return sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo)
+
+
+def span_stats() -> Dict[str, dict]:
+    """{nome: count, p50, p95, max, total} em ms, sobre o que ainda está no buffer."""
+    by_name: Dict[str, List[float]] = {}
+    for rec in recent_spans():
+        by_name.setdefault(rec["name"], []).append(rec["ms"])
+    out = {}
+    for name, values in by_name.items():
+        values.sort()
+        out[name] = {
+            "count": len(values),
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1],
+            "total": sum(values),
+        }
+    return out
+
+
+def reset() -> None:
+    with _LOCK:
+        _SPANS.clear()
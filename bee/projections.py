@@ -0,0 +1,166 @@
+# bee/projections.py
+# Monte Carlo de patrimônio: aportes, meta e retiradas com volatilidade e inflação.
+#
+#   simulate(initial=10_000, monthly=1_000, years=20, ret=0.10, vol=0.15, inflation=0.04,
+#            goal=1_000_000)
+#   -> {"years", "bands" (p5/p25/p50/p75/p95 por ano, em R$ de hoje), "success_prob", ...}
+#
+# Retorno mensal lognormal calibrado para que a média anual seja `ret` (nominal); inflação
+# fixa deflaciona tudo para reais de hoje. O laço é só no tempo (meses); cada passo opera
+# no vetor de todos os caminhos. Mesmos parâmetros + seed = mesmo resultado, então o
+# resultado fica num LRU pelo hash das entradas. Muitos caminhos (POOL_MIN_PATHS) podem
+# ser divididos entre processos, cada um com sua semente derivada (SeedSequence.spawn).
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_PATHS = 20_000
+POOL_MIN_PATHS = 200_000
+_CACHE_SIZE = 64
+_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _params_key(params: Dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=float).encode()).hexdigest()
+
+
+def _simulate_chunk(params: Dict, n_paths: int, seed) -> Dict[str, np.ndarray]:
+    """Núcleo: n_paths caminhos -> fotos anuais (reais), mês em que bateu a meta, falência."""
+    rng = np.random.default_rng(seed)
+    months = int(round(params["years"] * 12))
+    acc_months = int(round(params["contribution_years"] * 12))
+    withdraw_from = int(round(params["withdraw_after_years"] * 12))
+
+    sigma_m = params["vol"] / np.sqrt(12)
+    mu_m = np.log1p(params["ret"]) / 12 - sigma_m ** 2 / 2  # média de exp(mu + sigma·Z) bate `ret` ao ano
+    infl_m = (1 + params["inflation"]) ** (1 / 12)
+
+    wealth = np.full(n_paths, float(params["initial"]))
+    hit_month = np.full(n_paths, -1, dtype=np.int32)
+    ruined = np.zeros(n_paths, dtype=bool)
+    snaps = np.empty((months // 12 + 1, n_paths), dtype=np.float32)
+    snaps[0] = wealth
+    goal = float(params["goal"])
+    index = 1.0  # inflação acumulada
+
+    growth = None
+    for t in range(months):
+        if t % 12 == 0:
+            # um ano de fatores por vez, em float32 e no lugar: gerar/exponenciar é o grosso do custo
+            growth = rng.standard_normal((min(12, months - t), n_paths), dtype=np.float32)
+            growth *= sigma_m
+            growth += mu_m
+            np.exp(growth, out=growth)
+        # valores em reais de hoje, corrigidos pela inflação até o mês t
+        if t < acc_months:
+            wealth += params["monthly"] * (index if params["index_contributions"] else 1.0)
+        if params["withdrawal"] > 0 and t >= withdraw_from:
+            wealth -= params["withdrawal"] * index
+            broke = wealth <= 0
+            ruined |= broke
+            wealth[broke] = 0.0
+        wealth *= growth[t % 12]
+        index *= infl_m
+        if goal > 0:
+            hit_month[(hit_month < 0) & (wealth / index >= goal)] = t + 1
+        if (t + 1) % 12 == 0:
+            snaps[(t + 1) // 12] = wealth / index
+    return {"snaps": snaps, "hit_month": hit_month, "ruined": ruined}
+
+
+def _run(params: Dict, n_paths: int, seed: int, workers: int) -> Dict[str, np.ndarray]:
+    if workers <= 1:
+        return _simulate_chunk(params, n_paths, seed)
+    children = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [n_paths // workers + (1 if i < n_paths % workers else 0) for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_simulate_chunk, [params] * workers, sizes, children))
+    return {
+        "snaps": np.concatenate([p["snaps"] for p in parts], axis=1),
+        "hit_month": np.concatenate([p["hit_month"] for p in parts]),
+        "ruined": np.concatenate([p["ruined"] for p in parts]),
+    }
+
+
+def simulate(initial: float = 0.0, monthly: float = 0.0, years: float = 20, ret: float = 0.10, vol: float = 0.15,
+             inflation: float = 0.04, goal: float = 0.0, withdrawal: float = 0.0,
+             withdraw_after_years: Optional[float] = None, contribution_years: Optional[float] = None,
+             index_contributions: bool = True, n_paths: int = DEFAULT_PATHS, seed: int = 42,
+             workers: Optional[int] = None) -> Dict:
+    """Projeção em reais de hoje. Taxas em fração ao ano (0.10 = 10%).
+
+    Aportes vão até `contribution_years` (padrão: até começar a retirar, ou o prazo todo);
+    retiradas mensais começam em `withdraw_after_years`. Sucesso = nunca zerar e, se houver
+    meta, terminar com pelo menos `goal`. workers=None usa processos só a partir de
+    POOL_MIN_PATHS caminhos.
+    """
+    if withdraw_after_years is None:
+        withdraw_after_years = years if withdrawal <= 0 else 0.0
+    if contribution_years is None:
+        contribution_years = withdraw_after_years if withdrawal > 0 else years
+    params = {
+        "initial": float(initial), "monthly": float(monthly), "years": float(years), "ret": float(ret),
+        "vol": float(vol), "inflation": float(inflation), "goal": float(goal), "withdrawal": float(withdrawal),
+        "withdraw_after_years": float(withdraw_after_years), "contribution_years": float(contribution_years),
+        "index_contributions": bool(index_contributions),
+    }
+    key = _params_key({**params, "n_paths": int(n_paths), "seed": int(seed)})
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8) if n_paths >= POOL_MIN_PATHS else 1
+    t0 = time.perf_counter()
+    raw = _run(params, int(n_paths), int(seed), int(workers))
+    result = _summarize(params, raw)
+    result.update({"n_paths": int(n_paths), "workers": int(workers), "elapsed_s": time.perf_counter() - t0,
+                   "key": key})
+
+    with _CACHE_LOCK:
+        _CACHE[key] = result
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return result
+
+
+def _summarize(params: Dict, raw: Dict[str, np.ndarray]) -> Dict:
+    snaps, hit, ruined = raw["snaps"], raw["hit_month"], raw["ruined"]
+    final = snaps[-1].astype(float)
+    ok = ~ruined
+    if params["goal"] > 0:
+        ok &= final >= params["goal"]
+    bands = np.percentile(snaps, PERCENTILES, axis=1)
+
+    years_axis = np.arange(snaps.shape[0], dtype=float)
+    out = {
+        "years": years_axis,
+        "bands": {f"p{p}": bands[i] for i, p in enumerate(PERCENTILES)},
+        "final": {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(final, PERCENTILES))},
+        "success_prob": float(ok.mean()),
+        "ruin_prob": float(ruined.mean()),
+        "contributed": float(params["initial"] + params["monthly"] * params["contribution_years"] * 12),
+    }
+    if params["goal"] > 0:
+        reached = hit >= 0
+        # P(já bateu a meta até o ano k), para a curva de "quando chego lá"
+        out["goal_prob_by_year"] = np.array(
+            [(reached & (hit <= 12 * k)).mean() for k in years_axis.astype(int)], dtype=float)
+        med = np.median(np.where(reached, hit, np.inf))  # quem não chegou conta como "nunca"
+        out["goal_years_p50"] = float(med / 12) if np.isfinite(med) else None
+    return out
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -0,0 +1,56 @@
+# bee/providers
+# Fonte única de dados de mercado. market_data.py e as páginas pedem o provedor aqui:
+#
+#   from bee.providers import get_provider
+#   get_provider().quotes(["PETR4.SA", "BRL=X"])
+#
+# Pilha: stale-while-revalidate em memória -> cache SQLite (BEE_MARKET_CACHE) ->
+# agendador (lote, single-flight, limite, retry) -> provedor de verdade
+# (BEE_MARKET_PROVIDER: "yahoo" ou http://host:porta).
+# set_provider() troca em testes/benchmarks.
+import threading
+from typing import Optional
+
+from ..config import (MARKET_BATCH_WINDOW_MS, MARKET_BURST, MARKET_CACHE_FILE, MARKET_PROVIDER, MARKET_RATE,
+                      MARKET_RETRIES)
+from .base import MarketDataProvider, ProviderError, ProviderUnavailable
+
+__all__ = ["MarketDataProvider", "ProviderError", "ProviderUnavailable", "get_provider", "set_provider", "build_provider"]
+
+_LOCK = threading.Lock()
+_PROVIDER: Optional[MarketDataProvider] = None
+
+
+def build_provider(spec: str = MARKET_PROVIDER, cache_file: str = MARKET_CACHE_FILE) -> MarketDataProvider:
+    if spec.startswith(("http://", "https://")):
+        from .http import HTTPProvider
+        provider: MarketDataProvider = HTTPProvider(spec)
+    elif spec == "yahoo":
+        from .yahoo import YahooProvider
+        provider = YahooProvider()
+    else:
+        raise ValueError(f"provedor desconhecido: {spec!r}")
+    from .scheduler import ScheduledProvider
+    provider = ScheduledProvider(provider, rate=MARKET_RATE, burst=MARKET_BURST,
+                                 window_s=MARKET_BATCH_WINDOW_MS / 1000.0, retries=MARKET_RETRIES)
+    if cache_file:
+        from .cached import SQLiteCachedProvider
+        provider = SQLiteCachedProvider(provider, cache_file)
+    from .swr import SWRProvider
+    return SWRProvider(provider)
+
+
+def get_provider() -> MarketDataProvider:
+    global _PROVIDER
+    if _PROVIDER is None:
+        with _LOCK:
+            if _PROVIDER is None:
+                _PROVIDER = build_provider()
+    return _PROVIDER
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Troca o provedor do processo (None volta ao da configuração no próximo uso)."""
+    global _PROVIDER
+    with _LOCK:
+        _PROVIDER = provider
@@ -0,0 +1,90 @@
+# bee/providers/base.py
+# Contrato de um provedor de dados de mercado. Todas as páginas passam por aqui
+# (via bee.market_data), nunca por yfinance direto.
+#
+# Formatos (iguais em qualquer implementação, e serializáveis para o cache/HTTP):
+#   quotes(["PETR4.SA", ...])  -> {ticker: {"last", "prev", "var_pct", "as_of"}} (as_of = epoch da busca)
+#   history("PETR4.SA", "1y")  -> DataFrame OHLCV (Open/High/Low/Close/Volume), índice datetime
+#                                 (sem linhas = ProviderError: o Yahoo limitado também responde vazio)
+#   fundamentals("PETR4.SA")   -> dict cru no estilo Yahoo (longName, trailingPE, ...)
+#   news("Ibovespa", 8)        -> [{"title", "link", "source", "published"}] (published em ISO)
+#   actions("PETR4.SA", start) -> [{"data": "YYYY-MM-DD", "kind": "DIV"|"SPLIT", "value"}] desde `start`
+#                                 (DIV por ação já ajustado por desdobramentos; SPLIT = fator, 1.1 = bonificação de 10%)
+#
+# Falha de rede/provedor levanta ProviderError; "não existe" é resultado vazio.
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+
+class ProviderError(RuntimeError):
+    """O provedor não conseguiu responder (rede, limite, formato inesperado)."""
+
+
+class ProviderUnavailable(ProviderError):
+    """Falta dependência/configuração: tentar de novo não adianta."""
+
+
+class MarketDataProvider(ABC):
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        ...
+
+    @abstractmethod
+    def history(self, ticker: str, period: str = "1y"):
+        ...
+
+    @abstractmethod
+    def fundamentals(self, ticker: str) -> dict:
+        ...
+
+    @abstractmethod
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        ...
+
+
+# --------------------------------------------------------------------------------------
+# Serialização (cache SQLite e provedor HTTP usam o mesmo formato)
+# --------------------------------------------------------------------------------------
+def quote(last: float, prev: float) -> dict:
+    var_pct = ((last - prev) / prev) * 100 if prev else 0.0
+    return {"last": float(last), "prev": float(prev), "var_pct": float(var_pct), "as_of": time.time()}
+
+
+def history_to_json(df) -> str:
+    return df.to_json(orient="split", date_format="iso", date_unit="s")
+
+
+def history_from_json(payload: str):
+    from io import StringIO
+
+    import pandas as pd
+
+    df = pd.read_json(StringIO(payload), orient="split")
+    if not df.empty:
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(None)
+    return df
+
+
+def scalars_only(info: dict) -> dict:
+    """Só o que passa por JSON sem surpresa (o info do Yahoo traz listas e objetos)."""
+    out = {}
+    for k, v in (info or {}).items():
+        if isinstance(v, (str, int, float, bool)) or v is None:
+            out[k] = v
+    return out
+
+
+def dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False)
@@ -0,0 +1,138 @@
+# bee/providers/cached.py
+# Decorator de provedor com cache em SQLite: sobrevive a restart do app e é
+# compartilhado entre sessões/processos, ao contrário do st.cache_data.
+#
+# Cotações são guardadas por ticker: um pedido de 50 tickers com 45 em cache só
+# busca os 5 que faltam, num único quotes() do provedor de baixo.
+# Resultado vazio e erro nunca são gravados.
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from .base import MarketDataProvider, dumps, history_from_json, history_to_json
+
+# segundos de validade por tipo de dado
+DEFAULT_TTL = {"quotes": 600, "history": 3600, "fundamentals": 1200, "news": 900}
+
+# limite de parâmetros por IN (...) do SQLite
+_CHUNK = 500
+
+
+class SQLiteCachedProvider(MarketDataProvider):
+    def __init__(self, inner: MarketDataProvider, db_file: str, ttl: Optional[Dict[str, int]] = None):
+        self.inner = inner
+        self.db_file = db_file
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.name = f"{inner.name}+sqlite"
+        self._local = threading.local()
+        self._init()
+
+    @property
+    def available(self) -> bool:
+        return self.inner.available
+
+    # ------------------------------------------------------------------ SQLite
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init(self) -> None:
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS market_cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        conn.commit()
+
+    def _rows(self, kind: str, keys: Sequence[str], cutoff: float) -> List[tuple]:
+        rows: List[tuple] = []
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows += self._conn().execute(
+                f"SELECT key, payload, fetched_at FROM market_cache "
+                f"WHERE kind = ? AND fetched_at >= ? AND key IN ({marks})",
+                (kind, cutoff, *chunk),
+            ).fetchall()
+        return rows
+
+    def _get_many(self, kind: str, keys: Sequence[str]) -> Dict[str, str]:
+        return {k: payload for k, payload, _ in self._rows(kind, list(keys), time.time() - self.ttl[kind])}
+
+    def peek(self, kind: str, keys: Sequence[str]) -> Dict[str, tuple]:
+        """Último valor conhecido, vencido ou não: {key: (valor, fetched_at)}. Não busca nada."""
+        return {k: (json.loads(payload), fetched_at) for k, payload, fetched_at in self._rows(kind, list(keys), 0.0)}
+
+    def _put_many(self, kind: str, items: Dict[str, str]) -> None:
+        if not items:
+            return
+        now = time.time()
+        conn = self._conn()
+        conn.executemany(
+            """
+            INSERT INTO market_cache (kind, key, payload, fetched_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(kind, key) DO UPDATE SET payload = excluded.payload, fetched_at = excluded.fetched_at
+            """,
+            [(kind, k, v, now) for k, v in items.items()],
+        )
+        conn.commit()
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM market_cache")
+        conn.commit()
+
+    # ------------------------------------------------------------------ API
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        out = {k: json.loads(v) for k, v in self._get_many("quotes", tickers).items()}
+        missing = [t for t in tickers if t not in out]
+        if missing:
+            fresh = self.inner.quotes(missing)
+            self._put_many("quotes", {t: dumps(q) for t, q in fresh.items()})
+            out.update(fresh)
+        return out
+
+    def history(self, ticker: str, period: str = "1y"):
+        key = f"{ticker}|{period}"
+        hit = self._get_many("history", [key]).get(key)
+        if hit is not None:
+            return history_from_json(hit)
+        df = self.inner.history(ticker, period)
+        if not df.empty:
+            self._put_many("history", {key: history_to_json(df)})
+        return df
+
+    def fundamentals(self, ticker: str) -> dict:
+        hit = self._get_many("fundamentals", [ticker]).get(ticker)
+        if hit is not None:
+            return json.loads(hit)
+        info = self.inner.fundamentals(ticker)
+        if info:
+            self._put_many("fundamentals", {ticker: dumps(info)})
+        return info
+
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        key = f"{query}|{limit}"
+        hit = self._get_many("news", [key]).get(key)
+        if hit is not None:
+            return json.loads(hit)
+        items = self.inner.news(query, limit)
+        if items:
+            self._put_many("news", {key: dumps(items)})
+        return items
+
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        # eventos já ficam guardados em bee.corporate_actions (incremental); aqui é só passagem
+        return self.inner.actions(ticker, start)
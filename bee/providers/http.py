@@ -0,0 +1,151 @@
+# bee/providers/http.py
+# Provedor via HTTP + servidor stand-in local.
+#
+# O servidor expõe qualquer MarketDataProvider em JSON; o HTTPProvider é o cliente.
+# Serve para teste e carga sem bater no Yahoo:
+#
+#   python -m bee.providers.http --port 8765                     # proxy do Yahoo de verdade
+#   python -m benchmarks.fixtures serve --port 8765              # dados sintéticos/fixtures (offline)
+#   BEE_MARKET_PROVIDER=http://127.0.0.1:8765 streamlit run main.py
+#
+# Rotas: /quotes?t=A,B  /history?t=A&period=1y  /fundamentals?t=A  /news?q=...&limit=8
+#        /actions?t=A&start=2024-01-01  /health
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+from .base import MarketDataProvider, ProviderError, dumps, history_from_json, history_to_json
+
+
+class HTTPProvider(MarketDataProvider):
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.name = f"http({self.base_url})"
+
+    def _get(self, route: str, **params) -> str:
+        url = f"{self.base_url}/{route}?{urlencode(params)}"
+        try:
+            with urlopen(url, timeout=self.timeout) as resp:
+                return resp.read().decode("utf-8")
+        except HTTPError as e:
+            raise ProviderError(f"{route}: HTTP {e.code}") from e
+        except (URLError, OSError) as e:
+            raise ProviderError(f"{route}: {e}") from e
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        tickers = [t for t in dict.fromkeys(tickers) if t]
+        if not tickers:
+            return {}
+        return json.loads(self._get("quotes", t=",".join(tickers)))
+
+    def history(self, ticker: str, period: str = "1y"):
+        return history_from_json(self._get("history", t=ticker, period=period))
+
+    def fundamentals(self, ticker: str) -> dict:
+        return json.loads(self._get("fundamentals", t=ticker))
+
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        return json.loads(self._get("news", q=query, limit=limit))
+
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        return json.loads(self._get("actions", t=ticker, start=start or ""))
+
+
+# --------------------------------------------------------------------------------------
+# Servidor stand-in
+# --------------------------------------------------------------------------------------
+def _handler(provider: MarketDataProvider):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):  # silencioso; carga gera milhares de linhas
+            pass
+
+        def _send(self, status: int, body: str) -> None:
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/health":
+                    body = dumps({"ok": True, "provider": provider.name})
+                elif url.path == "/quotes":
+                    body = dumps(provider.quotes([t for t in q.get("t", "").split(",") if t]))
+                elif url.path == "/history":
+                    body = history_to_json(provider.history(q["t"], q.get("period", "1y")))
+                elif url.path == "/fundamentals":
+                    body = dumps(provider.fundamentals(q["t"]))
+                elif url.path == "/news":
+                    body = dumps(provider.news(q.get("q", ""), int(q.get("limit", 8))))
+                elif url.path == "/actions":
+                    body = dumps(provider.actions(q["t"], q.get("start") or None))
+                else:
+                    return self._send(404, dumps({"error": "rota desconhecida"}))
+            except KeyError as e:
+                return self._send(400, dumps({"error": f"parâmetro faltando: {e}"}))
+            except ProviderError as e:
+                return self._send(502, dumps({"error": str(e)}))
+            self._send(200, body)
+
+    return Handler
+
+
+class StandInServer:
+    """Servidor HTTP local numa thread; use como context manager em testes/benchmarks."""
+
+    def __init__(self, provider: MarketDataProvider, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _handler(provider))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="bee-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def serve(provider: MarketDataProvider, host: str = "127.0.0.1", port: int = 8765, label: str = "") -> None:
+    """Serve `provider` em primeiro plano até Ctrl+C. Quem chama escolhe o upstream (ex.: fixtures)."""
+    server = StandInServer(provider, host, port)
+    print(f"stand-in em {server.url} (upstream: {label or provider.name})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    from .yahoo import YahooProvider
+
+    ap = argparse.ArgumentParser(description="Servidor stand-in de dados de mercado (proxy do Yahoo).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+    serve(YahooProvider(), args.host, args.port, "yahoo")
@@ -0,0 +1,201 @@
+# bee/providers/scheduler.py
+# Agendador central das chamadas ao provedor de verdade (Yahoo/HTTP):
+#
+#   - single-flight: N sessões pedindo o mesmo histórico/info/notícia ao mesmo tempo
+#     geram uma chamada só; as outras esperam e recebem o mesmo resultado (ou erro);
+#   - lote de cotações: tickers pedidos dentro da mesma janela (window_s) viram um
+#     único quotes() no provedor; ticker já em voo não é pedido de novo;
+#   - token bucket: no máximo `rate` chamadas/s com rajada de `burst`;
+#   - retry com backoff exponencial e jitter em ProviderError; esgotadas as
+#     tentativas o erro sobe (quem chama decide; nada de "vazio" fingindo sucesso).
+#
+# Os resultados compartilhados são só leitura: quem precisar alterar, copia.
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .base import MarketDataProvider, ProviderError, ProviderUnavailable
+
+
+class TokenBucket:
+    """Reserva uma ficha por chamada; se faltar, devolve quanto esperar."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            # ficha negativa = fila: cada um espera a sua vez, sem disputa
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _Batch(_Call):
+    __slots__ = ("tickers",)
+
+    def __init__(self):
+        super().__init__()
+        self.tickers: List[str] = []
+
+
+class ScheduledProvider(MarketDataProvider):
+    def __init__(self, inner: MarketDataProvider, rate: float = 2.0, burst: int = 5, window_s: float = 0.05,
+                 retries: int = 3, backoff_s: float = 0.5, max_batch: int = 200):
+        self.inner = inner
+        self.name = f"{inner.name}+sched"
+        self.bucket = TokenBucket(rate, burst)
+        self.window_s = window_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._inflight: Dict[tuple, _Call] = {}
+        self._open: Optional[_Batch] = None
+        self._quote_inflight: Dict[str, _Batch] = {}
+        self._stats = {"calls": 0, "coalesced": 0, "batches": 0, "batched_tickers": 0, "retries": 0,
+                       "failures": 0}
+
+    @property
+    def available(self) -> bool:
+        return self.inner.available
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    # ------------------------------------------------------------------ núcleo
+    def _with_retry(self, fn: Callable, *args):
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            self._count("calls")
+            try:
+                return fn(*args)
+            except ProviderUnavailable:
+                raise
+            except ProviderError:
+                if attempt >= self.retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                # "full jitter": espalha as novas tentativas de várias sessões
+                time.sleep(random.uniform(0, self.backoff_s * (2 ** attempt)))
+
+    def _single_flight(self, key: tuple, fn: Callable, *args):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return call.wait()
+        try:
+            call.result = self._with_retry(fn, *args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+        return call.result
+
+    # ------------------------------------------------------------------ cotações em lote
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return {}
+
+        opened: List[_Batch] = []  # lotes que eu abri: sou eu quem dispara
+        joined: Dict[int, _Batch] = {}
+        with self._lock:
+            for t in tickers:
+                batch = self._quote_inflight.get(t)
+                if batch is None:
+                    if self._open is None or len(self._open.tickers) >= self.max_batch:
+                        self._open = _Batch()
+                        opened.append(self._open)
+                    batch = self._open
+                    batch.tickers.append(t)
+                    self._quote_inflight[t] = batch
+                else:
+                    self._stats["coalesced"] += 1
+                joined[id(batch)] = batch
+
+        for i, batch in enumerate(opened):
+            self._run_batch(batch, linger=i == 0)
+
+        out: Dict[str, dict] = {}
+        for batch in joined.values():
+            result = batch.wait()
+            out.update({t: result[t] for t in tickers if t in result})
+        return out
+
+    def _run_batch(self, batch: _Batch, linger: bool = True) -> None:
+        if linger and self.window_s > 0:
+            time.sleep(self.window_s)  # junta quem chegar na janela
+        with self._lock:
+            if self._open is batch:
+                self._open = None
+            tickers = list(batch.tickers)
+            self._stats["batches"] += 1
+            self._stats["batched_tickers"] += len(tickers)
+        try:
+            batch.result = self._with_retry(self.inner.quotes, tickers)
+        except BaseException as e:
+            batch.error = e
+        finally:
+            with self._lock:
+                for t in tickers:
+                    if self._quote_inflight.get(t) is batch:
+                        del self._quote_inflight[t]
+            batch.event.set()
+
+    # ------------------------------------------------------------------ demais
+    def history(self, ticker: str, period: str = "1y"):
+        return self._single_flight(("history", ticker, period), self.inner.history, ticker, period)
+
+    def fundamentals(self, ticker: str) -> dict:
+        return self._single_flight(("fundamentals", ticker), self.inner.fundamentals, ticker)
+
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        return self._single_flight(("news", query, limit), self.inner.news, query, limit)
+
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        return self._single_flight(("actions", ticker, start), self.inner.actions, ticker, start)
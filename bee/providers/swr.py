@@ -0,0 +1,173 @@
+# bee/providers/swr.py
+# Stale-while-revalidate para cotações e fundamentos, em memória do processo.
+#
+#   - dentro do TTL: devolve direto;
+#   - vencido: devolve o último valor na hora e agenda UMA atualização em segundo plano;
+#   - nunca visto: busca na hora (é o único caso em que a renderização espera a rede);
+#     se essa busca falha, os já conhecidos saem mesmo assim, só os novos ficam de fora.
+#
+# "Visto" inclui o cache SQLite de baixo (peek): depois de um restart o app ainda abre
+# com o último preço conhecido. Cada valor sai com "as_of" (epoch da busca) para a UI
+# mostrar a idade. Falha na atualização mantém o valor antigo; nova tentativa só depois
+# de retry_after segundos.
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .base import MarketDataProvider, ProviderError
+
+log = logging.getLogger(__name__)
+
+# igual ao do cache SQLite: quando aqui vence, lá também venceu e a atualização vai à rede
+DEFAULT_TTL = {"quotes": 600, "fundamentals": 1200}
+
+
+class SWRProvider(MarketDataProvider):
+    def __init__(self, inner: MarketDataProvider, ttl: Optional[Dict[str, int]] = None,
+                 retry_after: float = 30.0, workers: int = 2):
+        self.inner = inner
+        self.name = f"{inner.name}+swr"
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, tuple] = {}      # (kind, key) -> (valor, as_of)
+        self._refreshing: set = set()               # (kind, key) com atualização em voo
+        self._failed_at: Dict[tuple, float] = {}    # (kind, key) -> última falha
+        self._absent: Dict[tuple, float] = {}       # (kind, key) -> quando o provedor disse "não existe"
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bee-swr")
+        self._stats = {"fresh": 0, "stale": 0, "miss": 0, "refreshes": 0, "refresh_errors": 0}
+
+    @property
+    def available(self) -> bool:
+        return self.inner.available
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    # ------------------------------------------------------------------ núcleo
+    def _lookup(self, kind: str, keys: Sequence[str]):
+        """Separa as chaves em (valores conhecidos, vencidas, nunca vistas)."""
+        now = time.time()
+        known, stale, missing = {}, [], []
+        with self._lock:
+            for k in keys:
+                entry = self._entries.get((kind, k))
+                if entry is None:
+                    # ticker inválido não trava toda renderização até o TTL vencer
+                    if now - self._absent.get((kind, k), 0.0) > self.ttl[kind]:
+                        missing.append(k)
+                    continue
+                known[k] = entry
+                if now - entry[1] > self.ttl[kind]:
+                    stale.append(k)
+
+        if missing:
+            # valor vencido do cache persistente também conta como "visto"
+            peek = getattr(self.inner, "peek", None)
+            seen = peek(kind, missing) if peek else {}
+            if seen:
+                with self._lock:
+                    for k, (value, fetched_at) in seen.items():
+                        as_of = value.get("as_of", fetched_at) if isinstance(value, dict) else fetched_at
+                        self._entries.setdefault((kind, k), (value, as_of))
+                        known[k] = self._entries[(kind, k)]
+                        if now - known[k][1] > self.ttl[kind]:
+                            stale.append(k)
+                missing = [k for k in missing if k not in seen]
+
+        with self._lock:
+            self._stats["fresh"] += len(known) - len(stale)
+            self._stats["stale"] += len(stale)
+            self._stats["miss"] += len(missing)
+        return known, stale, missing
+
+    def _store(self, kind: str, values: Dict[str, object], asked: Sequence[str] = ()) -> None:
+        now = time.time()
+        with self._lock:
+            for k, v in values.items():
+                as_of = v.get("as_of", now) if isinstance(v, dict) else now
+                self._entries[(kind, k)] = (v, as_of)
+                self._failed_at.pop((kind, k), None)
+            for k in asked:
+                if k not in values:
+                    self._absent[(kind, k)] = now
+
+    def _schedule(self, kind: str, keys: List[str], fetch) -> None:
+        now = time.time()
+        with self._lock:
+            todo = [k for k in keys if (kind, k) not in self._refreshing
+                    and now - self._failed_at.get((kind, k), 0.0) > self.retry_after]
+            self._refreshing.update((kind, k) for k in todo)
+        if not todo:
+            return
+
+        def run():
+            try:
+                self._store(kind, fetch(todo))
+                with self._lock:
+                    self._stats["refreshes"] += 1
+            except Exception as e:  # mantém o valor antigo; a UI mostra a idade
+                log.warning("atualização de %s falhou: %s", kind, e)
+                failed = time.time()
+                with self._lock:
+                    self._stats["refresh_errors"] += 1
+                    for k in todo:
+                        self._failed_at[(kind, k)] = failed
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update((kind, k) for k in todo)
+
+        self._pool.submit(run)
+
+    # ------------------------------------------------------------------ API
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        known, stale, missing = self._lookup("quotes", tickers)
+        if stale:
+            self._schedule("quotes", stale, self.inner.quotes)
+        out = {t: {**q, "as_of": as_of} for t, (q, as_of) in known.items()}
+        if missing:
+            try:
+                fresh = self.inner.quotes(missing)
+            except ProviderError as e:
+                if not out:
+                    raise
+                # o que já se conhece vale mais que nada: só os nunca vistos ficam de fora
+                log.warning("cotações de %d ticker(s) novos falharam: %s", len(missing), e)
+                return out
+            self._store("quotes", fresh, asked=missing)
+            out.update(fresh)
+        return out
+
+    def fundamentals(self, ticker: str) -> dict:
+        known, stale, missing = self._lookup("fundamentals", [ticker])
+        if stale:
+            self._schedule("fundamentals", stale, lambda keys: {k: self.inner.fundamentals(k) for k in keys})
+        if ticker in known:
+            info, as_of = known[ticker]
+            return {**info, "as_of": as_of}
+        if not missing:
+            return {}
+        info = self.inner.fundamentals(ticker)
+        self._store("fundamentals", {ticker: info} if info else {}, asked=[ticker])
+        if not info:
+            return {}
+        return {**info, "as_of": self._entries[("fundamentals", ticker)][1]}
+
+    def history(self, ticker: str, period: str = "1y"):
+        return self.inner.history(ticker, period)
+
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        return self.inner.news(query, limit)
+
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        return self.inner.actions(ticker, start)
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        with self._lock:
+            for store in (self._entries, self._absent):
+                for key in [k for k in store if kind is None or k[0] == kind]:
+                    del store[key]
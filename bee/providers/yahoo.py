@@ -0,0 +1,136 @@
+# bee/providers/yahoo.py
+# Implementação padrão: yfinance para cotações/histórico/fundamentos e o RSS do
+# Google News para notícias (o Yahoo não tem busca de notícias em pt-BR).
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import quote_plus
+
+from ..safe_imports import dtparser, feedparser, yf
+from .base import MarketDataProvider, ProviderError, ProviderUnavailable, quote, scalars_only
+
+NEWS_URL = "https://news.google.com/rss/search?q={q}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
+
+
+def _close_series(data, ticker: str, single: bool):
+    import pandas as pd
+
+    if isinstance(data.columns, pd.MultiIndex):
+        for key in (("Close", ticker), (ticker, "Close")):
+            if key in data.columns:
+                return data[key]
+        return None
+    if single and "Close" in data.columns:
+        return data["Close"]
+    return None
+
+
+class YahooProvider(MarketDataProvider):
+    name = "yahoo"
+
+    @property
+    def available(self) -> bool:
+        return bool(yf)
+
+    def _yf(self):
+        if not yf:
+            raise ProviderUnavailable("yfinance não disponível")
+        return yf
+
+    def quotes(self, tickers: Sequence[str]) -> Dict[str, dict]:
+        import pandas as pd
+
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return {}
+        try:
+            data = self._yf().download(tickers, period="5d", progress=False, threads=True,
+                                       group_by="ticker", auto_adjust=False)
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"yf.download falhou: {e}") from e
+        if data is None or data.empty:
+            # yfinance devolve frame vazio (sem exceção) quando é limitado ou a rede cai
+            raise ProviderError("yf.download não devolveu dados")
+
+        out = {}
+        for t in tickers:
+            s = _close_series(data, t, single=len(tickers) == 1)
+            if s is None:
+                continue
+            s = pd.to_numeric(s, errors="coerce").dropna()
+            if len(s) >= 2:
+                out[t] = quote(float(s.iloc[-1]), float(s.iloc[-2]))
+        return out
+
+    def history(self, ticker: str, period: str = "1y"):
+        try:
+            df = self._yf().Ticker(ticker).history(period=period, auto_adjust=False)
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"histórico de {ticker} falhou: {e}") from e
+        if df is None or df.empty:
+            # igual a quotes(): frame vazio é o que o yfinance devolve quando é limitado; como
+            # erro, não fica em cache (st.cache_data, SQLite) escondendo o gráfico por uma hora
+            raise ProviderError(f"histórico de {ticker} veio vazio")
+        if getattr(df.index, "tz", None) is not None:
+            df.index = df.index.tz_localize(None)
+        return df
+
+    def fundamentals(self, ticker: str) -> dict:
+        try:
+            return scalars_only(self._yf().Ticker(ticker).info or {})
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"info de {ticker} falhou: {e}") from e
+
+    def actions(self, ticker: str, start: Optional[str] = None) -> List[dict]:
+        # com `start` só baixa a janela nova (atualização incremental); sem, o histórico todo
+        try:
+            t = self._yf().Ticker(ticker)
+            df = t.history(start=start, actions=True, auto_adjust=False) if start else \
+                t.history(period="max", actions=True, auto_adjust=False)
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"proventos de {ticker} falharam: {e}") from e
+
+        out = []
+        if df is None or df.empty:
+            return out
+        for col, kind in (("Dividends", "DIV"), ("Stock Splits", "SPLIT")):
+            if col not in df.columns:
+                continue
+            s = df[col][df[col] > 0]
+            out += [{"data": d.strftime("%Y-%m-%d"), "kind": kind, "value": float(v)} for d, v in s.items()]
+        if start:
+            out = [a for a in out if a["data"] >= start]
+        return sorted(out, key=lambda a: (a["data"], a["kind"]))
+
+    def news(self, query: str, limit: int = 8) -> List[dict]:
+        try:
+            import requests  # lazy: só quem abre notícias paga o import
+            resp = requests.get(NEWS_URL.format(q=quote_plus(query)), headers={"User-Agent": "Mozilla/5.0"},
+                                timeout=6)
+        except Exception as e:
+            raise ProviderError(f"RSS falhou: {e}") from e
+        if resp.status_code != 200:
+            raise ProviderError(f"RSS respondeu {resp.status_code}")
+        if not feedparser:
+            raise ProviderUnavailable("feedparser não disponível")
+
+        items = []
+        for e in getattr(feedparser.parse(resp.content), "entries", [])[:limit]:
+            try:
+                p_dt = dtparser.parse(e.published) if dtparser else datetime.now()
+            except Exception:
+                p_dt = datetime.now()
+            items.append({
+                "title": getattr(e, "title", "Notícia").rsplit(" - ", 1)[0],
+                "link": e.link,
+                "source": getattr(e, "source", {}).get("title") or "News",
+                "published": p_dt.isoformat(),
+            })
+        return items
@@ -0,0 +1,183 @@
+# bee/rebalance.py
+# Rebalanceamento vetorizado (NumPy) por classe e por ativo.
+#
+#   1. Metas viram um peso por ativo: meta da classe x meta do ativo dentro da classe
+#      (ativos sem meta dividem o resto da classe pelo valor atual).
+#   2. O aporte é projetado no simplex {b >= 0, soma b = aporte} mais perto da diferença
+#      alvo - atual (ordenação + cumsum, O(n log n)). Com venda, quem está acima do alvo
+#      vende até ele e o dinheiro entra no aporte antes da projeção.
+#   3. Arredonda para lotes e usa a sobra comprando, um lote por vez, o ativo mais abaixo
+#      do alvo que ainda cabe; o que não fecha lote vai para ativos fracionáveis.
+#
+# Classe com meta e sem nenhum ativo entra como uma linha "(Classe)" fracionável, para
+# o dinheiro dela aparecer na sugestão.
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+CLASSES = ["Ação/ETF", "Renda Fixa", "Cripto", "Caixa"]
+ASSET_PREFIX = "ativo:"  # metas por ativo ficam na mesma tabela targets, com esta chave
+STANDARD_LOT = 100
+_MAX_GREEDY_STEPS = 10_000
+
+
+def split_targets(targets: Dict[str, float]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """targets do banco -> (por classe, por ativo em % da classe)."""
+    classes = {k: float(v) for k, v in targets.items() if not k.startswith(ASSET_PREFIX)}
+    assets = {k[len(ASSET_PREFIX):]: float(v) for k, v in targets.items() if k.startswith(ASSET_PREFIX)}
+    return classes, assets
+
+
+def lot_sizes(tickers: pd.Series, classes: pd.Series, round_lot: bool = False) -> np.ndarray:
+    """Lote por ativo; 0 = fracionável (cripto, renda fixa, caixa).
+
+    tickers no formato do provedor (Ticker_YF: "PETR4.SA"); é o sufixo que marca a B3.
+    """
+    t = tickers.astype(str).str.upper()
+    lots = np.ones(len(t))
+    if round_lot:
+        # lote padrão da B3 é 100; units/FIIs/ETFs (final 11) negociam de 1 em 1
+        b3 = t.str.endswith(".SA") & ~t.str.replace(".SA", "", regex=False).str.endswith("11")
+        lots = np.where(b3.to_numpy(), STANDARD_LOT, lots)
+    fractional = classes.isin(["Cripto", "Renda Fixa", "Caixa"]).to_numpy()
+    return np.where(fractional, 0.0, lots)
+
+
+def target_weights(class_idx: np.ndarray, class_targets: np.ndarray, asset_targets: np.ndarray,
+                   values: np.ndarray) -> np.ndarray:
+    """Peso alvo por ativo (soma = soma das metas de classe com ativo, normalizada para 1).
+
+    asset_targets: % dentro da classe, NaN = sem meta própria.
+    """
+    n_cls = len(class_targets)
+    has_t = ~np.isnan(asset_targets)
+    explicit = np.where(has_t, asset_targets, 0.0) / 100.0
+    used = np.bincount(class_idx, weights=explicit, minlength=n_cls)
+    rest = np.clip(1.0 - used, 0.0, None)
+    # o resto da classe vai para os sem meta, proporcional ao valor (ou igual, se tudo zerado)
+    free_val = np.bincount(class_idx, weights=np.where(has_t, 0.0, values), minlength=n_cls)
+    free_cnt = np.bincount(class_idx, weights=(~has_t).astype(float), minlength=n_cls)
+    by_val = np.divide(values, free_val[class_idx], out=np.zeros_like(values), where=free_val[class_idx] > 0)
+    by_cnt = np.divide(1.0, free_cnt[class_idx], out=np.zeros_like(values), where=free_cnt[class_idx] > 0)
+    share = np.where(has_t, explicit, rest[class_idx] * np.where(free_val[class_idx] > 0, by_val, by_cnt))
+    # metas explícitas acima de 100% numa classe são reescaladas
+    total_share = np.bincount(class_idx, weights=share, minlength=n_cls)
+    share = np.divide(share, total_share[class_idx], out=np.zeros_like(share), where=total_share[class_idx] > 0)
+    w = share * class_targets[class_idx]
+    s = w.sum()
+    return w / s if s > 0 else w
+
+
+def project_budget(gap: np.ndarray, budget: float) -> np.ndarray:
+    """b >= 0 com soma = budget, o mais perto possível (euclidiano) de `gap`."""
+    if budget <= 0 or gap.size == 0:
+        return np.zeros_like(gap)
+    u = np.sort(gap)[::-1]
+    css = np.cumsum(u) - budget
+    j = np.arange(1, gap.size + 1)
+    rho = np.nonzero(u - css / j > 0)[0][-1]
+    return np.maximum(gap - css[rho] / (rho + 1), 0.0)
+
+
+def _round_to_lots(amount: np.ndarray, prices: np.ndarray, lots: np.ndarray) -> np.ndarray:
+    """Valor -> quantidade; com lote, arredonda em direção a zero (nunca gasta/vende a mais)."""
+    units = np.divide(amount, prices, out=np.zeros_like(amount), where=prices > 0)
+    lotted = lots > 0
+    units[lotted] = np.trunc(units[lotted] / lots[lotted]) * lots[lotted]
+    return units
+
+
+def _finite(a) -> np.ndarray:
+    """NaN/inf (cotação que não veio) -> 0: o ativo fica sem valor e sem preço, fora das ordens."""
+    a = np.asarray(a, dtype=float)
+    return np.where(np.isfinite(a), a, 0.0)
+
+
+def rebalance(values: np.ndarray, prices: np.ndarray, lots: np.ndarray, weights: np.ndarray,
+              contribution: float, allow_sell: bool = False) -> Dict[str, np.ndarray]:
+    """Núcleo puro: arrays alinhados por ativo -> {"units", "amount", "target", "leftover"}."""
+    values, prices, lots, weights = (_finite(a) for a in (values, prices, lots, weights))
+    tradable = prices > 0
+    total = values.sum() + contribution
+    target = weights * total
+    gap = np.where(tradable, target - values, 0.0)
+
+    # vendas primeiro (arredondadas para vender a menos); o que entra soma ao aporte
+    sell = tradable & (gap < 0) if allow_sell else np.zeros_like(tradable)
+    units = _round_to_lots(np.where(sell, gap, 0.0), prices, lots)
+    budget = contribution - (units * prices).sum()
+
+    buy = tradable & ~sell
+    amount = np.zeros_like(gap)
+    amount[buy] = project_budget(gap[buy], budget)
+    units += _round_to_lots(amount, prices, lots)
+    spent = units * prices
+    leftover = contribution - spent.sum()
+
+    # sobra: um lote por vez no ativo mais abaixo do alvo que ainda cabe no dinheiro
+    lot_cost = np.where(buy & (lots > 0), prices * lots, np.inf)
+    for _ in range(_MAX_GREEDY_STEPS):
+        fits = lot_cost <= leftover + 1e-9
+        if not fits.any():
+            break
+        deficit = np.where(fits, target - (values + spent), -np.inf)
+        i = int(np.argmax(deficit))
+        units[i] += lots[i]
+        spent[i] += lot_cost[i]
+        leftover -= lot_cost[i]
+
+    # o que não fecha lote vai para os fracionáveis, de novo pela projeção
+    frac = buy & (lots == 0)
+    if leftover > 1e-9 and frac.any():
+        extra = project_budget(target[frac] - (values[frac] + spent[frac]), leftover)
+        spent[frac] += extra
+        units[frac] += extra / prices[frac]
+        leftover -= extra.sum()
+
+    return {"units": units, "amount": spent, "target": target, "leftover": np.array(max(leftover, 0.0))}
+
+
+def plan(df_calc: pd.DataFrame, targets: Dict[str, float], contribution: float, allow_sell: bool = False,
+         round_lot: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, float]:
+    """Frame da carteira precificada + metas -> (por ativo, por classe, sobra em R$).
+
+    df_calc precisa de Ativo, TipoBucket (classe), Qtd, Total_BRL e Preco_Atual_BRL; Ticker_YF, se
+    houver, decide o lote (sem ele, vale o Ativo). Linha sem cotação (Total/Preço NaN) não recebe ordem.
+    """
+    class_t, asset_t = split_targets(targets)
+    class_targets = np.array([class_t.get(c, 0.0) for c in CLASSES], dtype=float)
+
+    cols = ["Ativo", "TipoBucket", "Qtd", "Total_BRL", "Preco_Atual_BRL"]
+    df = df_calc[cols + (["Ticker_YF"] if "Ticker_YF" in df_calc else [])].copy()
+    df = df[df["TipoBucket"].isin(CLASSES)]
+    empty = [c for c, t in zip(CLASSES, class_targets) if t > 0 and c not in set(df["TipoBucket"])]
+    if empty:
+        df = pd.concat([df, pd.DataFrame({"Ativo": [f"({c})" for c in empty], "TipoBucket": empty, "Qtd": 0.0,
+                                          "Total_BRL": 0.0, "Preco_Atual_BRL": 1.0})], ignore_index=True)
+    df = df.reset_index(drop=True)
+
+    class_idx = df["TipoBucket"].map({c: i for i, c in enumerate(CLASSES)}).to_numpy(dtype=int)
+    values = _finite(df["Total_BRL"].to_numpy(dtype=float))
+    prices = _finite(df["Preco_Atual_BRL"].to_numpy(dtype=float))
+    a_t = df["Ativo"].astype(str).str.upper().map(asset_t).to_numpy(dtype=float)
+    weights = target_weights(class_idx, class_targets, a_t, values)
+    lots = lot_sizes(df["Ticker_YF"].fillna(df["Ativo"]) if "Ticker_YF" in df else df["Ativo"], df["TipoBucket"],
+                     round_lot)
+    res = rebalance(values, prices, lots, weights, float(contribution), allow_sell)
+
+    total_after = values.sum() + res["amount"].sum()
+    df["Alvo_Pct"] = weights * 100
+    df["Atual_Pct"] = values / values.sum() * 100 if values.sum() > 0 else 0.0
+    df["Qtd_Ordem"] = res["units"]
+    df["Valor_Ordem"] = res["amount"]
+    df["Pos_Pct"] = (values + res["amount"]) / total_after * 100 if total_after > 0 else 0.0
+
+    cls = pd.DataFrame({
+        "Classe": CLASSES,
+        "Atual_Pct": np.bincount(class_idx, weights=df["Atual_Pct"].to_numpy(dtype=float), minlength=len(CLASSES)),
+        "Alvo_Pct": class_targets,
+        "Valor_Ordem": np.bincount(class_idx, weights=res["amount"], minlength=len(CLASSES)),
+        "Pos_Pct": np.bincount(class_idx, weights=df["Pos_Pct"].to_numpy(dtype=float), minlength=len(CLASSES)),
+    })
+    return df, cls, float(res["leftover"])
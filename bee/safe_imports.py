@@ -1,22 +1,69 @@
-# Centraliza imports opcionais (igual você fazia)
-try:
-    import yfinance as yf
-except Exception:
-    yf = None
-
-try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-except Exception:
-    go = None
-    px = None
-
-try:
-    from dateutil import parser as dtparser
-except Exception:
-    dtparser = None
-
-try:
-    from deep_translator import GoogleTranslator
-except Exception:
-    GoogleTranslator = None
+# Centraliza imports opcionais (igual você fazia), agora preguiçosos:
+# o módulo só é importado quando a feature que precisa dele roda.
+#
+#   if not yf: ...            -> tenta importar; False se não estiver instalado
+#   yf.Ticker("PETR4.SA")     -> importa no primeiro uso
+#
+# Nada disto é importado na tela de login.
+import importlib
+import threading
+
+_MISSING = object()
+
+
+class LazyImport:
+    """Proxy de um módulo (ou atributo de módulo) importado no primeiro acesso."""
+
+    def __init__(self, module: str, attr: str = ""):
+        self._module = module
+        self._attr = attr
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    try:
+                        mod = importlib.import_module(self._module)
+                        self._obj = getattr(mod, self._attr) if self._attr else mod
+                    except Exception:
+                        self._obj = _MISSING
+        return None if self._obj is _MISSING else self._obj
+
+    @property
+    def loaded(self) -> bool:
+        return self._obj is not None and self._obj is not _MISSING
+
+    def __bool__(self) -> bool:
+        return self._load() is not None
+
+    def __getattr__(self, name):
+        obj = self._load()
+        if obj is None:
+            raise ImportError(f"{self._module} não disponível")
+        return getattr(obj, name)
+
+    def __call__(self, *args, **kwargs):
+        obj = self._load()
+        if obj is None:
+            raise ImportError(f"{self._module} não disponível")
+        return obj(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = f"{self._module}.{self._attr}" if self._attr else self._module
+        return f"<LazyImport {name} ({'carregado' if self.loaded else 'pendente'})>"
+
+
+yf = LazyImport("yfinance")
+
+go = LazyImport("plotly.graph_objects")
+px = LazyImport("plotly.express")
+
+dtparser = LazyImport("dateutil.parser")
+
+GoogleTranslator = LazyImport("deep_translator", "GoogleTranslator")
+
+feedparser = LazyImport("feedparser")
+
+openpyxl = LazyImport("openpyxl")
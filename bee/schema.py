@@ -0,0 +1,157 @@
+# bee/schema.py
+# Schema tipado dos frames que ficam em st.session_state (carteira e gastos).
+# Aplicado nas bordas: leitura do banco e saída dos editores.
+import sys
+from typing import Optional
+
+import pandas as pd
+
+from .config import CARTEIRA_COLS, GASTOS_COLS
+
+CARTEIRA_CAT_COLS = ["Tipo", "Moeda"]
+CARTEIRA_NUM_COLS = ["Qtd", "Preco_Medio"]
+CARTEIRA_TEXT_COLS = ["Nome", "Obs"]
+
+GASTOS_CAT_COLS = ["Categoria", "Tipo", "Pagamento"]
+GASTOS_NUM_COLS = ["Valor"]
+GASTOS_TEXT_COLS = ["Descricao"]
+
+
+# --------------------------------------------------------------------------------------
+# Conversores
+# --------------------------------------------------------------------------------------
+_THOUSANDS_ONLY = r"[-+]?\d{1,3}(?:\.\d{3})+"
+
+
+def _strip_currency(text: pd.Series) -> pd.Series:
+    return text.str.replace(r"[R$\s]", "", regex=True)
+
+
+def decimal_comma(text: pd.Series) -> Optional[bool]:
+    """Convenção de uma coluna de textos numéricos.
+
+    True  = pt-BR ("1.234,56": ponto é milhar); False = ponto decimal ("1234.56");
+    None  = nada na coluna decide (só inteiros sem separador).
+    Qualquer vírgula decide pt-BR; sem vírgula, pontos só valem milhar se todos os valores
+    com ponto tiverem a cara de milhar ("1.000", "12.500.000").
+    """
+    text = _strip_currency(text.astype(str))
+    if text.str.contains(",", regex=False).any():
+        return True
+    dotted = text[text.str.contains(".", regex=False)]
+    if dotted.empty:
+        return None
+    return bool(dotted.str.fullmatch(_THOUSANDS_ONLY).all())
+
+
+def parse_ptbr_number(series: pd.Series, comma: Optional[bool] = None) -> pd.Series:
+    """Converte para float64 aceitando números já numéricos e textos tipo 'R$ 1.234,56'.
+
+    A convenção dos textos é decidida uma vez para a coluna inteira (decimal_comma), nunca
+    valor a valor: "1.000" e "1.500,00" na mesma coluna são ambos milhar. `comma` força a
+    convenção (ex.: decidida uma vez para o arquivo todo).
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype("float64").fillna(0.0)
+
+    is_text = series.map(type).eq(str)
+    out = pd.Series(float("nan"), index=series.index, dtype="float64")
+    if (~is_text).any():
+        out[~is_text] = pd.to_numeric(series[~is_text], errors="coerce")
+    if is_text.any():
+        txt = _strip_currency(series[is_text])
+        if comma is None:
+            comma = decimal_comma(txt)
+        if comma:
+            txt = txt.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        out[is_text] = pd.to_numeric(txt, errors="coerce")
+    return out.fillna(0.0)
+
+
+def categorize(df: pd.DataFrame, cols) -> pd.DataFrame:
+    for col in cols:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    return series.fillna("").astype(str).replace("nan", "").str.strip()
+
+
+def _intern_tickers(series: pd.Series) -> pd.Series:
+    # Poucos tickers distintos repetidos entre sessões: uma string por ticker no processo
+    uniq = {v: sys.intern(str(v).strip()) for v in series.dropna().unique()}
+    return series.map(uniq).fillna("").astype(object)
+
+
+# --------------------------------------------------------------------------------------
+# Frames
+# --------------------------------------------------------------------------------------
+def coerce_carteira(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante colunas e dtypes da carteira (não altera o significado dos valores)."""
+    if df is None or df.empty:
+        return categorize(pd.DataFrame(columns=CARTEIRA_COLS), CARTEIRA_CAT_COLS)
+
+    df = df.copy()
+    for col in CARTEIRA_COLS:
+        if col not in df.columns:
+            df[col] = 0.0 if col in CARTEIRA_NUM_COLS else ""
+    df = df[CARTEIRA_COLS]
+
+    df["Ativo"] = _intern_tickers(df["Ativo"])
+    for col in CARTEIRA_NUM_COLS:
+        df[col] = parse_ptbr_number(df[col])
+    for col in CARTEIRA_TEXT_COLS:
+        df[col] = _clean_text(df[col])
+    for col in CARTEIRA_CAT_COLS:
+        df[col] = _clean_text(df[col].astype(object))
+    df["Moeda"] = df["Moeda"].str.upper()
+    return categorize(df, CARTEIRA_CAT_COLS)
+
+
+def coerce_gastos(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante colunas e dtypes dos gastos: datetime64, float64 e category."""
+    if df is None or df.empty:
+        return categorize(pd.DataFrame(columns=GASTOS_COLS), GASTOS_CAT_COLS)
+
+    df = df.copy()
+    for col in GASTOS_COLS:
+        if col not in df.columns:
+            df[col] = ""
+    df = df[GASTOS_COLS]
+
+    if not pd.api.types.is_datetime64_any_dtype(df["Data"]):
+        df["Data"] = pd.to_datetime(df["Data"], dayfirst=True, errors="coerce")
+    for col in GASTOS_NUM_COLS:
+        df[col] = parse_ptbr_number(df[col])
+    for col in GASTOS_TEXT_COLS:
+        df[col] = _clean_text(df[col])
+    return categorize(df, GASTOS_CAT_COLS)
+
+
+# --------------------------------------------------------------------------------------
+# Memória
+# --------------------------------------------------------------------------------------
+def frame_memory_bytes(df) -> int:
+    if df is None or not isinstance(df, pd.DataFrame):
+        return 0
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def session_memory_report(state) -> dict:
+    """Bytes ocupados pelos DataFrames guardados na sessão (por chave + total)."""
+    report = {}
+    for key in list(state.keys()):
+        val = state[key]
+        if isinstance(val, pd.DataFrame):
+            report[str(key)] = frame_memory_bytes(val)
+        elif isinstance(val, tuple):
+            # caches do tipo (chave, df, cursor) podem apontar para frames já contados
+            others = [state.get(k) for k in state.keys() if k != key]
+            frames = [f for f in val if isinstance(f, pd.DataFrame)
+                      and not any(f is o for o in others)]
+            if frames:
+                report[str(key)] = sum(frame_memory_bytes(f) for f in frames)
+    report["total"] = sum(report.values())
+    return report
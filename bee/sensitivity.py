@@ -0,0 +1,82 @@
+# bee/sensitivity.py
+# Mapas de sensibilidade das calculadoras de juros compostos: uma grade 2-D de cenários
+# numa única conta NumPy (broadcast), em vez de um clique por cenário.
+#
+#   grid("montante", x=("taxa", 2, 15, 41), y=("aporte", 0, 2000, 41), vp=1000, anos=10)
+#   grid("tempo_meta", x=("taxa", 4, 15, 41), y=("aporte", 500, 5000, 41), meta=1_000_000)
+#   -> {"x", "y", "z" (len(y) x len(x)), "x_name", "y_name", "metric"}
+#
+# Mesmas fórmulas das calculadoras (taxa anual / 12 ao mês, aporte no fim do mês).
+# O resultado fica num LRU pela especificação da grade; os arrays são somente leitura.
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+METRICS = ("montante", "tempo_meta")
+AXES = {"taxa": "Taxa (% a.a.)", "aporte": "Aporte Mensal (R$)", "anos": "Período (anos)", "vp": "Valor Inicial (R$)"}
+MAX_STEPS = 201
+
+AxisSpec = Tuple[str, float, float, int]
+
+
+def future_value(vp, aporte, taxa, anos) -> np.ndarray:
+    """Montante após `anos` (taxa em % a.a.); aceita arrays que façam broadcast."""
+    r = np.asarray(taxa, dtype=float) / 100 / 12
+    n = np.asarray(anos, dtype=float) * 12
+    g = np.power(1.0 + r, n)
+    # r = 0: soma simples dos aportes
+    annuity = np.where(r == 0, n, (g - 1.0) / np.where(r == 0, 1.0, r))
+    return vp * g + aporte * annuity
+
+
+def months_to_goal(vp, aporte, taxa, meta) -> np.ndarray:
+    """Meses até `meta`; NaN quando não chega nunca (sem aporte e sem juros suficientes)."""
+    r, vp, aporte, meta = np.broadcast_arrays(np.asarray(taxa, dtype=float) / 100 / 12, *(
+        np.asarray(v, dtype=float) for v in (vp, aporte, meta)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # vp(1+r)^n + a((1+r)^n - 1)/r = meta  ->  (1+r)^n = (meta·r + a) / (vp·r + a)
+        with_rate = np.log((meta * r + aporte) / (vp * r + aporte)) / np.log1p(r)
+        no_rate = (meta - vp) / aporte
+    n = np.where(r > 0, with_rate, no_rate)
+    n = np.where(vp >= meta, 0.0, n)
+    return np.where(np.isfinite(n) & (n >= 0), n, np.nan)
+
+
+def axis(start: float, stop: float, steps: int) -> np.ndarray:
+    return np.linspace(float(start), float(stop), int(min(max(steps, 2), MAX_STEPS)))
+
+
+@lru_cache(maxsize=128)
+def _grid(metric: str, x: AxisSpec, y: AxisSpec, fixed: Tuple[Tuple[str, float], ...]) -> Dict:
+    params = dict(fixed)
+    xs, ys = axis(*x[1:]), axis(*y[1:])
+    params[x[0]] = xs[None, :]
+    params[y[0]] = ys[:, None]
+    if metric == "montante":
+        z = future_value(params.get("vp", 0.0), params.get("aporte", 0.0), params["taxa"], params["anos"])
+    else:
+        z = months_to_goal(params.get("vp", 0.0), params.get("aporte", 0.0), params["taxa"], params["meta"]) / 12
+    z = np.broadcast_to(z, (len(ys), len(xs))).copy()
+    for arr in (xs, ys, z):
+        arr.setflags(write=False)
+    return {"x": xs, "y": ys, "z": z, "x_name": x[0], "y_name": y[0], "metric": metric}
+
+
+def grid(metric: str, x: AxisSpec, y: AxisSpec, **fixed: float) -> Dict:
+    """Grade metric(x, y) com os demais parâmetros fixos.
+
+    metric "montante" usa vp/aporte/taxa/anos; "tempo_meta" (em anos) usa vp/aporte/taxa/meta.
+    Eixos: (nome, início, fim, passos), nome em AXES.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"métrica desconhecida: {metric!r}")
+    for name, *_ in (x, y):
+        if name not in AXES:
+            raise ValueError(f"eixo desconhecido: {name!r}")
+    return _grid(metric, _spec(x), _spec(y), tuple(sorted((k, float(v)) for k, v in fixed.items())))
+
+
+def _spec(a: AxisSpec) -> AxisSpec:
+    """Normaliza tipos para a chave do cache (10 e 10.0 são a mesma grade)."""
+    return a[0], float(a[1]), float(a[2]), int(a[3])
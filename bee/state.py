@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from .config import CARTEIRA_COLS, GASTOS_COLS
 
 def init_session_state():
@@ -13,13 +12,25 @@ def init_session_state():
         "patrimonio_meta": 100000.0,
         "gasto_meta": 3000.0,
         "bee_light": False,
+        "gastos_version": 0,
     }
     for k, v in defaults.items():
         if k not in st.session_state:
             st.session_state[k] = v
 
+    # Frames vazios só depois do login: a tela de login não precisa importar pandas
+    if not st.session_state.get("user_logged_in"):
+        return
+    import pandas as pd  # Lazy import
+
     if "carteira_df" not in st.session_state:
         st.session_state["carteira_df"] = pd.DataFrame(columns=CARTEIRA_COLS)
 
     if "gastos_df" not in st.session_state:
         st.session_state["gastos_df"] = pd.DataFrame(columns=GASTOS_COLS)
+
+
+def set_gastos_df(df):
+    """Troca o frame de gastos da sessão e avança o contador de versão."""
+    st.session_state["gastos_df"] = df
+    st.session_state["gastos_version"] = int(st.session_state.get("gastos_version", 0)) + 1
@@ -0,0 +1,91 @@
+# bee/valuation.py
+# Avaliação da carteira em várias moedas.
+#
+# Cada linha tem duas moedas:
+#   - de cotação: a do preço que o provedor devolve (sai do ticker: .SA -> BRL,
+#     -USD -> USD, .DE -> EUR, .L -> GBp...; sem sufixo, a Moeda da linha);
+#   - de custo: a Moeda informada pelo usuário (Preco_Medio está nela).
+# As moedas distintas da carteira viram uma ConversionMatrix por reprecificação, com
+# um ticker de câmbio por moeda no mesmo lote dos ativos, e cada coluna é
+# convertida com uma multiplicação vetorizada (taxa por moeda, mapeada nas linhas).
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fx import fx_tickers, spot_rates
+
+BASE_CURRENCY = "BRL"
+
+# sufixo do ticker -> moeda da cotação
+SUFFIX_CURRENCY: List[Tuple[str, str]] = [
+    (".SA", "BRL"), ("-BRL", "BRL"), ("=X", "BRL"),
+    ("-USD", "USD"), ("-EUR", "EUR"), ("-GBP", "GBP"),
+    (".DE", "EUR"), (".F", "EUR"), (".PA", "EUR"), (".AS", "EUR"), (".MC", "EUR"), (".MI", "EUR"),
+    (".L", "GBp"),
+    (".TO", "CAD"), (".SW", "CHF"), (".T", "JPY"),
+]
+
+# subunidades que o Yahoo usa em algumas bolsas: moeda -> (moeda cheia, fator)
+SUBUNITS: Dict[str, Tuple[str, float]] = {"GBp": ("GBP", 0.01)}
+
+
+def quote_currency(tickers: pd.Series, moeda: pd.Series) -> pd.Series:
+    """Moeda da cotação de cada linha (vetorizado por sufixo)."""
+    t = tickers.astype(str).str.upper()
+    out = moeda.astype(str).str.upper().replace({"": BASE_CURRENCY, "NAN": BASE_CURRENCY}).to_numpy(dtype=object)
+    for suffix, cur in SUFFIX_CURRENCY:
+        out = np.where(t.str.endswith(suffix.upper()).to_numpy(), cur, out)
+    # índices (^BVSP) são pontos, não dinheiro: ficam na moeda base
+    out = np.where(t.str.startswith("^").to_numpy(), BASE_CURRENCY, out)
+    return pd.Series(out, index=tickers.index, dtype=object)
+
+
+def _full_currency(cur: str) -> str:
+    return SUBUNITS.get(cur, (cur, 1.0))[0]
+
+
+class ConversionMatrix:
+    """Taxas de uma reprecificação: to_base[moeda] = quanto vale 1 unidade em BRL."""
+
+    def __init__(self, to_base: Dict[str, float], missing: Iterable[str] = (), base: str = BASE_CURRENCY):
+        self.base = base
+        self.to_base = dict(to_base)
+        self.to_base.setdefault(base, 1.0)
+        for sub, (full, factor) in SUBUNITS.items():
+            if full in self.to_base:
+                self.to_base[sub] = self.to_base[full] * factor
+        self.missing = sorted(set(missing))
+
+    @classmethod
+    def from_quotes(cls, currencies: Iterable[str], quotes: pd.DataFrame) -> "ConversionMatrix":
+        full = {_full_currency(c) for c in currencies}
+        rates, missing = spot_rates(full, quotes)
+        return cls(rates, missing)
+
+    def rate(self, src: str, dst: str = BASE_CURRENCY) -> float:
+        """Taxa cruzada src -> dst (NaN se faltar alguma das pontas)."""
+        a, b = self.to_base.get(src), self.to_base.get(dst)
+        return a / b if a and b else float("nan")
+
+    def factors(self, currencies: pd.Series, dst: str = BASE_CURRENCY) -> np.ndarray:
+        """Fator por linha: uma taxa por moeda distinta, espalhada com map (sem loop por linha)."""
+        uniq = pd.unique(currencies.astype(str))
+        table = {c: self.rate(c, dst) for c in uniq}
+        return currencies.astype(str).map(table).to_numpy(dtype=float)
+
+    def as_frame(self) -> pd.DataFrame:
+        """Matriz completa (linha -> coluna), para inspeção."""
+        curs = sorted(self.to_base)
+        vals = np.array([self.to_base[c] for c in curs], dtype=float)
+        return pd.DataFrame(vals[:, None] / vals[None, :], index=curs, columns=curs)
+
+
+def currencies_needed(quote_ccy: pd.Series, cost_ccy: pd.Series) -> List[str]:
+    curs = set(pd.unique(quote_ccy.astype(str))) | set(pd.unique(cost_ccy.astype(str)))
+    return sorted({_full_currency(c) for c in curs} - {BASE_CURRENCY})
+
+
+def fx_batch(quote_ccy: pd.Series, cost_ccy: pd.Series) -> List[str]:
+    """Tickers de câmbio para juntar ao lote da carteira."""
+    return fx_tickers(currencies_needed(quote_ccy, cost_ccy))
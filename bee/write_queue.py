@@ -0,0 +1,273 @@
+# bee/write_queue.py
+# Fila write-behind para save_user_data_db: a UI só enfileira e segue; uma thread
+# escritora grava em lote. Saves repetidos do mesmo usuário viram um só job: a carteira
+# mais recente, e as linhas novas de gastos acumuladas em ordem (só INSERT, nunca o
+# histórico inteiro de novo).
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .db import save_user_data_batch_db
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Um snapshot pendente por (db_file, usuário) e uma única thread escritora.
+
+    Os DataFrames enfileirados são tratados como imutáveis: a sessão sempre troca o
+    frame inteiro (set_gastos_df / carteira_df = ...), nunca edita no lugar.
+    """
+
+    def __init__(self, writer=save_user_data_batch_db, max_batch: int = 50, linger: float = 0.05,
+                 retry_delay: float = 0.5, max_attempts: int = 5):
+        self._writer = writer
+        self._max_batch = max_batch
+        self._linger = linger
+        self._retry_delay = retry_delay
+        self._max_attempts = max_attempts
+        # jobs que falharam max_attempts vezes sozinhos: saem da fila e ficam aqui para inspeção
+        self._dead: deque = deque(maxlen=100)
+        self._cond = threading.Condition()
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._inflight: Dict[Tuple[str, str], dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {
+            "submitted": 0, "coalesced": 0, "written": 0, "batches": 0, "errors": 0, "discarded": 0, "dead": 0,
+            "last_lag_s": 0.0, "max_lag_s": 0.0,
+        }
+
+    # ------------------------------------------------------------------ API
+    def submit(self, username: str, carteira_df=None, gastos_df=None, db_file: Optional[str] = None,
+               gastos_append=None, split_marks=None) -> None:
+        """None = aquela parte não mudou. gastos_df substitui o histórico; gastos_append só anexa;
+        split_marks vai na mesma transação da carteira."""
+        key = (db_file or "", username)
+        job = {
+            "username": username, "carteira_df": carteira_df, "gastos_df": gastos_df,
+            "gastos_append": [gastos_append] if gastos_append is not None and len(gastos_append) else [],
+            "split_marks": list(split_marks or ()),
+            "db_file": db_file, "enqueued_at": time.monotonic(),
+        }
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write queue fechada")
+            old = self._pending.get(key)
+            self._stats["submitted"] += 1
+            if old is not None:
+                self._stats["coalesced"] += 1
+                job = _merge(old, job)
+            self._pending[key] = job
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, username: Optional[str] = None, timeout: float = 10.0, gastos_only: bool = False) -> bool:
+        """Espera até não haver escrita pendente (do usuário, ou de todos). False se estourar o timeout.
+
+        gastos_only: só espera jobs que mexem em gastos (um save só da carteira não atrasa o extrato).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._has_work(username, gastos_only):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def discard(self, username: str, db_file: Optional[str] = None, timeout: float = 10.0) -> int:
+        """Descarta o que está na fila para o usuário e espera o job dele que já está gravando.
+
+        Para quem vai apagar o usuário: nada enfileirado antes recria as linhas depois do DELETE.
+        Devolve quantos jobs caíram.
+        """
+        key = (db_file or "", username)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            dropped = int(self._pending.pop(key, None) is not None)
+            while key in self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            # job em andamento que falhou volta para a fila: cai também
+            dropped += int(self._pending.pop(key, None) is not None)
+            self._stats["discarded"] += dropped
+            self._cond.notify_all()
+        return dropped
+
+    def dead_letters(self) -> List[dict]:
+        with self._cond:
+            return list(self._dead)
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._stats)
+            now = time.monotonic()
+            waiting = [j["enqueued_at"] for j in self._pending.values()]
+            out["pending"] = len(self._pending) + len(self._inflight)
+            # lag atual: há quanto tempo a alteração mais antiga espera
+            out["current_lag_s"] = (now - min(waiting)) if waiting else 0.0
+        return out
+
+    def close(self, timeout: float = 30.0) -> bool:
+        ok = self.flush(timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        return ok
+
+    # ------------------------------------------------------------------ internals
+    def _has_work(self, username: Optional[str], gastos_only: bool = False) -> bool:
+        jobs = [*self._pending.items(), *self._inflight.items()]
+        return any((username is None or k[1] == username)
+                   and (not gastos_only or j["gastos_df"] is not None or j["gastos_append"])
+                   for k, j in jobs)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="bee-write-queue", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> Dict[Tuple[str, str], dict]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return {}
+        # deixa rajadas de saves (vários st.rerun seguidos) colapsarem antes de gravar
+        if self._linger:
+            time.sleep(self._linger)
+        with self._cond:
+            keys = list(self._pending)[: self._max_batch]
+            batch = {k: self._pending.pop(k) for k in keys}
+            self._inflight.update(batch)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+
+            by_db: Dict[str, list] = {}
+            for key, job in batch.items():
+                by_db.setdefault(key[0], []).append((key, job))
+
+            failed = {}
+            for jobs in by_db.values():
+                failed.update(self._write(jobs))
+
+            with self._cond:
+                for key, job in failed.items():
+                    self._stats["errors"] += 1
+                    job["attempts"] = job.get("attempts", 0) + 1
+                    if job["attempts"] >= self._max_attempts:
+                        # sozinho e falhando sempre: não segura mais a fila
+                        log.error("write queue: desistindo de %s após %d tentativas", key[1], job["attempts"])
+                        self._dead.append(job)
+                        self._stats["dead"] += 1
+                        continue
+                    # volta para a fila antes do que chegou depois (linhas anexadas não se perdem)
+                    newer = self._pending.get(key)
+                    self._pending[key] = _merge(job, newer) if newer is not None else job
+                for key in batch:
+                    self._inflight.pop(key, None)
+                self._cond.notify_all()
+            if failed:
+                time.sleep(self._retry_delay)
+
+    def _write(self, jobs: list) -> Dict[Tuple[str, str], dict]:
+        """Grava um lote de um banco; devolve os jobs que falharam.
+
+        Se o lote falha, cada job é gravado de novo sozinho: um job ruim não derruba os outros
+        nem os prende num retry do lote inteiro.
+        """
+        items = [{k: j[k] for k in ("username", "carteira_df", "gastos_df", "gastos_append", "split_marks")}
+                 for _, j in jobs]
+        try:
+            self._writer(items, jobs[0][1]["db_file"])
+        except Exception:
+            if len(jobs) == 1:
+                log.exception("write queue: falha ao gravar %s", jobs[0][0][1])
+                return dict(jobs)
+            log.warning("write queue: lote de %d usuários falhou; gravando um a um", len(jobs))
+            failed = {}
+            for job in jobs:
+                failed.update(self._write([job]))
+            return failed
+
+        lag = max(time.monotonic() - j["enqueued_at"] for _, j in jobs)
+        with self._cond:
+            self._stats["written"] += len(items)
+            self._stats["batches"] += 1
+            self._stats["last_lag_s"] = lag
+            self._stats["max_lag_s"] = max(self._stats["max_lag_s"], lag)
+        return {}
+
+
+def _merge(older: dict, newer: dict) -> dict:
+    """Dois jobs do mesmo usuário -> um, com o efeito de gravar `older` e depois `newer`."""
+    out = dict(newer)
+    out["enqueued_at"] = min(older["enqueued_at"], newer["enqueued_at"])  # lag desde a alteração mais antiga
+    out["split_marks"] = older["split_marks"] + newer["split_marks"]
+    out["attempts"] = older.get("attempts", 0)  # o que já vinha falhando continua contando
+    if newer["carteira_df"] is None:
+        out["carteira_df"] = older["carteira_df"]
+    if newer["gastos_df"] is None:
+        # o histórico inteiro de `older` (se houver) vai antes do que `newer` anexa
+        out["gastos_df"] = older["gastos_df"]
+        out["gastos_append"] = older["gastos_append"] + newer["gastos_append"]
+    return out
+
+
+_QUEUE = WriteBehindQueue()
+
+
+def queue_user_save(username: str, carteira_df, gastos_df, db_file: Optional[str] = None) -> None:
+    """Carteira e histórico de gastos inteiros (restauração). No dia a dia, prefira as duas abaixo."""
+    _QUEUE.submit(username, carteira_df, gastos_df, db_file)
+
+
+def queue_wallet_save(username: str, carteira_df, db_file: Optional[str] = None, split_marks=None) -> None:
+    """Só a carteira mudou: os gastos no banco ficam como estão.
+
+    split_marks (de apply_pending_splits) é gravado na mesma transação da carteira ajustada.
+    """
+    _QUEUE.submit(username, carteira_df=carteira_df, db_file=db_file, split_marks=split_marks)
+
+
+def queue_gastos_append(username: str, new_rows, db_file: Optional[str] = None) -> None:
+    """Linhas novas de gastos (lançamento, recorrência, importação): só INSERT."""
+    _QUEUE.submit(username, db_file=db_file, gastos_append=new_rows)
+
+
+def flush_writes(username: Optional[str] = None, timeout: float = 10.0, gastos_only: bool = False) -> bool:
+    """Chame antes de ler do banco o que a sessão pode ter acabado de salvar."""
+    return _QUEUE.flush(username, timeout, gastos_only)
+
+
+def discard_writes(username: str, db_file: Optional[str] = None) -> int:
+    """Joga fora as escritas pendentes do usuário (ex.: antes de apagar a conta)."""
+    return _QUEUE.discard(username, db_file)
+
+
+def write_queue_stats() -> dict:
+    return _QUEUE.stats()
+
+
+def write_queue_dead_letters() -> List[dict]:
+    """Jobs descartados depois de max_attempts falhas (para o admin ver/reenviar)."""
+    return _QUEUE.dead_letters()
+
+
+@atexit.register
+def _shutdown() -> None:
+    if not _QUEUE.close(timeout=30.0):
+        log.error("write queue: processo encerrando com escritas pendentes")
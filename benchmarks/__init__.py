@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Benchmarks offline do Bee Finanças (ver benchmarks/run.py)
@@ -0,0 +1,312 @@
+# benchmarks/checks.py
+# Verificações de correção, offline, para casos que já quebraram (sem rede, banco temporário).
+#
+#   python -m benchmarks.checks
+#
+# Sai com código 1 se alguma falhar. Cada check é uma função check_* sem argumentos.
+import os
+import sys
+import tempfile
+import traceback
+
+_TMP = tempfile.mkdtemp(prefix="bee-checks-")
+os.environ["BEE_DB_FILE"] = os.path.join(_TMP, "checks.db")
+os.environ["BEE_MARKET_CACHE"] = ""
+
+import pandas as pd  # noqa: E402
+
+
+def check_b3_thousands_separator():
+    """Extrato B3: "1.000" na Quantidade é mil quando o arquivo usa vírgula decimal."""
+    from bee.b3_import import parse_statement
+
+    csv = ("Data do Negócio;Tipo de Movimentação;Mercado;Código de Negociação;Quantidade;Preço;Valor\n"
+           "02/01/2024;Compra;Mercado à Vista;PETR4;1.000;35,50;35.500,00\n"
+           "03/01/2024;Compra;Mercado à Vista;VALE3;100;68,00;6.800,00\n").encode("utf-8")
+    kind, df, _ = parse_statement(csv, "negociacao.csv")
+    assert kind == "negociacao", kind
+    petr = df[df["ativo"].str.startswith("PETR4")].iloc[0]
+    assert petr["qtd"] == 1000 and abs(petr["preco"] - 35.5) < 1e-9, petr.to_dict()
+
+    pos_csv = "Código de Negociação;Quantidade;Preço de Fechamento\nITSA4;1.200;10,15\n".encode("utf-8")
+    kind, df, _ = parse_statement(pos_csv, "posicao.csv")
+    assert kind == "posicao" and df.iloc[0]["qtd"] == 1200, df.to_dict("records")
+
+
+def check_ptbr_number_per_column():
+    from bee.schema import parse_ptbr_number
+
+    assert parse_ptbr_number(pd.Series(["1.234", "R$ 1.500"])).tolist() == [1234.0, 1500.0]
+    assert parse_ptbr_number(pd.Series(["30.5", "1234.56"])).tolist() == [30.5, 1234.56]
+    assert parse_ptbr_number(pd.Series(["1.000", "35.500,00"])).tolist() == [1000.0, 35500.0]
+
+
+def check_ledger_keeps_manual_balance():
+    """Primeira operação de um ativo manual parte do saldo manual; a carteira salva não muda."""
+    from bee.ledger import list_positions, merge_positions, opening_from, record_trade
+    from bee.schema import coerce_carteira
+
+    manual = coerce_carteira(pd.DataFrame([{"Tipo": "Ação/ETF", "Ativo": "PETR4", "Nome": "PETR4", "Qtd": 100,
+                                            "Preco_Medio": 30.0, "Moeda": "BRL", "Obs": ""}]))
+    user = "check_ledger"
+    record_trade(user, "PETR4", "BUY", 10, 40.0, data="2024-01-02", opening=opening_from(manual, "PETR4"))
+    record_trade(user, "PETR4", "SELL", 50, 45.0, data="2024-01-03")
+    view = merge_positions(manual, list_positions(user, include_closed=True))
+    row = view[view["Ativo"].str.startswith("PETR4")]
+    assert len(row) == 1 and row["Qtd"].iloc[0] == 60, view.to_dict("records")
+    assert abs(row["Preco_Medio"].iloc[0] - 3400 / 110) < 1e-9, row.to_dict("records")
+    assert manual["Qtd"].iloc[0] == 100  # a visão não altera o frame manual
+
+
+def check_b3_position_matches_bare_ticker():
+    """Posição da B3 (PETR4.SA) atualiza a linha manual PETR4 em vez de duplicar."""
+    from bee.b3_import import merge_holdings, parse_statement
+    from bee.schema import coerce_carteira
+
+    manual = coerce_carteira(pd.DataFrame([{"Tipo": "Ação/ETF", "Ativo": "PETR4", "Nome": "Petrobras", "Qtd": 100,
+                                            "Preco_Medio": 30.0, "Moeda": "BRL", "Obs": ""}]))
+    csv = "Código de Negociação;Quantidade;Preço de Fechamento\nPETR4;1.200;38,10\nITSA4;50;10,00\n"
+    _, pos, _ = parse_statement(csv.encode("utf-8"), "posicao.csv")
+    out = merge_holdings(manual, pos)
+    assert sorted(out["Ativo"]) == ["ITSA4", "PETR4"], out.to_dict("records")
+    petr = out[out["Ativo"] == "PETR4"].iloc[0]
+    assert petr["Qtd"] == 1200 and petr["Preco_Medio"] == 30.0, petr.to_dict()
+
+
+def check_split_saved_with_wallet():
+    """Desdobramento ajusta só as linhas manuais; a marca do baseline entra com a carteira salva."""
+    import sqlite3
+
+    from bee.corporate_actions import apply_pending_splits, store_actions
+    from bee.db import init_db, load_user_data_db
+    from bee.schema import coerce_carteira
+    from bee.write_queue import flush_writes, queue_wallet_save
+
+    init_db()
+    user = "check_split"
+    manual = coerce_carteira(pd.DataFrame([
+        {"Tipo": "Ação/ETF", "Ativo": "WEGE3", "Nome": "WEG", "Qtd": 100, "Preco_Medio": 40.0, "Moeda": "BRL", "Obs": ""},
+        {"Tipo": "Ação/ETF", "Ativo": "ITSA4", "Nome": "Itaúsa", "Qtd": 10, "Preco_Medio": 9.0, "Moeda": "BRL", "Obs": ""},
+    ]))
+    _, splits, _ = apply_pending_splits(user, manual, skip=["ITSA4.SA"])  # primeira vez: só marca
+    assert not splits
+    with sqlite3.connect(os.environ["BEE_DB_FILE"]) as conn:
+        conn.execute("UPDATE split_baseline SET since = '2000-01-01' WHERE username = ?", (user,))
+    store_actions("WEGE3.SA", [{"data": "2024-01-02", "kind": "SPLIT", "value": 2.0}])
+    store_actions("ITSA4.SA", [{"data": "2024-01-02", "kind": "SPLIT", "value": 5.0}])
+
+    df, splits, marks = apply_pending_splits(user, manual, skip=["ITSA4.SA"])
+    assert splits == [("WEGE3.SA", 2.0)] and df["Qtd"].tolist() == [200, 10], (splits, df.to_dict("records"))
+    again, splits_again, _ = apply_pending_splits(user, manual, skip=["ITSA4.SA"])
+    assert splits_again == splits  # nada gravado até a carteira ser salva
+
+    queue_wallet_save(user, df, split_marks=marks)
+    assert flush_writes(user)
+    saved, _ = load_user_data_db(user)
+    assert saved["Qtd"].tolist() == [200, 10], saved.to_dict("records")
+    _, splits_after, _ = apply_pending_splits(user, saved, skip=["ITSA4.SA"])
+    assert not splits_after, splits_after
+
+
+def check_extrato_stale_change_set():
+    """Change set com tx_id renumerado (restauração) não grava nada e devolve os ids ausentes."""
+    from bee.db import apply_gastos_changes_db, init_db, list_gastos_page_db, load_gastos_db, save_user_data_db
+
+    init_db()
+    user = "check_extrato"
+    gastos = pd.DataFrame({"Data": pd.to_datetime(["2024-01-05", "2024-01-06", "2024-02-01"]),
+                           "Categoria": "Mercado", "Descricao": ["a", "b", "c"], "Tipo": "Saída",
+                           "Valor": [10.0, 20.0, 30.0], "Pagamento": "Pix"})
+    save_user_data_db(user, pd.DataFrame(), gastos)
+    ids = [r["tx_id"] for r in list_gastos_page_db(user, "2024-01")[0]]
+    res = apply_gastos_changes_db(user, {ids[0]: {"Valor": 11.0}}, [ids[1]], [])
+    assert res["afetadas"] == 2 and not res["ausentes"], res
+
+    save_user_data_db(user, pd.DataFrame(), load_gastos_db(user))  # renumera tx_id
+    res = apply_gastos_changes_db(user, {ids[0]: {"Valor": 99.0}}, [], [{"Data": "2024-02-02", "Valor": 1.0}])
+    assert res["ausentes"] == [ids[0]] and res["afetadas"] == 0, res
+    assert sorted(load_gastos_db(user)["Valor"]) == [11.0, 30.0]
+    assert len(load_gastos_db(user, months=["2024-02"])) == 1
+
+
+def check_schema_keeps_ticker_and_counts_cached_frames():
+    """coerce_carteira não muda o Ativo; memória conta todo frame de um cache (chave, df, cursor)."""
+    from bee.schema import coerce_carteira, frame_memory_bytes, session_memory_report
+
+    df = coerce_carteira(pd.DataFrame([{"Tipo": "Cripto", "Ativo": " btc-usd ", "Qtd": 1}]))
+    assert df["Ativo"].tolist() == ["btc-usd"], df["Ativo"].tolist()
+
+    a, b = pd.DataFrame({"x": range(100)}), pd.DataFrame({"y": range(50)})
+    report = session_memory_report({"carteira_df": a, "_ext_page": ("k", b, 3), "_cache": (1, a)})
+    assert report["_ext_page"] == frame_memory_bytes(b), report
+    assert "_cache" not in report and report["total"] == frame_memory_bytes(a) + frame_memory_bytes(b), report
+
+
+def check_gastos_search_per_user_by_date():
+    """Busca só nas linhas do usuário, por data (não por inserção), e migra o índice antigo."""
+    import sqlite3
+
+    from bee.db import apply_gastos_changes_db, init_db, save_user_data_batch_db, search_gastos_db
+
+    db = os.path.join(_TMP, "search.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE gastos (tx_id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, "
+                 "data TEXT NOT NULL, categoria TEXT NOT NULL, descricao TEXT NOT NULL, tipo TEXT NOT NULL, "
+                 "valor REAL NOT NULL, pagamento TEXT NOT NULL)")
+    conn.execute("CREATE VIRTUAL TABLE gastos_fts USING fts5(descricao, categoria, content='gastos', "
+                 "content_rowid='tx_id', tokenize='unicode61 remove_diacritics 2')")
+    conn.execute("INSERT INTO gastos (username, data, categoria, descricao, tipo, valor, pagamento) "
+                 "VALUES ('ana', '2024-03-01', 'Mercado', 'Padaria velha', 'Saída', 1, 'Pix')")
+    conn.execute("INSERT INTO gastos_fts(gastos_fts) VALUES('rebuild')")
+    conn.commit()
+    conn.close()
+
+    init_db(db)
+    init_db(db)
+    gastos = pd.DataFrame({"Data": pd.to_datetime(["2024-05-01", "2024-01-10"]), "Categoria": "Mercado",
+                           "Descricao": ["Padaria nova", "Padaria antiga"], "Tipo": "Saída",
+                           "Valor": [2.0, 3.0], "Pagamento": "Pix"})
+    save_user_data_batch_db([{"username": "ana", "gastos_append": [gastos]},
+                             {"username": "ana b", "gastos_append": [gastos]}], db)
+    rows, more = search_gastos_db("ana", "pada", db_file=db)
+    assert [r["descricao"] for r in rows] == ["Padaria nova", "Padaria velha", "Padaria antiga"], rows
+    assert not more
+    assert [r["descricao"] for r in search_gastos_db("ana", "pada", limit=1, offset=1, db_file=db)[0]] \
+        == ["Padaria velha"]
+    assert len(search_gastos_db("ana b", "padaria", db_file=db)[0]) == 2
+    assert search_gastos_db("ana", "u616e", db_file=db)[0] == []  # token do dono não é buscável
+
+    antiga = rows[2]["tx_id"]
+    apply_gastos_changes_db("ana", {antiga: {"Data": "2024-06-01"}}, [], [], db_file=db)
+    assert search_gastos_db("ana", "pada", limit=1, db_file=db)[0][0]["tx_id"] == antiga
+
+
+def check_rebalance_lots_and_missing_quotes():
+    """Lote padrão pelo Ticker_YF (Ativo sem .SA) e ativo sem cotação (NaN) fora das ordens."""
+    from bee.rebalance import plan
+
+    df = pd.DataFrame({"Ativo": ["PETR4", "BOVA11", "VALE3"], "Ticker_YF": ["PETR4.SA", "BOVA11.SA", "VALE3.SA"],
+                       "TipoBucket": "Ação/ETF", "Qtd": [100.0, 10.0, 50.0],
+                       "Total_BRL": [3000.0, 1200.0, float("nan")], "Preco_Atual_BRL": [30.0, 120.0, float("nan")]})
+    assets, _, leftover = plan(df, {"Ação/ETF": 100.0}, 10_000.0, round_lot=True)
+    units = dict(zip(assets["Ativo"], assets["Qtd_Ordem"]))
+    assert units["PETR4"] % 100 == 0 and units["VALE3"] == 0, units
+    assert abs(assets["Valor_Ordem"].sum() + leftover - 10_000.0) < 1e-6, (assets.to_dict("records"), leftover)
+
+
+def check_write_queue_isolates_bad_job():
+    """Um job que sempre falha não prende os outros do lote e sai da fila depois de max_attempts."""
+    import logging
+
+    from bee.write_queue import WriteBehindQueue
+
+    written = []
+
+    def writer(items, db_file):
+        if any(i["username"] == "bad" for i in items):
+            raise ValueError("frame que não serializa")
+        written.extend(i["username"] for i in items)
+
+    q = WriteBehindQueue(writer=writer, linger=0.01, retry_delay=0.01, max_attempts=3)
+    logging.disable(logging.CRITICAL)
+    try:
+        for user in ("a", "bad", "b"):
+            q.submit(user, carteira_df=pd.DataFrame())
+        assert q.flush(timeout=5.0), q.stats()
+    finally:
+        logging.disable(logging.NOTSET)
+        q.close(timeout=1.0)
+    assert sorted(written) == ["a", "b"], written
+    assert q.stats()["dead"] == 1 and [j["username"] for j in q.dead_letters()] == ["bad"]
+
+
+def check_swr_keeps_known_quotes_when_provider_fails():
+    """Provedor fora do ar: tickers já vistos saem do SWR; só o nunca visto fica de fora."""
+    from bee.providers.base import MarketDataProvider, ProviderError, quote
+    from bee.providers.swr import SWRProvider
+
+    class Flaky(MarketDataProvider):
+        down = False
+
+        def quotes(self, tickers):
+            if self.down:
+                raise ProviderError("fora do ar")
+            return {t: quote(10.0, 9.0) for t in tickers}
+
+        def history(self, ticker, period="1y"): ...
+        def fundamentals(self, ticker): ...
+        def news(self, query, limit=8): ...
+        def actions(self, ticker, start=None): ...
+
+    inner = Flaky()
+    swr = SWRProvider(inner)
+    swr.quotes(["A", "B"])
+    inner.down = True
+    out = swr.quotes(["A", "B", "C"])
+    assert sorted(out) == ["A", "B"] and out["A"]["last"] == 10.0, out
+    try:
+        swr.quotes(["D"])
+    except ProviderError:
+        pass
+    else:
+        raise AssertionError("sem nada conhecido, o erro do provedor precisa subir")
+
+
+def check_yahoo_empty_history_is_an_error():
+    """Histórico vazio (Yahoo limitado) vira ProviderError, para nenhum cache guardar o vazio."""
+    from types import SimpleNamespace
+
+    from bee.providers.base import ProviderError
+    from bee.providers.yahoo import YahooProvider
+
+    class Throttled(YahooProvider):
+        def _yf(self):
+            return SimpleNamespace(Ticker=lambda t: SimpleNamespace(history=lambda **kw: pd.DataFrame()))
+
+    try:
+        Throttled().history("PETR4.SA", "1y")
+    except ProviderError:
+        return
+    raise AssertionError("histórico vazio deveria levantar ProviderError")
+
+
+def check_b3_trade_import_keeps_manual_balance():
+    """Extrato de negociação parte do saldo manual: compra soma, venda não falha, reimportar não duplica."""
+    from bee.b3_import import import_trades, parse_statement
+    from bee.ledger import list_trades, wallet_view
+    from bee.schema import coerce_carteira
+
+    manual = coerce_carteira(pd.DataFrame([
+        {"Tipo": "Ação/ETF", "Ativo": "PETR4", "Nome": "PETR4", "Qtd": 300, "Preco_Medio": 20.0, "Moeda": "BRL", "Obs": ""},
+        {"Tipo": "Ação/ETF", "Ativo": "VALE3", "Nome": "VALE3", "Qtd": 100, "Preco_Medio": 60.0, "Moeda": "BRL", "Obs": ""},
+    ]))
+    csv = ("Data do Negócio;Tipo de Movimentação;Mercado;Código de Negociação;Quantidade;Preço;Valor\n"
+           "02/01/2024;Compra;Mercado à Vista;PETR4;10;35,50;355,00\n"
+           "03/01/2024;Venda;Mercado à Vista;VALE3;40;70,00;2.800,00\n").encode("utf-8")
+    _, trades, _ = parse_statement(csv, "negociacao.csv")
+    user = "check_b3_opening"
+    for _ in range(2):  # reimportar o mesmo extrato
+        import_trades(user, trades, manual)
+    view = wallet_view(user, manual).set_index("Ativo")
+    assert view.loc["PETR4", "Qtd"] == 310 and view.loc["VALE3", "Qtd"] == 60, view.to_dict("index")
+    assert abs(view.loc["PETR4", "Preco_Medio"] - (300 * 20 + 355) / 310) < 1e-9, view.to_dict("index")
+    assert sum(t["source"] == "abertura" for t in list_trades(user, limit=-1)) == 2
+
+
+def main() -> int:
+    checks = [(n, f) for n, f in sorted(globals().items()) if n.startswith("check_") and callable(f)]
+    failed = 0
+    for name, fn in checks:
+        try:
+            fn()
+            print(f"ok    {name}")
+        except Exception:
+            failed += 1
+            print(f"FALHA {name}")
+            traceback.print_exc()
+    print(f"{len(checks) - failed}/{len(checks)} ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
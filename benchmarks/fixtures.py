@@ -0,0 +1,254 @@
+# benchmarks/fixtures.py
+# Backend offline para yfinance, RSS do Google News e tradutor.
+#
+# Com um diretório de fixtures gravado (python -m benchmarks.fixtures record ...) os dados
+# vêm de lá; tickers/consultas sem gravação recebem dados sintéticos determinísticos
+# (seed = crc32 do nome), então o benchmark roda igual sem rede.
+#
+#   <dir>/yf/<TICKER>.json     {"history": {"index": [...], "Open": [...], ...}, "info": {...}}
+#   <dir>/rss/<slug>.xml       resposta crua do feed
+#
+#   python -m benchmarks.fixtures serve --port 8765   # stand-in HTTP (bee.providers.http) sobre as fixtures
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import types
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+_PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260,
+                "10y": 2520, "max": 2520}
+_FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")[:80] or "q"
+
+
+class FixtureBackend:
+    """Responde como yfinance/requests/deep_translator a partir de fixtures (ou sintético)."""
+
+    def __init__(self, fixture_dir: Optional[str] = None, latency_ms: float = 0.0):
+        self.fixture_dir = fixture_dir
+        self.latency_s = latency_ms / 1000.0
+        self.calls: Dict[str, int] = {}
+        self._recorded: Dict[str, pd.DataFrame] = {}
+        self._synthetic: Dict[tuple, pd.DataFrame] = {}
+        self._info: Dict[str, dict] = {}
+
+    # ------------------------------------------------------------------ util
+    def _hit(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def _fixture(self, *parts) -> Optional[str]:
+        if not self.fixture_dir:
+            return None
+        path = os.path.join(self.fixture_dir, *parts)
+        return path if os.path.exists(path) else None
+
+    def _load_ticker(self, ticker: str) -> None:
+        if ticker in self._info:
+            return
+        path = self._fixture("yf", f"{_slug(ticker)}.json")
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            hist = pd.DataFrame({k: v for k, v in raw["history"].items() if k != "index"},
+                                index=pd.to_datetime(raw["history"]["index"]))
+            self._recorded[ticker], self._info[ticker] = hist, raw.get("info", {})
+            return
+        self._synthetic_info(ticker)
+
+    def _make_history(self, ticker: str, n: int) -> pd.DataFrame:
+        seed = zlib.crc32(ticker.encode("utf-8"))
+        rng = np.random.default_rng(seed)
+        idx = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n)
+        start = 5 + (seed % 300)
+        close = start * np.exp(np.cumsum(rng.normal(0.0003, 0.018, size=len(idx))))
+        open_ = close * (1 + rng.normal(0, 0.004, size=len(idx)))
+        hist = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, size=len(idx))),
+            "Low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, size=len(idx))),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": rng.integers(1e4, 1e7, size=len(idx)).astype(float),
+        }, index=idx)
+        return hist
+
+    def _synthetic_info(self, ticker: str) -> None:
+        seed = zlib.crc32(ticker.encode("utf-8"))
+        self._info[ticker] = {
+            "longName": f"{ticker} S.A.", "shortName": ticker, "sector": "Sintético", "industry": "Benchmark",
+            "longBusinessSummary": f"Empresa sintética {ticker} usada nos benchmarks. " * 8,
+            "trailingPE": round(5 + (seed % 2500) / 100, 2), "dividendYield": (seed % 900) / 10000,
+            "marketCap": float(1e8 + seed), "returnOnEquity": (seed % 400) / 1000,
+            "profitMargins": (seed % 300) / 1000, "beta": 0.5 + (seed % 150) / 100,
+        }
+
+    def history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+        self._load_ticker(ticker)
+        n = _PERIOD_DAYS.get(period, 252)
+        if ticker in self._recorded:
+            return self._recorded[ticker].tail(n).copy()
+        # sintético gerado no tamanho pedido: 5.000 tickers x 5 dias não alocam anos de histórico
+        key = (ticker, n)
+        if key not in self._synthetic:
+            self._synthetic[key] = self._make_history(ticker, n)
+        return self._synthetic[key].copy()
+
+    # ------------------------------------------------------------------ yfinance
+    def yf_module(self) -> types.ModuleType:
+        backend = self
+        mod = types.ModuleType("yfinance")
+
+        def download(tickers, period="5d", group_by="column", **_):
+            backend._hit("yf.download")
+            if isinstance(tickers, str):
+                tickers = tickers.split()
+            tickers = list(tickers)
+            if len(tickers) == 1:
+                return backend.history(tickers[0], period)[_FIELDS]
+            frames = {t: backend.history(t, period)[_FIELDS] for t in tickers}
+            out = pd.concat(frames, axis=1)  # colunas (ticker, campo), como group_by="ticker"
+            if group_by != "ticker":
+                out = out.swaplevel(0, 1, axis=1).sort_index(axis=1)
+            return out
+
+        class Ticker:
+            def __init__(self, ticker):
+                self.ticker = ticker
+
+            def history(self, period="1y", **_):
+                backend._hit("yf.Ticker.history")
+                return backend.history(self.ticker, period)
+
+            @property
+            def info(self):
+                backend._hit("yf.Ticker.info")
+                backend._load_ticker(self.ticker)
+                return dict(backend._info[self.ticker])
+
+            @property
+            def fast_info(self):
+                return types.SimpleNamespace(last_price=float(backend.history(self.ticker, "5d")["Close"].iloc[-1]))
+
+        mod.download = download
+        mod.Ticker = Ticker
+        return mod
+
+    # ------------------------------------------------------------------ RSS
+    def rss(self, url: str) -> bytes:
+        query = re.search(r"[?&]q=([^&]+)", url)
+        query = query.group(1) if query else "news"
+        path = self._fixture("rss", f"{_slug(query)}.xml")
+        if path:
+            with open(path, "rb") as f:
+                return f.read()
+        now = pd.Timestamp.now(tz="UTC")
+        items = "".join(
+            f"<item><title>{query} notícia {i} - Fonte {i % 5}</title>"
+            f"<link>https://example.com/{_slug(query)}/{i}</link>"
+            f"<pubDate>{(now - pd.Timedelta(hours=i)).strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate>"
+            f"<source url='https://example.com'>Fonte {i % 5}</source></item>"
+            for i in range(20)
+        )
+        return f"<?xml version='1.0' encoding='UTF-8'?><rss version='2.0'><channel>{items}</channel></rss>".encode()
+
+    def requests_get(self, url, *args, **kwargs):
+        self._hit("requests.get")
+        body = self.rss(url)
+        return types.SimpleNamespace(status_code=200, content=body, text=body.decode("utf-8"))
+
+    # ------------------------------------------------------------------ tradutor
+    def translator_class(self):
+        backend = self
+
+        class GoogleTranslator:
+            def __init__(self, source="auto", target="pt"):
+                self.target = target
+
+            def translate(self, text):
+                backend._hit("translate")
+                return text
+
+        return GoogleTranslator
+
+
+def install(backend: FixtureBackend) -> FixtureBackend:
+    """Troca yfinance, requests.get e deep_translator pelo backend (antes do 1º uso)."""
+    from bee import safe_imports
+
+    for proxy in (safe_imports.yf, safe_imports.GoogleTranslator):
+        if proxy.loaded:
+            raise RuntimeError("instale o backend antes do primeiro uso de yfinance/tradutor")
+
+    sys.modules["yfinance"] = backend.yf_module()
+    translator = types.ModuleType("deep_translator")
+    translator.GoogleTranslator = backend.translator_class()
+    sys.modules["deep_translator"] = translator
+    try:
+        import requests
+        requests.get = backend.requests_get
+    except ImportError:
+        sys.modules["requests"] = types.SimpleNamespace(get=backend.requests_get)
+    return backend
+
+
+# --------------------------------------------------------------------------------------
+# Gravação (precisa de rede + yfinance/requests de verdade)
+# --------------------------------------------------------------------------------------
+def record(out_dir: str, tickers, queries, period: str = "2y") -> None:
+    import requests
+    import yfinance as yf
+
+    os.makedirs(os.path.join(out_dir, "yf"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "rss"), exist_ok=True)
+    for t in tickers:
+        tk = yf.Ticker(t)
+        hist = tk.history(period=period, auto_adjust=False)
+        payload = {
+            "history": {"index": [d.isoformat() for d in hist.index],
+                        **{c: hist[c].astype(float).tolist() for c in hist.columns if c in _FIELDS}},
+            "info": {k: v for k, v in (tk.info or {}).items() if isinstance(v, (str, int, float, bool))},
+        }
+        with open(os.path.join(out_dir, "yf", f"{_slug(t)}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        print(f"yf  {t}: {len(hist)} linhas")
+    for q in queries:
+        url = f"https://news.google.com/rss/search?q={q}&hl=pt-BR&gl=BR&ceid=BR:pt-419"
+        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        with open(os.path.join(out_dir, "rss", f"{_slug(q)}.xml"), "wb") as f:
+            f.write(resp.content)
+        print(f"rss {q}: {len(resp.content)} bytes")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Grava/serve fixtures de Yahoo/RSS para os benchmarks.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    rec.add_argument("--period", default="2y")
+    rec.add_argument("--rss", nargs="*", default=["Ibovespa"])
+    rec.add_argument("tickers", nargs="+")
+    srv = sub.add_parser("serve", help="stand-in HTTP com o YahooProvider lendo das fixtures")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--fixtures", default=None, help="diretório gravado com record (sem ele: sintético)")
+    srv.add_argument("--latency-ms", type=float, default=0.0, help="latência simulada por chamada")
+    args = ap.parse_args()
+    if args.cmd == "record":
+        record(args.out, args.tickers, args.rss, args.period)
+    else:
+        install(FixtureBackend(args.fixtures, args.latency_ms))
+        from bee.providers.http import serve
+        from bee.providers.yahoo import YahooProvider
+        serve(YahooProvider(), args.host, args.port, "fixtures")
@@ -0,0 +1,149 @@
+# benchmarks/import_time.py
+# Custo de cold start da tela de login.
+#
+#   python benchmarks/import_time.py            # relatório
+#   python benchmarks/import_time.py --check    # falha se algo pesado entrar no login
+#   python benchmarks/import_time.py --json     # saída para comparar entre versões
+#
+# Duas medidas, cada uma num processo novo (imports já cacheados não contam):
+#   1. `python -X importtime -c "import main"`: tempo de import dos módulos do main.py,
+#      com os maiores ofensores.
+#   2. primeira renderização: roda main.py com streamlit.testing (AppTest) até a tela de
+#      login ficar pronta e anota o tempo e quais módulos pesados foram carregados.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Só devem ser importados quando a feature que usa roda (nunca no login).
+# O que o próprio streamlit já importa sozinho (ex.: plotly) não conta contra o app.
+HEAVY_MODULES = ["pandas", "numpy", "yfinance", "plotly", "feedparser", "deep_translator", "requests"]
+
+_FIRST_PAINT = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file("main.py", default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    "harness_s": t1 - t0,
+    "first_paint_s": t2 - t1,
+    "exceptions": [str(e.value) for e in at.exception],
+    "login_form": any(getattr(b, "label", "") == "ENTRAR" for b in at.button),
+    "modules": sorted(m for m in sys.modules if "." not in m),
+}))
+"""
+
+
+def _env(db_file: str) -> dict:
+    env = dict(os.environ)
+    env["BEE_DB_FILE"] = db_file  # não encosta no banco real
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+    """Linhas de -X importtime -> [(módulo, self_us, cumulative_us, profundidade)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cum_us, raw = parts
+        # a indentação do nome indica quem importou quem (2 espaços por nível)
+        depth = (len(raw) - len(raw.lstrip(" ")) - 1) // 2
+        rows.append((raw.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def _imported_by(code: str, db_file: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, env=_env(db_file), capture_output=True, text=True,
+    )
+    return proc, parse_importtime(proc.stderr)
+
+
+def streamlit_baseline(db_file: str) -> set:
+    _, rows = _imported_by("import streamlit", db_file)
+    return {r[0].split(".")[0] for r in rows}
+
+
+def measure_importtime(db_file: str, baseline: set) -> dict:
+    proc, rows = _imported_by("import main", db_file)
+    top_level = [r for r in rows if r[3] == 0]
+    by_self = sorted(rows, key=lambda r: r[1], reverse=True)[:15]
+    imported = {r[0].split(".")[0] for r in rows}
+    return {
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else "",
+        "total_ms": sum(r[2] for r in top_level) / 1000.0,
+        "top_self_ms": [(name, self_us / 1000.0) for name, self_us, _, _ in by_self],
+        "top_cumulative_ms": [(name, cum / 1000.0) for name, _, cum, _ in
+                              sorted(top_level, key=lambda r: r[2], reverse=True)[:10]],
+        "heavy": sorted(m for m in HEAVY_MODULES if m in imported and m not in baseline),
+    }
+
+
+def measure_first_paint(db_file: str, baseline: set) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_PAINT],
+        cwd=PROJECT_DIR, env=_env(db_file), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"ok": False, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr else ""}
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    mods = set(out.pop("modules"))
+    out["ok"] = True
+    out["heavy"] = sorted(m for m in HEAVY_MODULES if m in mods and m not in baseline)
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Cold start da tela de login (imports + primeira renderização).")
+    ap.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    ap.add_argument("--check", action="store_true", help="código 1 se módulo pesado entrar no login")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        baseline = streamlit_baseline(db_file)
+        result = {
+            "python": sys.version.split()[0],
+            "importtime": measure_importtime(db_file, baseline),
+            "first_paint": measure_first_paint(db_file, baseline),
+        }
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        imp, fp = result["importtime"], result["first_paint"]
+        print(f"import main: {imp['total_ms']:.0f} ms" + ("" if imp["ok"] else f"  (erro: {imp['error']})"))
+        for name, ms in imp["top_cumulative_ms"]:
+            print(f"   {ms:8.1f} ms  {name}")
+        print("maiores imports (self):")
+        for name, ms in imp["top_self_ms"]:
+            print(f"   {ms:8.1f} ms  {name}")
+        if fp["ok"]:
+            print(f"primeira renderização do login: {fp['first_paint_s'] * 1000:.0f} ms "
+                  f"(formulário {'ok' if fp['login_form'] else 'NÃO encontrado'})")
+        else:
+            print(f"primeira renderização: erro ({fp['error']})")
+        print(f"módulos pesados no login: {', '.join(fp.get('heavy') or imp['heavy']) or 'nenhum'}")
+
+    heavy = set(result["importtime"]["heavy"]) | set(result["first_paint"].get("heavy", []))
+    if args.check and (heavy or not result["first_paint"]["ok"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# benchmarks/run.py
+# Suíte offline: yfinance, RSS e tradutor respondem do FixtureBackend (benchmarks/fixtures.py),
+# usuários são sintéticos (benchmarks/synthetic.py) e o banco é um arquivo temporário.
+#
+#   python -m benchmarks.run                          # perfil rápido
+#   python -m benchmarks.run --profile full           # carteiras até 5.000, até 1M transações
+#   python -m benchmarks.run --save benchmarks/baseline.json
+#   python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.25
+#
+# Com --baseline, sai com código 1 se algum cenário ficar mais lento que a tolerância.
+import os
+import sys
+import tempfile
+
+# antes de qualquer import de bee: banco temporário, sem export de profiling e sem cache SQLite
+_TMP = tempfile.mkdtemp(prefix="bee-bench-")
+os.environ["BEE_DB_FILE"] = os.path.join(_TMP, "bench.db")
+os.environ.pop("BEE_PROFILE_JSONL", None)
+os.environ["BEE_MARKET_CACHE"] = ""  # mede o caminho do provedor, sem o cache SQLite
+os.environ["BEE_MARKET_RATE"] = "0"  # o backend de fixtures não limita; o token bucket só somaria espera
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from typing import Callable, Dict, List, Optional  # noqa: E402
+
+from benchmarks.fixtures import FixtureBackend, install  # noqa: E402
+
+PROFILES = {
+    "quick": {"wallets": [10, 100, 1000], "transactions": [1_000, 10_000, 100_000]},
+    "full": {"wallets": [10, 100, 1000, 5000], "transactions": [1_000, 10_000, 100_000, 1_000_000]},
+}
+
+# diferenças abaixo disso são ruído, mesmo que passem da tolerância relativa
+MIN_REGRESSION_S = 0.005
+
+
+def _repeats(size: int, default: int) -> int:
+    return 1 if size >= 500_000 else default
+
+
+def measure(fn: Callable[[], object], repeats: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    times: List[float] = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(times), "min_s": min(times), "n": len(times)}
+
+
+def _cold() -> None:
+    """Esvazia o st.cache_data e o stale-while-revalidate do provedor."""
+    import streamlit as st
+    from bee.providers import get_provider
+
+    st.cache_data.clear()
+    invalidate = getattr(get_provider(), "invalidate", None)
+    if invalidate:
+        invalidate()
+
+
+# --------------------------------------------------------------------------------------
+# Cenários
+# --------------------------------------------------------------------------------------
+def bench_pricing(sizes, repeats) -> Dict[str, Dict]:
+    from bee.market_data import atualizar_precos_carteira_memory
+    from benchmarks.synthetic import make_wallet
+
+    out = {}
+    for n in sizes:
+        wallet = make_wallet(n, seed=n)
+        # cache frio em cada repetição: mede o caminho completo (download + reprecificação)
+        out[f"pricing[{n}]"] = measure(lambda: atualizar_precos_carteira_memory(wallet),
+                                       _repeats(n, repeats), setup=_cold)
+        # cache quente: o que um rerun comum paga
+        out[f"pricing_warm[{n}]"] = measure(lambda: atualizar_precos_carteira_memory(wallet), _repeats(n, repeats))
+    return out
+
+
+def bench_db(sizes, repeats) -> Dict[str, Dict]:
+    from bee.db import create_user, init_db, load_user_data_db, save_user_data_batch_db, save_user_data_db
+    from benchmarks.synthetic import make_gastos, make_wallet
+
+    init_db()
+    out = {}
+    for n in sizes:
+        user = f"bench_{n}"
+        create_user(user, "bench", "Bench", "bench")
+        wallet, gastos = make_wallet(50, seed=n), make_gastos(n, seed=n)
+        out[f"db_save[{n}]"] = measure(lambda: save_user_data_db(user, wallet, gastos), _repeats(n, repeats))
+        out[f"db_load[{n}]"] = measure(lambda: load_user_data_db(user), _repeats(n, repeats))
+        # caminhos do dia a dia: uma transação nova, ou só a carteira
+        one = gastos.head(1)
+        out[f"db_append_one[{n}]"] = measure(
+            lambda: save_user_data_batch_db([{"username": user, "gastos_append": [one]}]), repeats)
+        out[f"db_save_wallet_only[{n}]"] = measure(
+            lambda: save_user_data_batch_db([{"username": user, "carteira_df": wallet}]), repeats)
+    return out
+
+
+def bench_controle(sizes, repeats) -> Dict[str, Dict]:
+    from bee.pages.controle import _ensure_gastos_columns, _month_key, _spent_by_category_month, _ym
+    from benchmarks.synthetic import make_gastos
+
+    out = {}
+    for n in sizes:
+        raw = make_gastos(n, seed=n)
+        # formato legado (planilha/JSON antigo): datas e valores em texto pt-BR
+        legacy = raw.assign(Data=raw["Data"].dt.strftime("%d/%m/%Y"),
+                            Valor=raw["Valor"].map(lambda v: f"R$ {v:,.2f}".replace(",", "_")
+                                                   .replace(".", ",").replace("_", ".")))
+        canon = _ensure_gastos_columns(raw)
+        month = _month_key(canon["Data"].max())
+
+        def dashboard():
+            months = sorted(set(_ym(canon["Data"]).dropna().tolist()))
+            dfm = canon[_ym(canon["Data"]) == month]
+            dfm.groupby("Tipo", observed=True)["Valor"].sum()
+            dfm[dfm["Tipo"] == "Saída"].groupby("Categoria", observed=True)["Valor"].sum()
+            return months
+
+        reps = _repeats(n, repeats)
+        out[f"controle_normalize_legacy[{n}]"] = measure(lambda: _ensure_gastos_columns(legacy), reps)
+        out[f"controle_normalize_typed[{n}]"] = measure(lambda: _ensure_gastos_columns(raw), reps)
+        out[f"controle_spent_by_category[{n}]"] = measure(lambda: _spent_by_category_month(canon, month), reps)
+        out[f"controle_dashboard[{n}]"] = measure(dashboard, reps)
+    return out
+
+
+def bench_analisar(repeats, ticker: str = "PETR4") -> Dict[str, Dict]:
+    from streamlit.testing.v1 import AppTest
+
+    def run_page():
+        at = AppTest.from_file(os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py"),
+                               default_timeout=120)
+        at.session_state["user_logged_in"] = True
+        at.session_state["username"] = "bench_analisar"
+        at.session_state["user_name_display"] = "Bench"
+        at.session_state["page"] = "🔍 Analisar"
+        at.run()
+        at.text_input[0].input(ticker)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    return {
+        "analisar_page_cold": measure(run_page, repeats, setup=_cold),
+        "analisar_page_warm": measure(run_page, repeats),
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Regressão
+# --------------------------------------------------------------------------------------
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["median_s"] * (1 + tolerance)
+        if cur["median_s"] > limit and cur["median_s"] - base["median_s"] > MIN_REGRESSION_S:
+            regressions.append(f"{name}: {base['median_s'] * 1000:.1f} ms -> {cur['median_s'] * 1000:.1f} ms "
+                               f"(+{(cur['median_s'] / base['median_s'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks offline do Bee Finanças.")
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--only", nargs="*", choices=["pricing", "db", "controle", "analisar"],
+                    help="roda só estes grupos")
+    ap.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"),
+                    help="diretório gravado com benchmarks.fixtures record (opcional)")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="latência simulada por chamada de rede")
+    ap.add_argument("--save", help="grava o resultado em JSON (ex.: nova baseline)")
+    ap.add_argument("--baseline", help="compara com um resultado salvo antes")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="folga relativa antes de acusar regressão")
+    args = ap.parse_args(argv)
+
+    backend = install(FixtureBackend(args.fixtures if os.path.isdir(args.fixtures) else None, args.latency_ms))
+    prof = PROFILES[args.profile]
+    groups = set(args.only or ["pricing", "db", "controle", "analisar"])
+
+    results: Dict[str, Dict] = {}
+    if "pricing" in groups:
+        results.update(bench_pricing(prof["wallets"], args.repeats))
+    if "db" in groups:
+        results.update(bench_db(prof["transactions"], args.repeats))
+    if "controle" in groups:
+        results.update(bench_controle(prof["transactions"], args.repeats))
+    if "analisar" in groups:
+        results.update(bench_analisar(args.repeats))
+
+    for name, r in results.items():
+        print(f"{name:<42} {r['median_s'] * 1000:10.1f} ms  (min {r['min_s'] * 1000:.1f}, n={r['n']})")
+    print(f"chamadas ao backend: {backend.calls}")
+
+    payload = {
+        "meta": {"profile": args.profile, "python": platform.python_version(), "machine": platform.machine(),
+                 "latency_ms": args.latency_ms, "backend_calls": backend.calls},
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)["results"]
+        regressions = compare(results, base, args.tolerance)
+        if regressions:
+            print("\nREGRESSÕES:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nsem regressões (tolerância {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
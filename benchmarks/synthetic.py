@@ -0,0 +1,52 @@
+# benchmarks/synthetic.py
+# Usuários sintéticos, determinísticos pela seed: carteira e gastos no formato da sessão.
+import numpy as np
+import pandas as pd
+
+from bee.config import CARTEIRA_COLS, GASTOS_COLS
+
+CATEGORIAS = ["Moradia", "Alimentação", "Transporte", "Lazer", "Investimento", "Salário", "Saúde", "Educação"]
+PAGAMENTOS = ["Pix", "Crédito", "Débito", "Dinheiro"]
+CRIPTOS = ["BTC", "ETH", "SOL", "ADA"]
+US_TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "VOO"]
+
+
+def make_wallet(n_positions: int, seed: int = 0) -> pd.DataFrame:
+    """~80% ações/FIIs B3, ~10% exterior em USD, ~5% cripto, ~5% renda fixa."""
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(["br", "us", "cripto", "rf"], size=n_positions, p=[0.80, 0.10, 0.05, 0.05])
+    rows = []
+    for i, k in enumerate(kind):
+        if k == "br":
+            ativo, tipo, moeda = f"SY{i:04d}3", "Ação/ETF", "BRL"
+        elif k == "us":
+            ativo, tipo, moeda = US_TICKERS[i % len(US_TICKERS)], "Ação/ETF", "USD"
+        elif k == "cripto":
+            ativo, tipo, moeda = CRIPTOS[i % len(CRIPTOS)], "Cripto", "USD"
+        else:
+            ativo, tipo, moeda = f"CDB {i}", "Renda Fixa", "BRL"
+        rows.append({
+            "Tipo": tipo, "Ativo": ativo, "Nome": ativo,
+            "Qtd": float(rng.integers(1, 500)), "Preco_Medio": float(np.round(rng.uniform(5, 300), 2)),
+            "Moeda": moeda, "Obs": "",
+        })
+    return pd.DataFrame(rows, columns=CARTEIRA_COLS)
+
+
+def make_gastos(n_tx: int, seed: int = 0, years: int = 3) -> pd.DataFrame:
+    """Transações espalhadas nos últimos `years` anos; ~15% entradas."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize()
+    offsets = rng.integers(0, 365 * years, size=n_tx)
+    tipo = np.where(rng.random(n_tx) < 0.15, "Entrada", "Saída")
+    cat = rng.choice(CATEGORIAS, size=n_tx)
+    cat = np.where(tipo == "Entrada", "Salário", cat)
+    df = pd.DataFrame({
+        "Data": end - pd.to_timedelta(offsets, unit="D"),
+        "Categoria": cat,
+        "Descricao": [f"Compra {i % 997} loja {i % 89}" for i in range(n_tx)],
+        "Tipo": tipo,
+        "Valor": np.round(rng.gamma(2.0, 60.0, size=n_tx), 2),
+        "Pagamento": rng.choice(PAGAMENTOS, size=n_tx),
+    }, columns=GASTOS_COLS)
+    return df.sort_values("Data", ignore_index=True)
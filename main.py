@@ -12,7 +12,10 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 logging.getLogger("yfinance").setLevel(logging.CRITICAL)
 
 from bee.theme import apply_page_config, apply_theme_css
-from bee.state import init_session_state
+from bee.state import init_session_state, set_gastos_df
+from bee.write_queue import flush_writes, write_queue_stats
+from bee.config import ADMIN_USERS
+from bee.profiling import rerun, span, timed
 from bee.db import (
     init_db,
     login_user,
@@ -29,6 +32,7 @@ from bee.db import (
 # =============================================================================
 @st.cache_data(ttl=300, show_spinner=False)
 def cached_load_user_data(username):
+    flush_writes(username)
     return load_user_data_db(username)
 
 
@@ -123,12 +127,44 @@ def open_config_modal():
                 else:
                     st.error("Senha atual incorreta.")
 
+    from bee.schema import session_memory_report  # Lazy import (pandas)
+
+    mem = session_memory_report(st.session_state)
+    st.caption(f"💾 Dados em memória nesta sessão: {mem['total'] / 1024:.1f} KB")
+    wq = write_queue_stats()
+    st.caption(f"📝 Gravações pendentes: {wq['pending']} • atraso atual {wq['current_lag_s']:.2f}s "
+               f"(último lote {wq['last_lag_s']:.2f}s, pior {wq['max_lag_s']:.2f}s)")
+
+    if st.session_state.get("username", "") in ADMIN_USERS:
+        render_profiling_admin()
+
     st.divider()
     if st.button("Sair da Conta", use_container_width=True):
         st.session_state.clear()
         st.rerun()
 
 
+def render_profiling_admin():
+    from bee.profiling import PROFILE_ENABLED, PROFILE_JSONL, recent_spans, reset, span_stats
+
+    with st.expander("⏱️ Profiling (admin)"):
+        stats = span_stats()
+        if not PROFILE_ENABLED:
+            st.caption("Profiling desligado. Suba o app com BEE_PROFILE=1 para medir.")
+        elif not stats:
+            st.caption("Nenhum span registrado ainda.")
+        else:
+            rows = [{"Span": name, "N": v["count"], "p50 ms": round(v["p50"], 1), "p95 ms": round(v["p95"], 1),
+                     "Máx ms": round(v["max"], 1), "Total ms": round(v["total"], 0)}
+                    for name, v in sorted(stats.items(), key=lambda kv: kv[1]["total"], reverse=True)]
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+            st.caption(f"{len(recent_spans())} spans no buffer"
+                       + (f" • exportando para {PROFILE_JSONL}" if PROFILE_JSONL else ""))
+        if st.button("Limpar métricas", use_container_width=True):
+            reset()
+            st.rerun()
+
+
 # =============================================================================
 # MENU POP-UP
 # =============================================================================
@@ -175,6 +211,7 @@ def render_floating_menu_button():
 # =============================================================================
 # TELA DE LOGIN (COM RECUPERAÇÃO DE SENHA)
 # =============================================================================
+@timed("main.render_login")
 def render_login(logo_img):
     st.markdown("""
     <style>
@@ -260,7 +297,7 @@ def render_login(logo_img):
                             try:
                                 c, g = cached_load_user_data(u)
                                 st.session_state.carteira_df = c
-                                st.session_state.gastos_df = g
+                                set_gastos_df(g)
                             except:
                                 pass
                             st.session_state.page = "🏠 Home"
@@ -310,6 +347,7 @@ def render_login(logo_img):
 # =============================================================================
 # MAIN ORCHESTRATOR
 # =============================================================================
+@timed("main.route_pages")
 def route_pages():
     pg = st.session_state.get("page", "🏠 Home")
 
@@ -335,8 +373,9 @@ def route_pages():
 
 def main():
     logo_img = apply_page_config()
-    apply_theme_css()
-    apply_app_shell_css()
+    with span("css"):
+        apply_theme_css()
+        apply_app_shell_css()
     init_session_state()
     init_db()
 
@@ -349,7 +388,7 @@ def main():
     if "carteira_df" not in st.session_state:
         c_df, g_df = cached_load_user_data(st.session_state["username"])
         st.session_state["carteira_df"] = c_df
-        st.session_state["gastos_df"] = g_df
+        set_gastos_df(g_df)
 
     render_top_bar_with_privacy()
     render_floating_menu_button()
@@ -363,4 +402,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with rerun():
+        main()
\ No newline at end of file